@@ -4,33 +4,57 @@ Seasonal Backend for PSI-Field
 Predictor with seasonal/circadian components for time-aware patterns
 """
 
+import math
+import time
 import numpy as np
-from typing import Dict, Any, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Tuple, Optional, Sequence, Union
 from datetime import datetime, timedelta
 
+Timestamp = Union[datetime, float, int]
+
+
+def to_epoch(timestamp: Timestamp) -> float:
+    """Seconds since the Unix epoch for a datetime or a numeric timestamp"""
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
 class SeasonalBackend:
     """
     Backend with seasonal decomposition for time-aware predictions.
     Captures daily/weekly patterns common in operational metrics.
     """
     
-    def __init__(self, input_dim: int = 16, latent_dim: int = 32):
+    def __init__(self, input_dim: int = 16, latent_dim: int = 32, dtype: Any = np.float64,
+                 seed: Optional[int] = None, rng: Optional[np.random.Generator] = None,
+                 phase_resolution: Optional[float] = None):
         """
         Initialize Seasonal backend
         
         Args:
             input_dim: Dimension of input observations
             latent_dim: Dimension of latent state
+            dtype: Floating point type for weights, trend and state
+            seed: Seed for the weight initialisation (ignored when rng is given)
+            rng: numpy Generator to draw from, e.g. a per-agent SeedSequence stream
+            phase_resolution: If set, seasonal features are read from precomputed
+                cos/sin tables sampled every this many seconds instead of being
+                evaluated per call
         """
         self.input_dim = input_dim
         self.latent_dim = latent_dim
+        self.dtype = np.dtype(dtype)
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
         
         # Base transition matrix
-        self.A = np.random.randn(latent_dim, latent_dim) * 0.1
+        self.A = self.rng.standard_normal((latent_dim, latent_dim)) * 0.1
         self.A += np.eye(latent_dim) * 0.8
+        self.A = self.A.astype(self.dtype)
         
         # Observation matrix
-        self.C = np.random.randn(input_dim, latent_dim) * 0.1
+        self.C = (self.rng.standard_normal((input_dim, latent_dim)) * 0.1).astype(self.dtype)
         
         # Seasonal components (hourly, daily, weekly)
         self.seasonal_periods = {
@@ -38,23 +62,33 @@ class SeasonalBackend:
             'daily': 86400,      # 24 hours
             'weekly': 604800     # 7 days
         }
-        
-        # Seasonal weights (learned online)
-        self.seasonal_weights = {
-            period: np.zeros((input_dim, 2))  # cos, sin components
-            for period in self.seasonal_periods
-        }
+        self._periods = np.array(list(self.seasonal_periods.values()), dtype=np.float64)
+        
+        # Seasonal weights (learned online), stacked as [cos, sin] column pairs per
+        # period so the whole adjustment is one (input_dim, 2 * n_periods) matvec
+        self.W = np.zeros((input_dim, 2 * len(self._periods)), dtype=self.dtype)
+        
+        # Optional phase lookup tables, one (n_samples, 2) table per period
+        self.phase_resolution = phase_resolution
+        self._phase_tables = None
+        if phase_resolution is not None:
+            self._phase_tables = []
+            for period in self._periods:
+                n = int(np.ceil(period / phase_resolution))
+                phase = 2 * np.pi * np.arange(n) / n
+                self._phase_tables.append(np.stack([np.cos(phase), np.sin(phase)], axis=1))
         
         # Current state
-        self.z = np.zeros(latent_dim)
+        self.z = np.zeros(latent_dim, dtype=self.dtype)
         
         # Trend component (EMA)
-        self.trend = np.zeros(input_dim)
+        self.trend = np.zeros(input_dim, dtype=self.dtype)
         self.trend_alpha = 0.1
         
-        # Reference timestamp for seasonal calculation
-        self.ref_time = datetime.now()
-        self.current_time = datetime.now()
+        # Reference timestamp for seasonal calculation (epoch seconds)
+        self._ref_epoch = time.time()
+        self._current_epoch = self._ref_epoch
+        self._current_features = self._compute_seasonal_features(self._current_epoch)
         
         # Prediction error tracking
         self.pe = 0.0
@@ -62,60 +96,97 @@ class SeasonalBackend:
         # Learning rate
         self.lr = 0.01
     
-    def _compute_seasonal_features(self, timestamp: datetime) -> Dict[str, np.ndarray]:
+    @property
+    def seasonal_weights(self) -> Mapping[str, np.ndarray]:
         """
-        Compute cos/sin features for each seasonal period
-        
-        Args:
-            timestamp: Current timestamp
+        Per-period (input_dim, 2) views into the stacked weight matrix
         
-        Returns:
-            Dict mapping period name to [cos, sin] features
+        The mapping is read-only (assigning a key raises TypeError); write
+        through a view in place or use set_seasonal_weights.
         """
-        features = {}
-        elapsed = (timestamp - self.ref_time).total_seconds()
-        
-        for name, period in self.seasonal_periods.items():
-            phase = 2 * np.pi * (elapsed % period) / period
-            features[name] = np.array([np.cos(phase), np.sin(phase)])
+        return MappingProxyType({name: self.W[:, 2 * i:2 * i + 2] for i, name in enumerate(self.seasonal_periods)})
+    
+    def set_seasonal_weights(self, name: str, weights: np.ndarray):
+        """
+        Overwrite one period's [cos, sin] weight columns in the stacked matrix
         
-        return features
+        Args:
+            name: Seasonal period name (a key of seasonal_periods)
+            weights: Array of shape (input_dim, 2)
+        """
+        if name not in self.seasonal_periods:
+            raise KeyError(f"unknown seasonal period: {name!r}")
+        i = list(self.seasonal_periods).index(name)
+        weights = np.asarray(weights, dtype=self.dtype)
+        if weights.shape != (self.input_dim, 2):
+            raise ValueError(f"seasonal weights for {name!r} must have shape {(self.input_dim, 2)}, "
+                             f"got {weights.shape}")
+        self.W[:, 2 * i:2 * i + 2] = weights
+    
+    @property
+    def ref_time(self) -> datetime:
+        return datetime.fromtimestamp(self._ref_epoch)
+    
+    @ref_time.setter
+    def ref_time(self, timestamp: Timestamp):
+        self._ref_epoch = to_epoch(timestamp)
+    
+    @property
+    def current_time(self) -> datetime:
+        return datetime.fromtimestamp(self._current_epoch)
     
-    def _apply_seasonal_adjustment(self, x: np.ndarray, timestamp: datetime) -> np.ndarray:
+    def _compute_seasonal_features(self, timestamps: Union[Timestamp, np.ndarray]) -> np.ndarray:
         """
-        Apply seasonal components to observation
+        Compute stacked cos/sin features for every seasonal period
         
         Args:
-            x: Input observation (input_dim,)
-            timestamp: Current timestamp
+            timestamps: Epoch seconds (scalar or array) or a datetime
         
         Returns:
-            x_adjusted: Seasonally adjusted observation
+            Features of shape (2 * n_periods,), or (n, 2 * n_periods) for an array
         """
-        seasonal_features = self._compute_seasonal_features(timestamp)
-        
-        adjustment = np.zeros(self.input_dim)
-        for name, features in seasonal_features.items():
-            # Add weighted seasonal component
-            adjustment += self.seasonal_weights[name] @ features
-        
-        return x + adjustment
+        if isinstance(timestamps, datetime):
+            timestamps = timestamps.timestamp()
+        if np.ndim(timestamps) == 0:
+            # Scalar path for per-step encode: plain floats beat tiny-array ufuncs
+            elapsed = float(timestamps) - self._ref_epoch
+            out = []
+            if self._phase_tables is None:
+                for period in self.seasonal_periods.values():
+                    phase = 2 * math.pi * (elapsed % period) / period
+                    out += (math.cos(phase), math.sin(phase))
+            else:
+                for period, table in zip(self.seasonal_periods.values(), self._phase_tables):
+                    out += table[round((elapsed % period) / period * len(table)) % len(table)].tolist()
+            return np.array(out, dtype=self.dtype)
+        elapsed = np.asarray(timestamps, dtype=np.float64) - self._ref_epoch
+        frac = np.mod(elapsed[..., None], self._periods) / self._periods
+        
+        if self._phase_tables is None:
+            phase = 2 * np.pi * frac
+            features = np.stack([np.cos(phase), np.sin(phase)], axis=-1)
+        else:
+            features = np.empty(frac.shape + (2,))
+            for i, table in enumerate(self._phase_tables):
+                idx = np.rint(frac[..., i] * len(table)).astype(np.intp) % len(table)
+                features[..., i, :] = table[idx]
+        
+        return features.reshape(frac.shape[:-1] + (-1,)).astype(self.dtype)
     
-    def encode(self, x: np.ndarray, timestamp: Optional[datetime] = None) -> np.ndarray:
+    def encode(self, x: np.ndarray, timestamp: Optional[Timestamp] = None) -> np.ndarray:
         """
         Encode observation with seasonal awareness
         
         Args:
             x: Input observation (input_dim,)
-            timestamp: Optional timestamp (uses current time if None)
+            timestamp: Optional datetime or epoch seconds (uses current time if None)
         
         Returns:
             z: Latent state (latent_dim,)
         """
-        if timestamp is None:
-            timestamp = datetime.now()
-        
-        self.current_time = timestamp
+        self._current_epoch = time.time() if timestamp is None else to_epoch(timestamp)
+        self._current_features = self._compute_seasonal_features(self._current_epoch)
+        x = np.asarray(x, dtype=self.dtype)
         
         # Remove trend
         x_detrended = x - self.trend
@@ -124,21 +195,62 @@ class SeasonalBackend:
         self.trend = self.trend_alpha * x + (1 - self.trend_alpha) * self.trend
         
         # Apply seasonal adjustment
-        x_adjusted = self._apply_seasonal_adjustment(x_detrended, timestamp)
+        x_adjusted = x_detrended + self.W @ self._current_features
         
         # Standard encoding
         self.z = np.tanh(self.C.T @ x_adjusted)
         
         return self.z.copy()
     
-    def predict(self, z: np.ndarray, steps: int = 1, future_time: Optional[datetime] = None) -> np.ndarray:
+    def encode_many(self, xs: np.ndarray, timestamps: Sequence[Timestamp]) -> np.ndarray:
+        """
+        Encode a sequence of observations, e.g. to replay historical telemetry
+        
+        Equivalent to calling encode on each row in order (the trend carries
+        over between rows), but the seasonal features, adjustment and
+        projection are computed for the whole batch at once.
+        
+        Args:
+            xs: Observations (n, input_dim), oldest first
+            timestamps: Datetimes or epoch seconds, one per row
+        
+        Returns:
+            zs: Latent states (n, latent_dim)
+        """
+        xs = np.asarray(xs, dtype=self.dtype)
+        if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind in "fiu":
+            epochs = timestamps.astype(np.float64)
+        else:
+            epochs = np.fromiter((to_epoch(t) for t in timestamps), dtype=np.float64, count=len(xs))
+        if len(xs) == 0:
+            return np.zeros((0, self.latent_dim), dtype=self.dtype)
+        
+        # The trend EMA is the only sequential part; each row is detrended
+        # against the trend left by the previous row
+        prev_trend = np.empty_like(xs)
+        trend = self.trend
+        a, b = self.dtype.type(self.trend_alpha), self.dtype.type(1 - self.trend_alpha)
+        for i, x in enumerate(xs):
+            prev_trend[i] = trend
+            trend = a * x + b * trend
+        
+        features = self._compute_seasonal_features(epochs)
+        zs = np.tanh((xs - prev_trend + features @ self.W.T) @ self.C)
+        
+        self.trend = trend
+        self._current_epoch = float(epochs[-1])
+        self._current_features = features[-1]
+        self.z = zs[-1].copy()
+        return zs
+    
+    def predict(self, z: np.ndarray, steps: int = 1, future_time: Optional[Timestamp] = None) -> np.ndarray:
         """
         Predict future latent state with seasonal awareness
         
         Args:
             z: Current latent state (latent_dim,)
             steps: Number of steps ahead
-            future_time: Target timestamp for prediction
+            future_time: Target datetime or epoch seconds for prediction
         
         Returns:
             z_future: Predicted latent state
@@ -151,14 +263,8 @@ class SeasonalBackend:
         # If we have a future time, adjust for seasonal shift
         if future_time is not None:
             # Compute seasonal difference
-            current_features = self._compute_seasonal_features(self.current_time)
-            future_features = self._compute_seasonal_features(future_time)
-            
-            # Adjust prediction based on seasonal change
-            seasonal_delta = np.zeros(self.input_dim)
-            for name in self.seasonal_periods:
-                delta_features = future_features[name] - current_features[name]
-                seasonal_delta += self.seasonal_weights[name] @ delta_features
+            delta_features = self._compute_seasonal_features(to_epoch(future_time)) - self._current_features
+            seasonal_delta = self.W @ delta_features
             
             # Project seasonal adjustment to latent space
             z_adjustment = self.C.T @ seasonal_delta
@@ -186,6 +292,8 @@ class SeasonalBackend:
             x: Observed input (input_dim,)
             z: Current latent state (latent_dim,)
         """
+        x = np.asarray(x, dtype=self.dtype)
+        
         # Predict observation
         x_pred = self.decode(z)
         
@@ -194,11 +302,34 @@ class SeasonalBackend:
         self.pe = np.linalg.norm(error)
         
         # Update seasonal weights based on error
-        seasonal_features = self._compute_seasonal_features(self.current_time)
-        for name, features in seasonal_features.items():
-            # Gradient: ∂L/∂w = -error @ features^T
-            grad = -error[:, None] @ features[None, :]
-            self.seasonal_weights[name] += self.lr * grad
+        # Gradient: ∂L/∂W = -error @ features^T
+        grad = -error[:, None] @ self._current_features[None, :]
+        self.W += self.lr * grad
+    
+    def state_dict(self) -> Dict[str, Any]:
+        """Arrays and scalars needed to resume (see PsiEngine.snapshot)"""
+        return {
+            "A": self.A.copy(), "C": self.C.copy(), "z": self.z.copy(), "trend": self.trend.copy(),
+            "seasonal_weights": {name: w.copy() for name, w in self.seasonal_weights.items()},
+            "trend_alpha": float(self.trend_alpha), "pe": float(self.pe), "lr": float(self.lr),
+            "ref_time": self.ref_time.isoformat(), "current_time": self.current_time.isoformat(),
+            "ref_epoch": self._ref_epoch, "current_epoch": self._current_epoch,
+        }
+    
+    def load_state_dict(self, state: Dict[str, Any]):
+        """Restore a state produced by state_dict()"""
+        for name in ("A", "C", "z", "trend"):
+            setattr(self, name, np.array(state[name], dtype=self.dtype))
+        for name, w in state["seasonal_weights"].items():
+            self.set_seasonal_weights(name, w)
+        self.trend_alpha = float(state["trend_alpha"])
+        self.pe = float(state["pe"])
+        self.lr = float(state["lr"])
+        # the seasonal phase is anchored to ref_time, so it must survive a restart;
+        # snapshots without epoch fields fall back to the ISO timestamps
+        self._ref_epoch = float(state.get("ref_epoch", to_epoch(datetime.fromisoformat(state["ref_time"]))))
+        self._current_epoch = float(state.get("current_epoch", to_epoch(datetime.fromisoformat(state["current_time"]))))
+        self._current_features = self._compute_seasonal_features(self._current_epoch)
     
     def get_prediction_error(self) -> float:
         """Get current prediction error"""
@@ -206,8 +337,8 @@ class SeasonalBackend:
     
     def reset_state(self):
         """Reset state and trend"""
-        self.z = np.zeros(self.latent_dim)
-        self.trend = np.zeros(self.input_dim)
+        self.z = np.zeros(self.latent_dim, dtype=self.dtype)
+        self.trend = np.zeros(self.input_dim, dtype=self.dtype)
         self.pe = 0.0
     
     def increase_noise(self, factor: float = 1.5):
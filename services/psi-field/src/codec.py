@@ -0,0 +1,199 @@
+"""
+Binary Telemetry Codec for Ψ-Field Service
+------------------------------------------
+Versioned compact encoding for RabbitMQ telemetry and federation payloads:
+a fixed header with a schema id, an agent-id table and packed little-endian
+records with float32 metrics and epoch-nanosecond timestamps
+"""
+
+import math
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .streaming import RESULT_METRICS
+
+# Media types; consumers opt in to the binary one (Accept header, or the
+# AMQP content_type of each message)
+TELEMETRY_JSON = "application/json"
+TELEMETRY_BINARY = "application/vnd.vaultmesh.psi-telemetry"
+CONTENT_TYPES = (TELEMETRY_JSON, TELEMETRY_BINARY)
+
+MAGIC = b"PSIT"
+HEADER = np.dtype([("magic", "S4"), ("schema", "<u2"), ("agents", "<u2"), ("count", "<u4")])
+
+FEDERATION_METRICS = ("C", "U", "Phi", "H", "PE", "M")
+
+# Schema 1: one step's telemetry (main.telemetry_payload), 50 bytes
+SCHEMA_TELEMETRY_V1 = 1
+TELEMETRY_V1 = np.dtype(
+    [("timestamp_ns", "<i8"), ("k", "<u8"), ("agent", "<u2")] + [(name, "<f4") for name in RESULT_METRICS]
+)
+
+# Schema 2: federation metrics (PsiFederation.publish_metrics), 42 bytes;
+# a missing phase is NaN
+SCHEMA_FEDERATION_V1 = 2
+FEDERATION_V1 = np.dtype(
+    [("timestamp_ns", "<i8"), ("agent", "<u2"), ("psi", "<f4")]
+    + [(name, "<f4") for name in FEDERATION_METRICS]
+    + [("phase_real", "<f4"), ("phase_imag", "<f4")]
+)
+
+SCHEMAS = {SCHEMA_TELEMETRY_V1: TELEMETRY_V1, SCHEMA_FEDERATION_V1: FEDERATION_V1}
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+
+def wants_binary(accept: str) -> bool:
+    """True if an Accept header opts in to TELEMETRY_BINARY"""
+    for part in accept.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        if fields[0] != TELEMETRY_BINARY:
+            continue
+        q = next((f[2:] for f in fields[1:] if f.startswith("q=")), "1")
+        try:
+            return float(q) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def iso_to_ns(timestamp: str) -> int:
+    """ISO timestamp (naive means UTC, as datetime.utcnow().isoformat()) to epoch nanoseconds"""
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _US * 1000
+
+
+def ns_to_iso(ns: int) -> str:
+    """Inverse of iso_to_ns (microsecond resolution)"""
+    return (_EPOCH + timedelta(microseconds=int(ns) // 1000)).isoformat()
+
+
+def _pack(schema: int, agents: Dict[str, int], records: np.ndarray) -> bytes:
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"], header["schema"], header["agents"], header["count"] = MAGIC, schema, len(agents), len(records)
+    table = bytearray()
+    for agent_id in agents:
+        raw = agent_id.encode("utf-8")
+        if len(raw) > 255:
+            raise ValueError(f"agent id longer than 255 bytes: {agent_id[:32]}...")
+        table.append(len(raw))
+        table += raw
+    return header.tobytes() + bytes(table) + records.tobytes()
+
+
+def _agent_index(agents: Dict[str, int], agent_id: str) -> int:
+    if agent_id not in agents:
+        if len(agents) == 0xFFFF:
+            raise ValueError("more than 65535 agents in one message")
+        agents[agent_id] = len(agents)
+    return agents[agent_id]
+
+
+def encode_telemetry(records: Sequence[Dict[str, Any]]) -> bytes:
+    """
+    Pack telemetry records (main.telemetry_payload dicts) as schema 1
+
+    Args:
+        records: Dicts with agent_id, k, RESULT_METRICS and an ISO timestamp
+
+    Returns:
+        Encoded message
+    """
+    agents: Dict[str, int] = {}
+    out = np.empty(len(records), dtype=TELEMETRY_V1)
+    out["agent"] = [_agent_index(agents, rec["agent_id"]) for rec in records]
+    out["k"] = [rec["k"] for rec in records]
+    out["timestamp_ns"] = [iso_to_ns(rec["timestamp"]) for rec in records]
+    for name in RESULT_METRICS:
+        out[name] = [rec[name] for rec in records]
+    return _pack(SCHEMA_TELEMETRY_V1, agents, out)
+
+
+def encode_federation(data: Dict[str, Any]) -> bytes:
+    """
+    Pack one federation payload (agent_id, psi, metrics, timestamp, optional phase) as schema 2
+
+    Args:
+        data: Payload as built by PsiFederation.publish_metrics; timestamp in epoch seconds
+
+    Returns:
+        Encoded message
+    """
+    out = np.zeros(1, dtype=FEDERATION_V1)
+    out["timestamp_ns"] = data.get("timestamp_ns", round(data["timestamp"] * 1e9))
+    out["psi"] = data["psi"]
+    for name in FEDERATION_METRICS:
+        out[name] = data["metrics"].get(name, 0.0)
+    phase = data.get("phase")
+    out["phase_real"] = phase["real"] if phase else math.nan
+    out["phase_imag"] = phase["imag"] if phase else math.nan
+    return _pack(SCHEMA_FEDERATION_V1, {data["agent_id"]: 0}, out)
+
+
+def decode(data: bytes) -> Tuple[int, List[str], np.ndarray]:
+    """
+    Split an encoded message into its parts
+
+    Args:
+        data: Message from encode_telemetry or encode_federation
+
+    Returns:
+        (schema id, agent ids, structured array of records)
+
+    Raises:
+        ValueError: Not a telemetry message, unknown schema, or truncated
+    """
+    if len(data) < HEADER.itemsize:
+        raise ValueError("truncated telemetry message")
+    header = np.frombuffer(data, dtype=HEADER, count=1)[0]
+    if header["magic"] != MAGIC:
+        raise ValueError("not a psi-field telemetry message")
+    schema = int(header["schema"])
+    if schema not in SCHEMAS:
+        raise ValueError(f"unsupported telemetry schema {schema}")
+    offset = HEADER.itemsize
+    agents = []
+    for _ in range(int(header["agents"])):
+        n = data[offset]
+        agents.append(bytes(data[offset + 1:offset + 1 + n]).decode("utf-8"))
+        offset += 1 + n
+    count = int(header["count"])
+    if len(data) - offset != count * SCHEMAS[schema].itemsize:
+        raise ValueError("truncated telemetry message")
+    return schema, agents, np.frombuffer(data, dtype=SCHEMAS[schema], count=count, offset=offset)
+
+
+def decode_telemetry(data: bytes) -> List[Dict[str, Any]]:
+    """Telemetry dicts from a schema 1 message (metrics rounded to float32)"""
+    schema, agents, rows = decode(data)
+    if schema != SCHEMA_TELEMETRY_V1:
+        raise ValueError(f"expected telemetry schema {SCHEMA_TELEMETRY_V1}, got {schema}")
+    columns = {name: rows[name].tolist() for name in RESULT_METRICS}
+    out = []
+    for i, (agent, k, ns) in enumerate(zip(rows["agent"].tolist(), rows["k"].tolist(), rows["timestamp_ns"].tolist())):
+        rec = {"agent_id": agents[agent], "k": k}
+        rec.update({name: columns[name][i] for name in RESULT_METRICS})
+        rec["timestamp"] = ns_to_iso(ns)
+        out.append(rec)
+    return out
+
+
+def decode_federation(data: bytes) -> Dict[str, Any]:
+    """Federation payload dict from a schema 2 message (as sent in JSON)"""
+    schema, agents, rows = decode(data)
+    if schema != SCHEMA_FEDERATION_V1 or len(rows) != 1:
+        raise ValueError(f"expected one federation record (schema {SCHEMA_FEDERATION_V1}), got schema {schema}")
+    row = rows[0]
+    out = {
+        "agent_id": agents[int(row["agent"])],
+        "psi": float(row["psi"]),
+        "metrics": {name: float(row[name]) for name in FEDERATION_METRICS},
+        "timestamp": int(row["timestamp_ns"]) / 1e9,
+    }
+    if not math.isnan(row["phase_real"]):
+        out["phase"] = {"real": float(row["phase_real"]), "imag": float(row["phase_imag"])}
+    return out
@@ -14,6 +14,8 @@ import numpy as np
 import httpx
 from typing import Dict, List, Any, Optional, Tuple
 
+from .codec import CONTENT_TYPES, TELEMETRY_BINARY, TELEMETRY_JSON, decode_federation, encode_federation
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +30,11 @@ class PsiFederation:
         self.peers = []
         self.agent_id = f"psi-field-{os.getenv('HOSTNAME', 'local')}"
         self.federation_enabled = False
+        # Payload encoding for metrics POSTed to peers and preferred when fetching theirs
+        self.content_type = os.getenv("FEDERATION_CONTENT_TYPE", TELEMETRY_JSON)
+        if self.content_type not in CONTENT_TYPES:
+            logger.warning(f"Unknown FEDERATION_CONTENT_TYPE {self.content_type!r}, using JSON")
+            self.content_type = TELEMETRY_JSON
         self.load_config(config_path)
         
         self.metrics = {
@@ -38,6 +45,9 @@ class PsiFederation:
             "Psi_swarm": 0.0,
         }
         
+        # Latest metrics pushed by each peer agent (POST /federation/metrics)
+        self.peer_metrics: Dict[str, Dict[str, Any]] = {}
+        
         # Weights for swarm Ψ calculation
         self.weights = {
             "v1": 0.7,  # C_swarm
@@ -76,11 +86,12 @@ class PsiFederation:
             return
             
         # Prepare data to publish
+        now_ns = time.time_ns()
         data = {
             "agent_id": self.agent_id,
             "psi": psi,
             "metrics": metrics,
-            "timestamp": time.time()
+            "timestamp": now_ns / 1e9
         }
         
         # Include phase information if available
@@ -90,13 +101,20 @@ class PsiFederation:
                 "imag": float(phase.imag)
             }
         
+        # Encode once for all peers
+        if self.content_type == TELEMETRY_BINARY:
+            body = encode_federation(dict(data, timestamp_ns=now_ns))
+        else:
+            body = json.dumps(data).encode("utf-8")
+        headers = {"Content-Type": self.content_type}
+        
         # Send to all peers
         tasks = []
         for peer in self.peers:
             try:
                 url = f"{peer}/federation/metrics"
                 async with httpx.AsyncClient() as client:
-                    tasks.append(client.post(url, json=data, timeout=2.0))
+                    tasks.append(client.post(url, content=body, headers=headers, timeout=2.0))
             except Exception as e:
                 logger.error(f"Failed to publish to peer {peer}: {e}")
                 
@@ -118,9 +136,9 @@ class PsiFederation:
             try:
                 url = f"{peer}/federation/metrics"
                 async with httpx.AsyncClient() as client:
-                    response = await client.get(url, timeout=2.0)
+                    response = await client.get(url, headers=self.accept_headers(), timeout=2.0)
                     if response.status_code == 200:
-                        metrics = response.json()
+                        metrics = self.parse_metrics(response.headers.get("content-type", ""), response.content)
                         all_metrics.append(metrics)
                         
                         # Extract phase information for Phi_swarm calculation
@@ -159,6 +177,38 @@ class PsiFederation:
             
         return self.metrics
     
+    def accept_headers(self) -> Dict[str, str]:
+        """Accept header for peer metrics: binary first when opted in, JSON always accepted"""
+        if self.content_type == TELEMETRY_BINARY:
+            return {"Accept": f"{TELEMETRY_BINARY}, {TELEMETRY_JSON};q=0.5"}
+        return {"Accept": TELEMETRY_JSON}
+    
+    @staticmethod
+    def parse_metrics(content_type: str, body: bytes) -> Dict[str, Any]:
+        """Peer metrics payload from either encoding"""
+        if content_type.split(";")[0].strip() == TELEMETRY_BINARY:
+            return decode_federation(body)
+        return json.loads(body)
+    
+    def receive_metrics(self, payload: Dict[str, Any]) -> str:
+        """
+        Keep the latest metrics a peer pushed with publish_metrics
+        
+        Args:
+            payload: Decoded payload (see parse_metrics)
+        
+        Returns:
+            The peer's agent_id
+        
+        Raises:
+            ValueError: Payload lacks an agent_id, psi or metrics mapping
+        """
+        agent_id = payload.get("agent_id")
+        if not isinstance(agent_id, str) or "psi" not in payload or not isinstance(payload.get("metrics"), dict):
+            raise ValueError("federation metrics need an agent_id, psi and a metrics mapping")
+        self.peer_metrics[agent_id] = dict(payload, psi=float(payload["psi"]), received_at=time.time())
+        return agent_id
+    
     def _sigmoid(self, x):
         """Squashing function"""
         return 1.0 / (1.0 + np.exp(-x))
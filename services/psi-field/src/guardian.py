@@ -98,6 +98,10 @@ class Guardian:
         
         return state
     
+    def process_batch(self, states: List[Dict[str, Any]], ks: List[int]) -> List[Dict[str, Any]]:
+        """Process consecutive states in order (static thresholds need no batch pass)"""
+        return [self.process_state(state, k) for state, k in zip(states, ks)]
+    
     def select_intervention(self, state: Dict[str, Any], reason: str) -> str:
         """Select appropriate intervention based on threat"""
         if reason == "high_PE":
@@ -164,4 +168,18 @@ class Guardian:
                 'action': action,
                 'success': False,
                 'error': f"Unknown intervention: {action}"
-            }
\ No newline at end of file
+            }
+    
+    def state_dict(self) -> Dict[str, Any]:
+        """Intervention state persisted alongside the engine snapshot"""
+        return {
+            "red_flag": self._red_flag,
+            "red_flag_reason": self._red_flag_reason,
+            "last_intervention_step": self._last_intervention_step,
+        }
+    
+    def load_state_dict(self, state: Dict[str, Any]):
+        """Restore a state produced by state_dict()"""
+        self._red_flag = bool(state["red_flag"])
+        self._red_flag_reason = state["red_flag_reason"]
+        self._last_intervention_step = int(state["last_intervention_step"])
@@ -6,8 +6,9 @@ Adaptive threat detection using rolling statistics
 
 import logging
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple, Deque
-from collections import deque
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .rolling import RollingWindow
 
 logger = logging.getLogger(__name__)
 
@@ -38,16 +39,19 @@ class AdvancedGuardian:
         self.intervention_cooldown = intervention_cooldown
         self.min_samples = min_samples
         
-        # Rolling history buffers
-        self.pe_history: Deque[float] = deque(maxlen=history_window)
-        self.h_history: Deque[float] = deque(maxlen=history_window)
-        self.psi_history: Deque[float] = deque(maxlen=history_window)
+        # Rolling history buffers (sorted windows: O(log n) percentiles, O(1) mean/std)
+        self.pe_history = RollingWindow(history_window)
+        self.h_history = RollingWindow(history_window)
+        self.psi_history = RollingWindow(history_window)
         
         # Fallback static thresholds (used until enough samples)
         self.static_psi_low = 0.25
         self.static_pe_high = 2.0
         self.static_h_high = 2.2
         
+        # Thresholds after the latest sample, computed once per step
+        self._thresholds = (self.static_psi_low, self.static_pe_high, self.static_h_high)
+        
         # State
         self._red_flag = False
         self._red_flag_reason = None
@@ -78,13 +82,21 @@ class AdvancedGuardian:
                 self.static_h_high
             )
         
-        # Compute percentiles
-        psi_low = np.percentile(list(self.psi_history), 100 - self.percentile_threshold)
-        pe_high = np.percentile(list(self.pe_history), self.percentile_threshold)
-        h_high = np.percentile(list(self.h_history), self.percentile_threshold)
+        # Percentiles from the sorted windows (same values as np.percentile)
+        psi_low = self.psi_history.quantile(100 - self.percentile_threshold)
+        pe_high = self.pe_history.quantile(self.percentile_threshold)
+        h_high = self.h_history.quantile(self.percentile_threshold)
         
         return (psi_low, pe_high, h_high)
     
+    def _observe(self, psi: float, pe: float, h: float) -> Tuple[float, float, float]:
+        """Append one step's metrics and refresh the thresholds"""
+        self.psi_history.append(psi)
+        self.pe_history.append(pe)
+        self.h_history.append(h)
+        self._thresholds = self._compute_thresholds()
+        return self._thresholds
+    
     def assess_threat(self, state: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """
         Assess if the system is in a threatened state using adaptive thresholds
@@ -100,15 +112,14 @@ class AdvancedGuardian:
         pe = state.get('PE', 0.0)
         h = state.get('H', 0.0)
         
-        # Update history
-        self.psi_history.append(psi)
-        self.pe_history.append(pe)
-        self.h_history.append(h)
+        # Update history and thresholds
+        psi_low, pe_high, h_high = self._observe(psi, pe, h)
         
-        # Get current thresholds
-        psi_low, pe_high, h_high = self._compute_thresholds()
-        
-        # Check for threats
+        return self._classify(psi, pe, h, psi_low, pe_high, h_high)
+    
+    def _classify(self, psi: float, pe: float, h: float,
+                  psi_low: float, pe_high: float, h_high: float) -> Tuple[bool, Optional[str]]:
+        """Check one set of metrics against thresholds"""
         if pe > pe_high:
             return True, f"high_PE:{pe:.3f}>p{self.percentile_threshold}:{pe_high:.3f}"
         elif psi < psi_low:
@@ -137,6 +148,10 @@ class AdvancedGuardian:
             self._red_flag_reason = reason
             logger.warning(f"Guardian detected threat: {reason} at step {k}")
         
+        return self._annotate(state, k)
+    
+    def _annotate(self, state: Dict[str, Any], k: int) -> Dict[str, Any]:
+        """Intervention/cooldown bookkeeping and the '_guardian' block for one step"""
         # Check if intervention is needed
         intervention = None
         if (
@@ -150,9 +165,6 @@ class AdvancedGuardian:
             logger.info(f"Guardian applying intervention: {intervention} at step {k} "
                        f"(total: {self._intervention_count})")
         
-        # Get current thresholds for transparency
-        psi_low, pe_high, h_high = self._compute_thresholds()
-        
         # Add guardian information to state
         state['_guardian'] = {
             'red_flag': self._red_flag,
@@ -160,17 +172,51 @@ class AdvancedGuardian:
             'intervention': intervention,
             'steps_since_intervention': k - self._last_intervention_step,
             'intervention_count': self._intervention_count,
-            'thresholds': {
-                'psi_low': float(psi_low),
-                'pe_high': float(pe_high),
-                'h_high': float(h_high),
-                'type': 'adaptive' if len(self.psi_history) >= self.min_samples else 'static'
-            },
+            'thresholds': self._threshold_info(),
             'history_size': len(self.psi_history)
         }
         
         return state
     
+    def _threshold_info(self) -> Dict[str, Any]:
+        """Thresholds the latest step was judged against, for transparency"""
+        psi_low, pe_high, h_high = self._thresholds
+        return {
+            'psi_low': float(psi_low),
+            'pe_high': float(pe_high),
+            'h_high': float(h_high),
+            'type': 'adaptive' if len(self.psi_history) >= self.min_samples else 'static'
+        }
+    
+    def process_batch(self, states: List[Dict[str, Any]], ks: Sequence[int]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of consecutive states
+        
+        Equivalent to calling process_state on each state in order, with one
+        summary warning for the batch instead of one per threat.
+        Interventions are reported per state; applying them is up to the caller.
+        
+        Args:
+            states: States in step order
+            ks: Step counter of each state
+        
+        Returns:
+            states: Updated states with guardian info
+        """
+        threats = 0
+        for state, k in zip(states, ks):
+            is_threat, reason = self.assess_threat(state)
+            if is_threat:
+                self._red_flag = True
+                self._red_flag_reason = reason
+                threats += 1
+            self._annotate(state, k)
+        
+        if threats:
+            logger.warning(f"Guardian detected {threats} threats in batch of {len(states)} "
+                           f"(steps {ks[0]}..{ks[-1]}, last: {self._red_flag_reason})")
+        return states
+    
     def select_intervention(self, state: Dict[str, Any], reason: str) -> str:
         """Select appropriate intervention based on threat"""
         # Parse reason to get the metric
@@ -234,6 +280,30 @@ class AdvancedGuardian:
                 'error': f"Unknown intervention: {action}"
             }
     
+    def state_dict(self) -> Dict[str, Any]:
+        """Rolling history and intervention state, persisted with the engine snapshot"""
+        return {
+            "psi_history": np.array(self.psi_history, dtype=float),
+            "pe_history": np.array(self.pe_history, dtype=float),
+            "h_history": np.array(self.h_history, dtype=float),
+            "red_flag": self._red_flag,
+            "red_flag_reason": self._red_flag_reason,
+            "last_intervention_step": self._last_intervention_step,
+            "intervention_count": self._intervention_count,
+        }
+    
+    def load_state_dict(self, state: Dict[str, Any]):
+        """Restore a state produced by state_dict(); adaptive thresholds resume immediately"""
+        for name in ("psi_history", "pe_history", "h_history"):
+            buf = getattr(self, name)
+            buf.clear()
+            buf.extend(float(v) for v in state[name])
+        self._red_flag = bool(state["red_flag"])
+        self._red_flag_reason = state["red_flag_reason"]
+        self._last_intervention_step = int(state["last_intervention_step"])
+        self._intervention_count = int(state["intervention_count"])
+        self._thresholds = self._compute_thresholds()
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get guardian statistics"""
         if len(self.psi_history) < 2:
@@ -251,22 +321,22 @@ class AdvancedGuardian:
             },
             'statistics': {
                 'psi': {
-                    'mean': float(np.mean(list(self.psi_history))),
-                    'std': float(np.std(list(self.psi_history))),
-                    'min': float(np.min(list(self.psi_history))),
-                    'max': float(np.max(list(self.psi_history)))
+                    'mean': self.psi_history.mean(),
+                    'std': self.psi_history.std(),
+                    'min': self.psi_history.min(),
+                    'max': self.psi_history.max()
                 },
                 'pe': {
-                    'mean': float(np.mean(list(self.pe_history))),
-                    'std': float(np.std(list(self.pe_history))),
-                    'p95': float(np.percentile(list(self.pe_history), 95)),
-                    'max': float(np.max(list(self.pe_history)))
+                    'mean': self.pe_history.mean(),
+                    'std': self.pe_history.std(),
+                    'p95': self.pe_history.quantile(95),
+                    'max': self.pe_history.max()
                 },
                 'h': {
-                    'mean': float(np.mean(list(self.h_history))),
-                    'std': float(np.std(list(self.h_history))),
-                    'p95': float(np.percentile(list(self.h_history), 95)),
-                    'max': float(np.max(list(self.h_history)))
+                    'mean': self.h_history.mean(),
+                    'std': self.h_history.std(),
+                    'p95': self.h_history.quantile(95),
+                    'max': self.h_history.max()
                 }
             },
             'interventions': {
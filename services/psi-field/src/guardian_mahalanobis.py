@@ -0,0 +1,296 @@
+"""
+Multivariate Guardian with Online Mahalanobis Scoring
+-----------------------------------------------------
+Joint anomaly detection over the full metric vector: a running mean and
+covariance with a Cholesky factor that is updated, never re-factorized
+"""
+
+import logging
+import math
+import numpy as np
+from statistics import NormalDist
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .guardian_advanced import AdvancedGuardian
+
+logger = logging.getLogger(__name__)
+
+# State keys scored jointly (dt_eff is a function of Psi, so it is left out)
+METRICS = ("Psi", "C", "U", "Phi", "H", "PE", "M")
+
+
+def chi2_quantile(p: float, dof: int) -> float:
+    """
+    Chi-square quantile via the Wilson-Hilferty approximation
+
+    Args:
+        p: Probability in (0, 1)
+        dof: Degrees of freedom
+
+    Returns:
+        x such that P(chi2_dof <= x) ~= p (within ~1% for dof >= 3)
+    """
+    z = NormalDist().inv_cdf(p)
+    a = 2.0 / (9.0 * dof)
+    return dof * (1.0 - a + z * math.sqrt(a)) ** 3
+
+
+def cholupdate(L: List[List[float]], x: Sequence[float]):
+    """
+    Rank-one update in place: L becomes the Cholesky factor of L L^T + x x^T
+
+    Args:
+        L: Lower-triangular factor as a list of rows (modified)
+        x: Update vector (not modified)
+    """
+    x = list(x)
+    d = len(x)
+    for k in range(d):
+        row_k = L[k]
+        lkk = row_k[k]
+        r = math.hypot(lkk, x[k])
+        c = r / lkk
+        s = x[k] / lkk
+        row_k[k] = r
+        for i in range(k + 1, d):
+            row_i = L[i]
+            row_i[k] = (row_i[k] + s * x[i]) / c
+            x[i] = c * x[i] - s * row_i[k]
+
+
+def forward_solve(L: List[List[float]], b: Sequence[float]) -> List[float]:
+    """Solve L y = b for lower-triangular L"""
+    y = []
+    for i, row in enumerate(L):
+        acc = b[i]
+        for j in range(i):
+            acc -= row[j] * y[j]
+        y.append(acc / row[i])
+    return y
+
+
+def backward_solve(L: List[List[float]], y: Sequence[float]) -> List[float]:
+    """Solve L^T w = y for lower-triangular L"""
+    d = len(y)
+    w = [0.0] * d
+    for i in range(d - 1, -1, -1):
+        acc = y[i]
+        for j in range(i + 1, d):
+            acc -= L[j][i] * w[j]
+        w[i] = acc / L[i][i]
+    return w
+
+
+class MahalanobisGuardian(AdvancedGuardian):
+    """
+    Guardian that scores each step by its Mahalanobis distance from the
+    recent joint distribution of all metrics.
+
+    The mean and covariance are exponentially weighted with an effective
+    window of history_window steps (exact Welford moments while the window
+    fills). Each step rescales the Cholesky factor and applies one rank-one
+    update, so scoring is two triangular passes over a 7x7 factor. A
+    diagonal ridge keeps the factor well-conditioned when a metric is
+    constant; it is topped back up with rank-one updates every few steps.
+
+    D^2 is compared with the chi-square quantile at percentile_threshold;
+    the metric contributing most to D^2 names the threat ("high_PE",
+    "low_Psi", ...) and picks the intervention.
+    """
+
+    def __init__(
+        self,
+        history_window: int = 200,
+        percentile_threshold: float = 99.0,
+        intervention_cooldown: int = 100,
+        min_samples: int = 50,
+        metrics: Sequence[str] = METRICS,
+        ridge: float = 1e-4
+    ):
+        """
+        Initialize Mahalanobis Guardian
+
+        Args:
+            history_window: Effective window of the moving mean/covariance
+            percentile_threshold: Chi-square percentile D^2 must exceed
+            intervention_cooldown: Minimum steps between interventions
+            min_samples: Steps scored with static thresholds before D^2 is used
+            metrics: State keys forming the scored vector
+            ridge: Variance floor added to every metric's diagonal
+        """
+        super().__init__(history_window, percentile_threshold, intervention_cooldown, min_samples)
+        self.metrics = tuple(metrics)
+        self.ridge = ridge
+        self.ridge_every = max(1, history_window // 8)
+        self.d2_threshold = chi2_quantile(percentile_threshold / 100.0, len(self.metrics))
+        self._reset_moments()
+
+        logger.info(f"MahalanobisGuardian initialized: {len(self.metrics)} metrics, "
+                    f"D2 > {self.d2_threshold:.2f} (chi2 p{percentile_threshold})")
+
+    def _reset_moments(self):
+        d = len(self.metrics)
+        root = math.sqrt(self.ridge)
+        self.samples = 0
+        self._mean = [0.0] * d
+        self._chol = [[root if i == j else 0.0 for j in range(d)] for i in range(d)]
+        # Product of covariance decay factors since the ridge was last restored
+        self._ridge_decay = 1.0
+        self._since_ridge = 0
+        self.last_d2 = 0.0
+        self._last_shares = [0.0] * d
+        self._last_dev = [0.0] * d
+
+    def _update(self, x: Sequence[float]) -> float:
+        """
+        Score x against the current moments, then fold it in
+
+        Returns:
+            Squared Mahalanobis distance of x before the update
+        """
+        self.samples += 1
+        alpha = 1.0 / min(self.samples, self.history_window)
+        dev = [xi - mi for xi, mi in zip(x, self._mean)]
+        self._mean = [mi + alpha * di for mi, di in zip(self._mean, dev)]
+        self._last_dev = dev
+        if self.samples == 1:
+            return 0.0
+
+        y = forward_solve(self._chol, dev)
+        d2 = math.fsum(v * v for v in y)
+        self.last_d2 = d2
+        if d2 > self.d2_threshold:
+            # Per-metric shares of D^2 (dev_i * (cov^-1 dev)_i), against the pre-update factor
+            w = backward_solve(self._chol, y)
+            self._last_shares = [di * wi for di, wi in zip(dev, w)]
+
+        # cov' = (1 - alpha) * (cov + alpha * dev dev^T)
+        shrink = math.sqrt(1.0 - alpha)
+        for row in self._chol:
+            for j in range(len(row)):
+                row[j] *= shrink
+        gain = math.sqrt(alpha * (1.0 - alpha))
+        cholupdate(self._chol, [gain * v for v in dev])
+
+        self._ridge_decay *= 1.0 - alpha
+        self._since_ridge += 1
+        if self._since_ridge >= self.ridge_every:
+            self._restore_ridge()
+        return d2
+
+    def _restore_ridge(self):
+        """Add back the part of the ridge the decay has worn off (d rank-one updates)"""
+        root = math.sqrt(self.ridge * (1.0 - self._ridge_decay))
+        d = len(self.metrics)
+        for i in range(d):
+            e = [0.0] * d
+            e[i] = root
+            cholupdate(self._chol, e)
+        self._ridge_decay = 1.0
+        self._since_ridge = 0
+
+    def _attribute(self) -> Tuple[str, float]:
+        """Metric with the largest share of the last D^2, and its deviation"""
+        shares = self._last_shares
+        top = max(range(len(shares)), key=shares.__getitem__)
+        return self.metrics[top], self._last_dev[top]
+
+    def assess_threat(self, state: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Assess if the system is in a threatened state using D^2 over all metrics
+
+        Args:
+            state: Current state dictionary
+
+        Returns:
+            (is_threat, reason)
+        """
+        psi = state.get('Psi', 1.0)
+        pe = state.get('PE', 0.0)
+        h = state.get('H', 0.0)
+
+        # Marginal windows still feed get_statistics()
+        self._observe(psi, pe, h)
+
+        # Non-finite metrics would poison the moments; judge them statically
+        x = [float(state.get(m, 0.0)) for m in self.metrics]
+        finite = all(math.isfinite(v) for v in x)
+        d2 = self._update(x) if finite else 0.0
+
+        if not finite or self.samples <= self.min_samples:
+            return self._classify(psi, pe, h, self.static_psi_low, self.static_pe_high, self.static_h_high)
+        if d2 <= self.d2_threshold:
+            return False, None
+
+        metric, dev = self._attribute()
+        direction = "high" if dev > 0 else "low"
+        return True, (f"{direction}_{metric}:D2={d2:.2f}>"
+                      f"chi2_p{self.percentile_threshold}:{self.d2_threshold:.2f}")
+
+    def _threshold_info(self) -> Dict[str, Any]:
+        if self.samples <= self.min_samples:
+            return {
+                'psi_low': float(self.static_psi_low),
+                'pe_high': float(self.static_pe_high),
+                'h_high': float(self.static_h_high),
+                'type': 'static'
+            }
+        return {
+            'd2': float(self.last_d2),
+            'd2_threshold': float(self.d2_threshold),
+            'type': 'mahalanobis'
+        }
+
+    def select_intervention(self, state: Dict[str, Any], reason: str) -> str:
+        """Nigredo for surprise/entropy-led excursions, Albedo for any other drift"""
+        if "high_PE" in reason or "high_H" in reason:
+            return "nigredo"
+        return "albedo"
+
+    def covariance(self) -> np.ndarray:
+        """Current covariance estimate (including the ridge), L L^T"""
+        L = np.array(self._chol)
+        return L @ L.T
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Rolling history, moments and intervention state, persisted with the engine snapshot"""
+        state = super().state_dict()
+        state.update({
+            "mahalanobis_samples": self.samples,
+            "mahalanobis_mean": np.array(self._mean, dtype=float),
+            "mahalanobis_chol": np.array(self._chol, dtype=float),
+            "mahalanobis_ridge_decay": self._ridge_decay,
+            "mahalanobis_since_ridge": self._since_ridge,
+            "mahalanobis_last_d2": self.last_d2,
+        })
+        return state
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        """Restore a state produced by state_dict(); a percentile-mode state restarts the moments"""
+        super().load_state_dict(state)
+        self._reset_moments()
+        chol = state.get("mahalanobis_chol")
+        if chol is None or np.shape(chol) != (len(self.metrics), len(self.metrics)):
+            return
+        self.samples = int(state["mahalanobis_samples"])
+        self._mean = [float(v) for v in state["mahalanobis_mean"]]
+        self._chol = [[float(v) for v in row] for row in chol]
+        self._ridge_decay = float(state["mahalanobis_ridge_decay"])
+        self._since_ridge = int(state["mahalanobis_since_ridge"])
+        self.last_d2 = float(state["mahalanobis_last_d2"])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get guardian statistics, with the joint moments"""
+        stats = super().get_statistics()
+        if self.samples < 2:
+            return stats
+        std = np.sqrt(np.diag(self.covariance()))
+        stats['thresholds'] = self._threshold_info()
+        stats['mahalanobis'] = {
+            'samples': self.samples,
+            'last_d2': float(self.last_d2),
+            'd2_threshold': float(self.d2_threshold),
+            'mean': {m: float(v) for m, v in zip(self.metrics, self._mean)},
+            'std': {m: float(v) for m, v in zip(self.metrics, std)},
+        }
+        return stats
@@ -0,0 +1,111 @@
+"""
+Ingestion Load Test for Ψ-Field Service
+---------------------------------------
+Compares frames/second through /step, /step/batch and /step/stream
+
+Usage:
+    python -m src.loadtest                          # in-process (TestClient)
+    python -m src.loadtest --url http://localhost:8000 --frames 20000
+"""
+
+import argparse
+import json
+import os
+import time
+import numpy as np
+import httpx
+from typing import Dict, Iterator
+
+from .streaming import RESULT_FRAME, STREAM_BINARY, STREAM_NDJSON
+
+
+def _chunks(data: bytes, size: int) -> Iterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def run(client: httpx.Client, frames: np.ndarray, step_frames: int = 500, batch: int = 256,
+        chunk_frames: int = 64) -> Dict[str, float]:
+    """
+    Push frames through each ingestion path and measure throughput
+
+    Args:
+        client: Client bound to the service (httpx.Client or TestClient)
+        frames: Input vectors (n, dim)
+        step_frames: Frames sent through /step (one request each; capped
+            because it is by far the slowest path)
+        batch: Rows per /step/batch request
+        chunk_frames: Frames per chunk written to /step/stream
+
+    Returns:
+        Frames per second for each path
+    """
+    n, dim = frames.shape
+    rates = {}
+
+    t0 = time.perf_counter()
+    for x in frames[:step_frames]:
+        client.post("/step", json={"x": x.tolist()}).raise_for_status()
+    rates["step"] = min(n, step_frames) / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for i in range(0, n, batch):
+        client.post("/step/batch", json={"xs": frames[i:i + batch].tolist()}).raise_for_status()
+    rates["step_batch"] = n / (time.perf_counter() - t0)
+
+    raw = np.ascontiguousarray(frames, dtype="<f4").tobytes()
+    t0 = time.perf_counter()
+    resp = client.post(f"/step/stream?dim={dim}", content=_chunks(raw, chunk_frames * dim * 4),
+                       headers={"content-type": STREAM_BINARY})
+    resp.raise_for_status()
+    rates["stream_float32"] = n / (time.perf_counter() - t0)
+    if len(resp.content) != n * RESULT_FRAME.itemsize:
+        raise RuntimeError(f"float32 stream returned {len(resp.content)} bytes for {n} frames")
+
+    lines = b"".join(json.dumps(row).encode("utf-8") + b"\n" for row in frames.tolist())
+    t0 = time.perf_counter()
+    resp = client.post("/step/stream", content=_chunks(lines, chunk_frames * dim * 12),
+                       headers={"content-type": STREAM_NDJSON})
+    resp.raise_for_status()
+    rates["stream_ndjson"] = n / (time.perf_counter() - t0)
+    if resp.content.count(b"\n") != n:
+        raise RuntimeError("NDJSON stream returned a different number of results")
+
+    return rates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Service base URL (default: run the app in-process)")
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=int(os.environ.get("PSI_INPUT_DIM", "16")))
+    parser.add_argument("--step-frames", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--chunk-frames", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    frames = np.random.default_rng(args.seed).standard_normal((args.frames, args.dim))
+
+    if args.url:
+        client = httpx.Client(base_url=args.url, timeout=None)
+    else:
+        from fastapi.testclient import TestClient
+        from .main import app
+        client = TestClient(app)
+    with client:
+        rates = run(client, frames, step_frames=args.step_frames, batch=args.batch,
+                    chunk_frames=args.chunk_frames)
+
+    if args.json:
+        print(json.dumps(rates))
+        return
+    base = rates["step"]
+    print(f"{'path':<16}{'frames/s':>12}{'vs /step':>10}")
+    for name, rate in rates.items():
+        print(f"{name:<16}{rate:>12.0f}{rate / base:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,29 +8,40 @@ import os
 import sys
 import json
 import time
+import hashlib
 import subprocess
 import logging
 import asyncio
 import numpy as np
 import uvicorn
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from typing import Dict, List, Any, Optional
+from prometheus_client import CONTENT_TYPE_LATEST
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional
 from datetime import datetime
 
 # Import local modules
 from .federation import federation
 from .mcp import MCPServer
 from .mq import RabbitMQPublisher
+from .streaming import (STREAM_BINARY, STREAM_NDJSON, RESULT_METRICS, DuplexStreamingResponse,
+                        float32_frames, ndjson_frames, encode_results, ndjson_results)
 try:
     from .guardian_advanced import AdvancedGuardian as Guardian
+    from .guardian_mahalanobis import MahalanobisGuardian
     GUARDIAN_KIND = "advanced"
 except ImportError:
     from .guardian import Guardian
     GUARDIAN_KIND = "basic"
 from .remembrancer_client import RemembrancerClient
+from .codec import FEDERATION_METRICS, TELEMETRY_BINARY, encode_federation, wants_binary
+from .worker import EngineWorker, QueueFull
+from .pool import AGENT_ID_PATTERN, EnginePool, Tenant, TenantBudgetExceeded
+from .metrics import MetricsExporter, OutboxCollector, PoolCollector, ProfileCollector, WorkerCollector
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +58,18 @@ RABBIT_EXCHANGE = os.environ.get("RABBIT_EXCHANGE", "swarm")
 PSI_INPUT_DIM = int(os.environ.get("PSI_INPUT_DIM", "16"))
 PSI_LATENT_DIM = int(os.environ.get("PSI_LATENT_DIM", "32"))
 PSI_BACKEND = os.environ.get("PSI_BACKEND", "simple").lower()  # simple|kalman|seasonal
+PSI_DTYPE = os.environ.get("PSI_DTYPE", "float64").lower()  # float64|float32
+PSI_GUARDIAN_MODE = os.environ.get("PSI_GUARDIAN_MODE", "percentile").lower()  # percentile|mahalanobis
+PSI_SEED = int(os.environ["PSI_SEED"]) if os.environ.get("PSI_SEED") else None  # unset = OS entropy
+PSI_SNAPSHOT_PATH = os.environ.get("PSI_SNAPSHOT_PATH", "")  # empty disables checkpointing
+PSI_SNAPSHOT_INTERVAL = float(os.environ.get("PSI_SNAPSHOT_INTERVAL", "60"))
+PSI_PROFILE = os.environ.get("PSI_PROFILE", "0") == "1"  # per-phase PsiEngine.step timing
+PSI_QUEUE_MAX = int(os.environ.get("PSI_QUEUE_MAX", "256"))  # engine jobs admitted before 429
+PSI_POOL_MAX = int(os.environ.get("PSI_POOL_MAX", "256"))  # resident tenant engines (LRU beyond)
+PSI_POOL_IDLE_TTL = float(os.environ.get("PSI_POOL_IDLE_TTL", "900"))  # seconds; 0 disables
+PSI_POOL_DIR = os.environ.get("PSI_POOL_DIR", "")  # evicted tenant snapshots; empty drops their state
+PSI_TENANT_MEMORY_MB = float(os.environ.get("PSI_TENANT_MEMORY_MB", "8"))  # per-tenant budget; 0 disables
+PSI_TENANT_EM_CAPACITY = int(os.environ.get("PSI_TENANT_EM_CAPACITY", "512"))  # episodic slots per tenant
 
 # Add the vaultmesh_psi module to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -172,6 +195,28 @@ guardian = None
 remembrancer_client = None
 mq_publisher = None
 mcp_server = None
+snapshot_task = None
+pool_task = None
+
+# All engine and guardian mutation runs on this worker's thread (see run_on_engine)
+engine_worker = None
+
+# Engines for other agents/sessions, keyed by agent id; AGENT_ID is the
+# global engine above
+engine_pool = None
+
+# Immutable view of the latest state for read endpoints; replaced, never
+# mutated, by the engine worker after every job
+published_state: Mapping[str, Any] = MappingProxyType({})
+
+# Prometheus registry behind /metrics; state gauges are fed by publish_state
+metrics_exporter = MetricsExporter()
+metrics_exporter.register(WorkerCollector(lambda: engine_worker))
+metrics_exporter.register(PoolCollector(lambda: engine_pool))
+metrics_exporter.register(ProfileCollector(lambda: psi_engine))
+metrics_exporter.register(OutboxCollector(lambda: mq_publisher))
+PHASE_ENGINE = metrics_exporter.phase("engine")
+PHASE_GUARDIAN = metrics_exporter.phase("guardian")
 
 # Create FastAPI application
 app = FastAPI(
@@ -211,6 +256,10 @@ class InputVectorRequest(BaseModel):
     x: List[float] = Field(..., description="Input vector for the current step")
     apply_guardian: bool = Field(True, description="Apply guardian processing")
 
+class BatchStepRequest(BaseModel):
+    xs: List[List[float]] = Field(..., description="Input vectors, one row per step, applied in order")
+    apply_guardian: bool = Field(True, description="Apply guardian processing")
+
 class PsiOutput(BaseModel):
     Psi: float = Field(..., description="Consciousness density")
     C: float = Field(..., description="Coherence")
@@ -241,16 +290,16 @@ def verify_psi_field():
         raise HTTPException(status_code=500, detail="Ψ-Field module not available")
     return True
 
-# Initialize the Ψ-Field engine
-def initialize_engine(params_dict: Dict[str, Any]):
-    global psi_engine, backend, params
+def agent_param(agent_id: Optional[str] = Query(
+        None, regex=AGENT_ID_PATTERN,
+        description="Agent/session id of a pooled engine (default: this service's own engine)")) -> Optional[str]:
+    return agent_id
 
+# Build a Ψ-Field engine
+def build_engine(params_dict: Dict[str, Any]):
+    """Create an engine (native or synthetic fallback) without touching the globals"""
     if FALLBACK_MODE or not IMPORT_SUCCESS:
-        psi_engine = FallbackPsiEngine(params_dict)
-        backend = getattr(psi_engine, "backend", "synthetic")
-        params = psi_engine.params
-        logger.warning("Ψ-Field engine initialized in synthetic fallback mode")
-        return psi_engine
+        return FallbackPsiEngine(params_dict)
 
     # Convert the dictionary to a Params object
     p = psi_core.Params(
@@ -271,17 +320,293 @@ def initialize_engine(params_dict: Dict[str, Any]):
         lambda_=params_dict.get("lambda_", 0.6),
         dt_min=params_dict.get("dt_min", 0.05),
         dt_max=params_dict.get("dt_max", 0.5),
+        em_capacity=params_dict.get("em_capacity", 4096),
+        dtype=params_dict.get("dtype", PSI_DTYPE),
+        seed=params_dict.get("seed", PSI_SEED),
     )
     
     # Create backend and engine
-    backend = BackendClass(input_dim=params_dict.get("input_dim", 16), 
-                           latent_dim=params_dict.get("latent_dim", 32))
-    psi_engine = PsiEngine(backend, p)
-    params = p
-    
-    logger.info(f"Initialized Ψ-Field engine with params: {params_dict}")
+    # independent backend and engine streams from one seed
+    backend_seq, engine_seq = np.random.SeedSequence(p.seed).spawn(2)
+    engine_backend = BackendClass(input_dim=params_dict.get("input_dim", 16), 
+                                  latent_dim=params_dict.get("latent_dim", 32),
+                                  dtype=p.dtype,
+                                  rng=np.random.default_rng(backend_seq))
+    return PsiEngine(engine_backend, p, rng=np.random.default_rng(engine_seq), profile=PSI_PROFILE)
+
+# Initialize the Ψ-Field engine
+def initialize_engine(params_dict: Dict[str, Any]):
+    global psi_engine, backend, params
+
+    psi_engine = build_engine(params_dict)
+    backend = psi_engine.backend
+    params = psi_engine.params
+    if FALLBACK_MODE or not IMPORT_SUCCESS:
+        logger.warning("Ψ-Field engine initialized in synthetic fallback mode")
+    else:
+        logger.info(f"Initialized Ψ-Field engine with params: {params_dict}")
     return psi_engine
 
+def build_guardian():
+    """Create a guardian with the service's thresholds"""
+    if GUARDIAN_KIND == "advanced" and PSI_GUARDIAN_MODE == "mahalanobis":
+        return MahalanobisGuardian(
+            history_window=200,
+            percentile_threshold=99.0,
+            intervention_cooldown=100,
+            min_samples=50
+        )
+    if GUARDIAN_KIND == "advanced":
+        return Guardian(
+            history_window=200,
+            percentile_threshold=95.0,
+            intervention_cooldown=100,
+            min_samples=50
+        )
+    return Guardian(
+        psi_low_threshold=0.25,
+        pe_high_threshold=2.0,
+        h_high_threshold=2.2,
+        intervention_cooldown=100
+    )
+
+def build_tenant_engine():
+    """Engine for a pooled tenant: service dimensions, smaller episodic memory"""
+    return build_engine({"input_dim": PSI_INPUT_DIM, "latent_dim": PSI_LATENT_DIM,
+                         "em_capacity": PSI_TENANT_EM_CAPACITY})
+
+# Engine checkpointing
+def save_snapshot() -> Optional[str]:
+    """Write engine and guardian state to PSI_SNAPSHOT_PATH"""
+    if not PSI_SNAPSHOT_PATH or not hasattr(psi_engine, "snapshot"):
+        return None
+    extra = {"guardian": guardian.state_dict()} if hasattr(guardian, "state_dict") else {}
+    return psi_engine.snapshot(PSI_SNAPSHOT_PATH, extra=extra)
+
+def load_snapshot() -> bool:
+    """Restore engine and guardian state from PSI_SNAPSHOT_PATH if a snapshot exists"""
+    if not PSI_SNAPSHOT_PATH or not os.path.exists(PSI_SNAPSHOT_PATH) or not hasattr(psi_engine, "restore"):
+        return False
+    try:
+        extra = psi_engine.restore(PSI_SNAPSHOT_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unusable snapshot {PSI_SNAPSHOT_PATH}: {e}")
+        return False
+    if "guardian" in extra and hasattr(guardian, "load_state_dict"):
+        guardian.load_state_dict(extra["guardian"])
+    return True
+
+async def snapshot_loop():
+    """Periodically checkpoint the engine while it is making progress"""
+    last_k = None
+    while True:
+        await asyncio.sleep(PSI_SNAPSHOT_INTERVAL)
+        k = getattr(psi_engine, "k", None)
+        if k == last_k:
+            continue
+        try:
+            # queued behind pending steps, so it never observes a half-applied one
+            await run_on_engine(save_snapshot, wait=True)
+            last_k = k
+        except Exception as e:
+            logger.error(f"Snapshot failed: {e}")
+
+async def pool_sweep_loop():
+    """Evict idle and over-budget pooled engines even when no steps arrive"""
+    while True:
+        await asyncio.sleep(max(PSI_POOL_IDLE_TTL / 4, 1.0))
+        try:
+            evicted = await run_on_engine(engine_pool.sweep, wait=True)
+            if evicted:
+                logger.info(f"Evicted {len(evicted)} pooled engines")
+        except Exception as e:
+            logger.error(f"Engine pool sweep failed: {e}")
+
+# Metrics carried by step results and telemetry
+STEP_METRICS = RESULT_METRICS
+
+def telemetry_payload(rec: Dict[str, Any], agent_id: str = AGENT_ID) -> Dict[str, Any]:
+    """Telemetry message for one step result"""
+    payload = {"agent_id": agent_id, "k": rec["k"]}
+    payload.update({key: float(rec[key]) for key in STEP_METRICS})
+    payload["timestamp"] = rec["timestamp"]
+    return payload
+
+def federation_metrics(rec: Dict[str, Any]) -> Dict[str, float]:
+    """Component metrics published to federation peers for one step result"""
+    return {key: float(rec[key]) for key in FEDERATION_METRICS}
+
+def apply_intervention(intervention: str, reason: Optional[str], timestamp: str,
+                       tenant: Optional[Tenant] = None):
+    """Apply a guardian-selected intervention to the engine and publish the alert"""
+    engine, guard = (tenant.engine, tenant.guardian) if tenant else (psi_engine, guardian)
+    if intervention == 'nigredo':
+        guard.apply_nigredo(engine)
+    elif intervention == 'albedo':
+        guard.apply_albedo(engine)
+    metrics_exporter.interventions.labels(intervention, "guardian").inc()
+    
+    if mq_publisher:
+        mq_publisher.publish_guardian_alert({
+            "agent_id": tenant.agent_id if tenant else AGENT_ID,
+            "intervention": intervention,
+            "reason": reason,
+            "timestamp": timestamp,
+            "manual": False
+        })
+
+def run_step(x: np.ndarray, apply_guardian: bool, tenant: Optional[Tenant] = None) -> Dict[str, Any]:
+    """
+    One engine step with guardian processing; runs on the engine worker
+    
+    Args:
+        x: Input vector
+        apply_guardian: Normalize the input and run the guardian (and any
+            intervention it selects) on the result
+        tenant: Pooled tenant to step (None steps the global engine)
+    
+    Returns:
+        rec: Step result with timestamp, step counter and guardian info
+    """
+    global last_state
+    engine, guard = (tenant.engine, tenant.guardian) if tenant else (psi_engine, guardian)
+    t0 = time.perf_counter()
+    
+    # Apply Guardian if requested
+    if apply_guardian and guard:
+        x = guard.normalize_input(x)
+    
+    # Execute the step
+    t1 = time.perf_counter()
+    rec = engine.step(x)
+    t2 = time.perf_counter()
+    
+    # Add timestamp and step counter
+    timestamp = datetime.utcnow().isoformat()
+    rec["timestamp"] = timestamp
+    if not hasattr(engine, "k"):
+        engine.k = 0
+    engine.k += 1
+    rec["k"] = engine.k
+    
+    # Store latest state for reference
+    if tenant:
+        tenant.last_state = rec.copy()
+    else:
+        last_state = rec.copy()
+    
+    # Apply Guardian processing
+    if guard and apply_guardian:
+        rec = guard.process_state(rec, engine.k)
+        
+        # Check if Guardian detected a threat and intervention needed
+        if rec['_guardian']['intervention']:
+            apply_intervention(rec['_guardian']['intervention'], rec['_guardian']['reason'], timestamp, tenant)
+    
+    t3 = time.perf_counter()
+    PHASE_ENGINE.observe(t2 - t1)
+    PHASE_GUARDIAN.observe((t1 - t0) + (t3 - t2))
+    metrics_exporter.step_seconds.observe(t3 - t0)
+    return rec
+
+def run_steps(X: np.ndarray, apply_guardian: bool, tenant: Optional[Tenant] = None) -> List[Dict[str, Any]]:
+    """Consecutive run_step calls, one engine job for a stream chunk"""
+    return [run_step(x, apply_guardian, tenant) for x in X]
+
+def run_batch(X: np.ndarray, apply_guardian: bool, tenant: Optional[Tenant] = None):
+    """
+    Step a batch row by row, exactly as consecutive /step calls; runs on the engine worker
+    
+    Each row's guardian verdict, and any intervention it selects, is applied
+    before the next row steps, so a batch leaves the engine and guardian in
+    the same state (and returns the same results) as the rows sent to /step.
+    
+    Returns:
+        (recs, interventions) for the batch
+    """
+    recs = run_steps(X, apply_guardian, tenant)
+    interventions = []
+    for rec in recs:
+        g = rec.get("_guardian")
+        if g and g["intervention"]:
+            interventions.append({"k": rec["k"], "intervention": g["intervention"], "reason": g["reason"]})
+    return recs, interventions
+
+def state_view(engine: Any, last: Optional[Dict[str, Any]]) -> Mapping[str, Any]:
+    """Immutable read-side state for an engine and its latest step result"""
+    if last:
+        state = {key: last[key] for key in ("k",) + STEP_METRICS}
+        state["timestamp"] = last["timestamp"]
+    elif engine:
+        last_metrics = getattr(engine, "last_metrics", {})
+        state = {
+            "Psi": getattr(engine, "last_psi", 0.0),
+            "C": last_metrics.get("C", 0.0),
+            "U": last_metrics.get("U", 0.0),
+            "Phi": last_metrics.get("Phi", 0.0),
+            "H": last_metrics.get("H", 0.0),
+            "PE": last_metrics.get("PE", 0.0),
+            "M": last_metrics.get("M", 0.0),
+            "dt_eff": getattr(engine, "last_dt_eff", 0.0),
+            "k": getattr(engine, "k", 0),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    else:
+        state = {}
+    return MappingProxyType(state)
+
+def publish_state(tenant: Optional[Tenant] = None):
+    """Rebuild the read-side state snapshot; runs on the engine worker"""
+    global published_state
+    
+    if tenant:
+        tenant.published = state_view(tenant.engine, tenant.last_state)
+        metrics_exporter.publish(tenant.agent_id, tenant.published)
+    else:
+        published_state = state_view(psi_engine, last_state)
+        metrics_exporter.publish(None, published_state)
+
+def pooled(agent_id: Optional[str]) -> bool:
+    """Whether agent_id names a pooled tenant rather than the global engine"""
+    return agent_id is not None and agent_id != AGENT_ID
+
+async def run_on_engine(fn, *args, wait: bool = False, agent_id: Optional[str] = None):
+    """
+    Run fn(*args) on the engine worker and publish the resulting state
+    
+    Args:
+        fn: Callable that reads or mutates the engine or guardian
+        *args: Arguments for fn
+        wait: Wait for a queue slot instead of failing fast
+        agent_id: Run against this agent's pooled tenant, passed to fn as
+            ``tenant`` (None or AGENT_ID use the global engine)
+    
+    Raises:
+        HTTPException: 429 when the engine queue is full, 507 when the
+            tenant does not fit its memory budget
+    """
+    def job():
+        if not pooled(agent_id):
+            result = fn(*args)
+            publish_state()
+            return result
+        tenant = engine_pool.get(agent_id)
+        result = fn(*args, tenant=tenant)
+        publish_state(tenant)
+        return result
+    
+    if pooled(agent_id) and engine_pool is None:
+        raise HTTPException(status_code=503, detail="Engine pool not initialized")
+    try:
+        if engine_worker is None:
+            # Startup has not run (e.g. a bare TestClient); nothing else is stepping
+            return job()
+        return await engine_worker.submit(job, wait=wait)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except TenantBudgetExceeded as e:
+        raise HTTPException(status_code=507, detail=str(e))
+
 # Function to record to Remembrancer
 def record_to_remembrancer(trace_type: str, trace_hash: str, metadata: Dict[str, Any]):
     try:
@@ -325,6 +650,8 @@ async def health_check():
         "status": "healthy",
         "import_success": IMPORT_SUCCESS,
         "engine_initialized": psi_engine is not None,
+        "queue_depth": engine_worker.depth if engine_worker else 0,
+        "tenants": len(engine_pool) if engine_pool else 0,
         "timestamp": time.time()
     }
 
@@ -332,7 +659,7 @@ async def health_check():
 async def initialize(params: PsiParams, _: bool = Depends(verify_psi_field)):
     """Initialize the Ψ-Field engine with custom parameters"""
     params_dict = params.dict()
-    initialize_engine(params_dict)
+    await run_on_engine(initialize_engine, params_dict, wait=True)
     return {
         "status": "initialized",
         "params": params_dict,
@@ -366,42 +693,46 @@ async def get_parameters(_: bool = Depends(verify_psi_field)):
     }
 
 def get_last_state() -> Dict[str, Any]:
-    """Helper function to get the current state"""
-    global last_state, psi_engine
-    
-    if last_state:
-        return last_state
-    
-    if not psi_engine:
-        return {
-            "Psi": 0.0,
-            "C": 0.0,
-            "U": 0.0,
-            "Phi": 0.0,
-            "H": 0.0,
-            "PE": 0.0,
-            "M": 0.0,
-            "dt_eff": 0.0,
-            "k": 0,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    """Helper function to get the current state (from the published snapshot)"""
+    if published_state:
+        return dict(published_state)
     
     return {
-        "Psi": getattr(psi_engine, "last_psi", 0.0),
-        "C": getattr(psi_engine, "last_metrics", {}).get("C", 0.0),
-        "U": getattr(psi_engine, "last_metrics", {}).get("U", 0.0),
-        "Phi": getattr(psi_engine, "last_metrics", {}).get("Phi", 0.0),
-        "H": getattr(psi_engine, "last_metrics", {}).get("H", 0.0),
-        "PE": getattr(psi_engine, "last_metrics", {}).get("PE", 0.0),
-        "M": getattr(psi_engine, "last_metrics", {}).get("M", 0.0),
-        "dt_eff": getattr(psi_engine, "last_dt_eff", 0.0),
-        "k": getattr(psi_engine, "k", 0),
+        "Psi": 0.0,
+        "C": 0.0,
+        "U": 0.0,
+        "Phi": 0.0,
+        "H": 0.0,
+        "PE": 0.0,
+        "M": 0.0,
+        "dt_eff": 0.0,
+        "k": 0,
         "timestamp": datetime.utcnow().isoformat()
     }
 
+async def get_tenant_state(agent_id: str) -> Dict[str, Any]:
+    """
+    Published state of a pooled tenant
+    
+    Resident tenants are read without queueing; an evicted tenant with a
+    snapshot on disk is restored on the engine worker first.
+    
+    Raises:
+        HTTPException: 404 if the agent has no engine
+    """
+    tenant = engine_pool.peek(agent_id) if engine_pool else None
+    if tenant is None:
+        if not (engine_pool and engine_pool.has_snapshot(agent_id)):
+            raise HTTPException(status_code=404, detail=f"No engine for agent {agent_id!r}")
+        tenant = await run_on_engine(lambda tenant: tenant, agent_id=agent_id)
+    return dict(tenant.published)
+
 @app.get("/state", response_model=PsiOutput, tags=["Ψ-Field"])
-async def get_current_state(_: bool = Depends(verify_psi_field)):
-    """Get the current state of the Ψ-field"""
+async def get_current_state(agent_id: Optional[str] = Depends(agent_param), _: bool = Depends(verify_psi_field)):
+    """Get the current state of the Ψ-field (or of a pooled agent's engine)"""
+    if pooled(agent_id):
+        return await get_tenant_state(agent_id)
+    
     if not psi_engine:
         raise HTTPException(status_code=400, detail="Ψ-Field engine not initialized")
     
@@ -411,8 +742,9 @@ async def get_current_state(_: bool = Depends(verify_psi_field)):
     return state
 
 @app.post("/step", response_model=PsiOutput, tags=["Ψ-Field"])
-async def step(input_data: InputVectorRequest, background_tasks: BackgroundTasks, _: bool = Depends(verify_psi_field)):
-    """Execute one Ψ-field evolution step with the given input"""
+async def step(input_data: InputVectorRequest, background_tasks: BackgroundTasks,
+               agent_id: Optional[str] = Depends(agent_param), _: bool = Depends(verify_psi_field)):
+    """Execute one Ψ-field evolution step with the given input (pooled engine when agent_id is given)"""
     global psi_engine, guardian, remembrancer_client, mq_publisher, last_state
     
     if not psi_engine:
@@ -422,44 +754,7 @@ async def step(input_data: InputVectorRequest, background_tasks: BackgroundTasks
         # Convert input to NumPy array
         x = np.array(input_data.x)
         
-        # Apply Guardian if requested
-        if input_data.apply_guardian and guardian:
-            x = guardian.normalize_input(x)
-        
-        # Execute the step
-        rec = psi_engine.step(x)
-        
-        # Add timestamp and step counter
-        timestamp = datetime.utcnow().isoformat()
-        rec["timestamp"] = timestamp
-        if not hasattr(psi_engine, "k"):
-            psi_engine.k = 0
-        psi_engine.k += 1
-        rec["k"] = psi_engine.k
-        
-        # Store latest state for reference
-        last_state = rec.copy()
-        
-        # Apply Guardian processing
-        if guardian and input_data.apply_guardian:
-            rec = guardian.process_state(rec, psi_engine.k)
-            
-            # Check if Guardian detected a threat and intervention needed
-            if rec['_guardian']['intervention']:
-                if rec['_guardian']['intervention'] == 'nigredo':
-                    guardian.apply_nigredo(psi_engine)
-                elif rec['_guardian']['intervention'] == 'albedo':
-                    guardian.apply_albedo(psi_engine)
-                
-                # Publish alert
-                if mq_publisher:
-                    mq_publisher.publish_guardian_alert({
-                        "agent_id": AGENT_ID,
-                        "intervention": rec['_guardian']['intervention'],
-                        "reason": rec['_guardian']['reason'],
-                        "timestamp": timestamp,
-                        "manual": False
-                    })
+        rec = await run_on_engine(run_step, x, input_data.apply_guardian, agent_id=agent_id)
         
         # Record to Remembrancer in the background
         if remembrancer_client:
@@ -469,41 +764,171 @@ async def step(input_data: InputVectorRequest, background_tasks: BackgroundTasks
                 "psi_state"
             )
         
-        # Publish telemetry
+        # Queue telemetry (the publisher thread batches it; never waits on the broker)
         if mq_publisher:
-            background_tasks.add_task(
-                mq_publisher.publish_telemetry,
-                {
-                    "agent_id": AGENT_ID,
-                    "k": rec["k"],
-                    "Psi": float(rec["Psi"]),
-                    "C": float(rec["C"]),
-                    "U": float(rec["U"]),
-                    "Phi": float(rec["Phi"]),
-                    "H": float(rec["H"]),
-                    "PE": float(rec["PE"]),
-                    "M": float(rec["M"]),
-                    "dt_eff": float(rec["dt_eff"]),
-                    "timestamp": timestamp
-                }
-            )
-            
+            mq_publisher.publish_telemetry(telemetry_payload(rec, agent_id or AGENT_ID))
+        
+        # Federation peers track this service's own engine only
+        if mq_publisher and not pooled(agent_id):
             # Calculate phase for federation
             phase = complex(np.cos(rec["Phi"]), np.sin(rec["Phi"]))
             
             # Publish metrics to federation in the background
             background_tasks.add_task(
                 federation.publish_metrics,
-                psi_engine.last_metrics,
+                federation_metrics(rec),
                 rec["Psi"],
                 phase
             )
         
         return rec
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in step: {e}")
         raise HTTPException(status_code=500, detail=f"Error executing step: {str(e)}")
 
+@app.post("/step/batch", tags=["Ψ-Field"])
+async def step_batch(batch: BatchStepRequest, background_tasks: BackgroundTasks,
+                     agent_id: Optional[str] = Depends(agent_param), _: bool = Depends(verify_psi_field)):
+    """
+    Execute a sequence of Ψ-field steps in one call (e.g. offline replay)
+    
+    Rows run through the engine in order as a single engine-worker job.
+    Guardian thresholds for the whole batch are evaluated in one pass after
+    the engine steps, so interventions take effect at the batch boundary
+    rather than between rows. Telemetry, federation and Remembrancer
+    publishes are aggregated into one message each.
+    """
+    if not psi_engine:
+        raise HTTPException(status_code=400, detail="Ψ-Field engine not initialized")
+    
+    try:
+        X = np.asarray(batch.xs, dtype=float)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="xs must be a rectangular matrix")
+    if X.ndim != 2 or X.shape[0] == 0:
+        raise HTTPException(status_code=422, detail="xs must be a non-empty matrix")
+    
+    try:
+        recs, interventions = await run_on_engine(run_batch, X, batch.apply_guardian, agent_id=agent_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch step: {e}")
+        raise HTTPException(status_code=500, detail=f"Error executing batch step: {str(e)}")
+    
+    last = recs[-1]
+    result = {"count": len(recs), "k": [rec["k"] for rec in recs]}
+    result.update({key: [float(rec[key]) for rec in recs] for key in STEP_METRICS})
+    result["timestamp"] = last["timestamp"]
+    result["interventions"] = interventions
+    result["guardian"] = last.get("_guardian")
+    
+    # One Remembrancer receipt for the whole batch, committing to every state
+    if remembrancer_client:
+        states = [{key: result[key][i] for key in ("k",) + STEP_METRICS} for i in range(len(recs))]
+        background_tasks.add_task(
+            remembrancer_client.record,
+            {
+                "count": len(recs),
+                "k_first": recs[0]["k"],
+                "k_last": last["k"],
+                "final": {key: result[key][-1] for key in STEP_METRICS},
+                "interventions": interventions,
+                "states_sha256": hashlib.sha256(json.dumps(states, sort_keys=True).encode("utf-8")).hexdigest(),
+            },
+            "psi_state_batch"
+        )
+    
+    if mq_publisher:
+        mq_publisher.publish_telemetry_batch([telemetry_payload(rec, agent_id or AGENT_ID) for rec in recs])
+    
+    if mq_publisher and not pooled(agent_id):
+        # Federation peers only track the current state, so publish the last one
+        background_tasks.add_task(
+            federation.publish_metrics,
+            federation_metrics(last),
+            last["Psi"],
+            complex(np.cos(last["Phi"]), np.sin(last["Phi"]))
+        )
+    
+    return result
+
+@app.post("/step/stream", tags=["Ψ-Field"])
+async def step_stream(request: Request, dim: int = PSI_INPUT_DIM, apply_guardian: bool = True,
+                      agent_id: Optional[str] = Depends(agent_param), _: bool = Depends(verify_psi_field)):
+    """
+    Stream input frames in and per-step results out over chunked HTTP
+    
+    The request body is either little-endian float32 frames of ``dim``
+    values (application/octet-stream) or NDJSON vectors
+    (application/x-ndjson). Each received chunk is one engine-worker job and
+    each frame in it is stepped with /step semantics, so
+    guardian interventions apply between frames. Results stream back as
+    packed RESULT_FRAME records or NDJSON lines, following the Accept header
+    and defaulting to the request's format. Telemetry is published once per
+    received chunk; federation and Remembrancer get one summary per stream.
+    """
+    if not psi_engine:
+        raise HTTPException(status_code=400, detail="Ψ-Field engine not initialized")
+    
+    content_type = request.headers.get("content-type", STREAM_BINARY).split(";")[0].strip()
+    if content_type == STREAM_BINARY:
+        if dim <= 0:
+            raise HTTPException(status_code=422, detail="dim must be positive")
+        frames = float32_frames(request.stream(), dim)
+    elif content_type == STREAM_NDJSON:
+        frames = ndjson_frames(request.stream())
+    else:
+        raise HTTPException(status_code=415, detail=f"Expected {STREAM_BINARY} or {STREAM_NDJSON}")
+    
+    accept = request.headers.get("accept", "")
+    if STREAM_BINARY in accept or STREAM_NDJSON in accept:
+        binary_out = STREAM_BINARY in accept
+    else:
+        binary_out = content_type == STREAM_BINARY
+    
+    summary = {"count": 0, "last": None, "digest": hashlib.sha256()}
+    
+    async def results():
+        try:
+            async for X in frames:
+                # waits for a queue slot: the stream's own flow control is the backpressure
+                recs = await run_on_engine(run_steps, X, apply_guardian, wait=True, agent_id=agent_id)
+                out = encode_results(recs) if binary_out else ndjson_results(recs)
+                summary["count"] += len(recs)
+                summary["k_first"] = summary.get("k_first", recs[0]["k"])
+                summary["last"] = recs[-1]
+                summary["digest"].update(out)
+                yield out
+                if mq_publisher:
+                    mq_publisher.publish_telemetry_batch([telemetry_payload(rec, agent_id or AGENT_ID) for rec in recs])
+        except Exception as e:
+            # The status line has already gone out; NDJSON clients get an error line
+            logger.error(f"Error in step stream after {summary['count']} frames: {e}")
+            if not binary_out:
+                yield (json.dumps({"error": str(e), "frames": summary["count"]}) + "\n").encode("utf-8")
+    
+    async def publish_summary():
+        last = summary["last"]
+        if last is None:
+            return
+        if remembrancer_client:
+            await remembrancer_client.record({
+                "count": summary["count"],
+                "k_first": summary["k_first"],
+                "k_last": last["k"],
+                "final": {key: float(last[key]) for key in STEP_METRICS},
+                "results_sha256": summary["digest"].hexdigest(),
+            }, "psi_state_stream")
+        if mq_publisher and not pooled(agent_id):
+            await federation.publish_metrics(federation_metrics(last), last["Psi"],
+                                             complex(np.cos(last["Phi"]), np.sin(last["Phi"])))
+    
+    return DuplexStreamingResponse(results(), media_type=STREAM_BINARY if binary_out else STREAM_NDJSON,
+                                   background=BackgroundTask(publish_summary))
+
 @app.post("/record", tags=["Remembrancer"])
 async def record_trace(record: RememberRecord, _: bool = Depends(verify_psi_field)):
     """Manually record a trace to the Remembrancer"""
@@ -514,71 +939,53 @@ async def record_trace(record: RememberRecord, _: bool = Depends(verify_psi_fiel
         raise HTTPException(status_code=500, detail=f"Error recording trace: {result['error']}")
 
 @app.get("/metrics", tags=["Monitoring"])
-async def metrics():
-    """Get Prometheus metrics for the Ψ-Field service"""
-    if not psi_engine:
-        state = get_last_state()
+async def metrics(agent_id: Optional[str] = Depends(agent_param)):
+    """Get Prometheus metrics for the Ψ-Field service (or one pooled agent's engine)"""
+    if pooled(agent_id):
+        content = metrics_exporter.render_agent(agent_id, await get_tenant_state(agent_id))
     else:
-        state = {
-            "Psi": getattr(psi_engine, "last_psi", 0.0),
-            "C": getattr(psi_engine, "last_metrics", {}).get("C", 0.0),
-            "U": getattr(psi_engine, "last_metrics", {}).get("U", 0.0),
-            "Phi": getattr(psi_engine, "last_metrics", {}).get("Phi", 0.0),
-            "H": getattr(psi_engine, "last_metrics", {}).get("H", 0.0),
-            "PE": getattr(psi_engine, "last_metrics", {}).get("PE", 0.0),
-            "dt_eff": getattr(psi_engine, "last_dt_eff", 0.2)
-        }
-    
-    # Return metrics in Prometheus format
-    metrics_lines = [
-        "# HELP psi_field_density Consciousness density (ψ)",
-        "# TYPE psi_field_density gauge",
-        f'psi_field_density {state["Psi"]}',
-        "",
-        "# HELP psi_field_phase_coherence Phase coherence (Φ)",
-        "# TYPE psi_field_phase_coherence gauge",
-        f'psi_field_phase_coherence {state["Phi"]}',
-        "",
-        "# HELP psi_field_continuity Continuity (C)",
-        "# TYPE psi_field_continuity gauge",
-        f'psi_field_continuity {state["C"]}',
-        "",
-        "# HELP psi_field_futurity Futurity (U)",
-        "# TYPE psi_field_futurity gauge",
-        f'psi_field_futurity {state["U"]}',
-        "",
-        "# HELP psi_field_temporal_entropy Temporal entropy (H)",
-        "# TYPE psi_field_temporal_entropy gauge",
-        f'psi_field_temporal_entropy {state["H"]}',
-        "",
-        "# HELP psi_field_prediction_error Prediction error (PE)",
-        "# TYPE psi_field_prediction_error gauge",
-        f'psi_field_prediction_error {state["PE"]}',
-        "",
-        "# HELP psi_field_time_dilation Effective time dilation",
-        "# TYPE psi_field_time_dilation gauge",
-        f'psi_field_time_dilation {state["dt_eff"]}',
-        ""
-    ]
-    
-    return Response(content="\n".join(metrics_lines), media_type="text/plain")
+        content = metrics_exporter.render()
+    return Response(content=content, media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/federation/metrics", tags=["Federation"])
-async def get_federation_metrics():
-    """Get federation metrics for the Ψ-Field service"""
+async def get_federation_metrics(request: Request):
+    """
+    Get federation metrics for the Ψ-Field service
+
+    JSON by default; peers sending ``Accept: application/vnd.vaultmesh.psi-telemetry``
+    get the compact binary encoding (src/codec.py, decode with decode_federation).
+    """
     if not psi_engine:
         return {"status": "not_initialized"}
     
-    # Get the latest metrics
-    last_psi = getattr(psi_engine, "last_psi", 0.0)
-    last_metrics = getattr(psi_engine, "last_metrics", {})
+    # Get the latest metrics from the published snapshot
+    state = get_last_state()
     
-    return {
+    payload = {
         "agent_id": federation.agent_id,
-        "psi": last_psi,
-        "metrics": last_metrics,
+        "psi": state["Psi"],
+        "metrics": federation_metrics(state),
         "timestamp": time.time()
     }
+    if wants_binary(request.headers.get("accept", "")):
+        return Response(encode_federation(payload), media_type=TELEMETRY_BINARY)
+    return payload
+
+@app.post("/federation/metrics", tags=["Federation"])
+async def receive_federation_metrics(request: Request):
+    """
+    Accept metrics pushed by a federation peer (PsiFederation.publish_metrics)
+    
+    The body is JSON, or the binary encoding when sent with
+    ``Content-Type: application/vnd.vaultmesh.psi-telemetry``; the latest
+    payload per peer agent is kept in federation.peer_metrics.
+    """
+    try:
+        payload = federation.parse_metrics(request.headers.get("content-type", ""), await request.body())
+        agent_id = federation.receive_metrics(payload)
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid federation metrics: {e}")
+    return {"status": "accepted", "agent_id": agent_id}
 
 @app.post("/federation/swarm", tags=["Federation"])
 async def calculate_swarm_metrics(_: bool = Depends(verify_psi_field)):
@@ -601,7 +1008,8 @@ async def apply_nigredo(_: bool = Depends(verify_psi_field)):
     if not guardian or not psi_engine:
         raise HTTPException(status_code=503, detail="Guardian not initialized")
     
-    result = guardian.apply_nigredo(psi_engine)
+    result = await run_on_engine(guardian.apply_nigredo, psi_engine)
+    metrics_exporter.interventions.labels("nigredo", "manual").inc()
     
     # Record the intervention to Remembrancer
     if remembrancer_client:
@@ -629,7 +1037,8 @@ async def apply_albedo(_: bool = Depends(verify_psi_field)):
     if not guardian or not psi_engine:
         raise HTTPException(status_code=503, detail="Guardian not initialized")
     
-    result = guardian.apply_albedo(psi_engine)
+    result = await run_on_engine(guardian.apply_albedo, psi_engine)
+    metrics_exporter.interventions.labels("albedo", "manual").inc()
     
     # Record the intervention to Remembrancer
     if remembrancer_client:
@@ -657,21 +1066,23 @@ async def guardian_status(_: bool = Depends(verify_psi_field)):
     if not guardian or not psi_engine:
         raise HTTPException(status_code=503, detail="Guardian not initialized")
     
-    current_state = get_last_state()
-    is_threat, reason = guardian.assess_threat(current_state)
+    def assess():
+        # assess_threat updates the guardian's history, so it runs on the worker
+        is_threat, reason = guardian.assess_threat(get_last_state())
+        return {
+            "red_flag": guardian._red_flag,
+            "reason": guardian._red_flag_reason,
+            "current_threat": is_threat,
+            "current_threat_reason": reason
+        }
     
-    return {
-        "red_flag": guardian._red_flag,
-        "reason": guardian._red_flag_reason,
-        "current_threat": is_threat,
-        "current_threat_reason": reason
-    }
+    return await run_on_engine(assess)
 
 @app.get("/guardian/statistics", tags=["Guardian"])
 async def guardian_statistics():
     """Get guardian statistics"""
     if guardian and hasattr(guardian, "get_statistics"):
-        return {"kind": GUARDIAN_KIND, **guardian.get_statistics()}
+        return {"kind": GUARDIAN_KIND, **await run_on_engine(guardian.get_statistics)}
     return {"kind": GUARDIAN_KIND, "status": "no-stats"}
 
 # ==========================================================
@@ -715,7 +1126,8 @@ async def mcp_endpoint(request: Request):
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
-    global psi_engine, guardian, remembrancer_client, mq_publisher, mcp_server
+    global psi_engine, guardian, remembrancer_client, mq_publisher, mcp_server, snapshot_task, engine_worker
+    global engine_pool, pool_task
     
     logger.info("🚀 Starting PSI-Field API service")
     
@@ -727,22 +1139,34 @@ async def startup_event():
         logger.info(f"✅ PSI engine initialized with {PSI_BACKEND} backend")
     
     # Initialize Guardian (AdvancedGuardian if available)
-    if GUARDIAN_KIND == "advanced":
-        guardian = Guardian(
-            history_window=200,
-            percentile_threshold=95.0,
-            intervention_cooldown=100,
-            min_samples=50
-        )
-    else:
-        guardian = Guardian(
-            psi_low_threshold=0.25,
-            pe_high_threshold=2.0,
-            h_high_threshold=2.2,
-            intervention_cooldown=100
-        )
+    guardian = build_guardian()
     logger.info(f"✅ Guardian initialized ({GUARDIAN_KIND})")
     
+    # Resume from the last checkpoint instead of re-warming
+    if load_snapshot():
+        logger.info(f"✅ Restored engine snapshot from {PSI_SNAPSHOT_PATH} (k={getattr(psi_engine, 'k', 0)})")
+    publish_state()
+    
+    # From here on the engine is only touched from the worker thread
+    engine_worker = EngineWorker(max_queue=PSI_QUEUE_MAX)
+    logger.info(f"✅ Engine worker started (queue capacity {PSI_QUEUE_MAX})")
+    if PSI_SNAPSHOT_PATH:
+        snapshot_task = asyncio.create_task(snapshot_loop())
+    
+    # Pooled engines for other agents/sessions, created on first use
+    engine_pool = EnginePool(
+        build_tenant_engine,
+        build_guardian,
+        max_engines=PSI_POOL_MAX,
+        idle_ttl=PSI_POOL_IDLE_TTL,
+        snapshot_dir=PSI_POOL_DIR or None,
+        memory_budget=int(PSI_TENANT_MEMORY_MB * 2**20) or None,
+        on_evict=metrics_exporter.drop
+    )
+    if PSI_POOL_IDLE_TTL > 0:
+        pool_task = asyncio.create_task(pool_sweep_loop())
+    logger.info(f"✅ Engine pool initialized (max {PSI_POOL_MAX} engines, idle TTL {PSI_POOL_IDLE_TTL}s)")
+    
     # Initialize Remembrancer client
     remembrancer_client = RemembrancerClient()
     logger.info("✅ Remembrancer client initialized")
@@ -761,14 +1185,30 @@ async def startup_event():
     
     # Register MCP tools
     @mcp_server.tool(name="psi_step", description="Execute one cognitive step")
-    async def psi_step_tool(x: List[float], guardian: bool = True):
+    async def psi_step_tool(x: List[float], guardian: bool = True, agent_id: Optional[str] = None):
         params = InputVectorRequest(x=x, apply_guardian=guardian)
         bg_tasks = BackgroundTasks()
-        return await step(params, bg_tasks)
+        return await step(params, bg_tasks, agent_id=agent_id)
+    
+    @mcp_server.tool(name="psi_step_batch", description="Execute a batch of cognitive steps in order")
+    async def psi_step_batch_tool(xs: List[List[float]], guardian: bool = True, agent_id: Optional[str] = None):
+        batch = BatchStepRequest(xs=xs, apply_guardian=guardian)
+        bg_tasks = BackgroundTasks()
+        return await step_batch(batch, bg_tasks, agent_id=agent_id)
     
     @mcp_server.tool(name="psi_get_state", description="Get current state")
-    async def psi_get_state_tool():
-        return await get_current_state()
+    async def psi_get_state_tool(agent_id: Optional[str] = None):
+        return await get_current_state(agent_id=agent_id)
+    
+    @mcp_server.tool(name="psi_get_profile", description="Get per-phase step timings (PSI_PROFILE=1)")
+    async def psi_get_profile_tool(agent_id: Optional[str] = None):
+        if pooled(agent_id):
+            tenant = engine_pool.peek(agent_id) if engine_pool else None
+            engine = tenant.engine if tenant else None
+        else:
+            engine = psi_engine
+        profile = engine.get_profile() if hasattr(engine, "get_profile") else {}
+        return {"enabled": getattr(engine, "profiler", None) is not None, "phases": profile}
     
     @mcp_server.tool(name="psi_apply_nigredo", description="Apply Nigredo intervention")
     async def psi_apply_nigredo_tool(reason: str = "manual"):
@@ -786,10 +1226,33 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global mq_publisher
+    global mq_publisher, snapshot_task, engine_worker, engine_pool, pool_task
     
     logger.info("🛑 Shutting down PSI-Field API service")
     
+    # Stop periodic checkpoints and write a final one behind any queued steps
+    if snapshot_task:
+        snapshot_task.cancel()
+        snapshot_task = None
+    try:
+        if await run_on_engine(save_snapshot, wait=True):
+            logger.info(f"✅ Engine snapshot written to {PSI_SNAPSHOT_PATH}")
+    except Exception as e:
+        logger.error(f"Final snapshot failed: {e}")
+    
+    # Persist pooled tenants the same way eviction would
+    if pool_task:
+        pool_task.cancel()
+        pool_task = None
+    if engine_pool:
+        saved = await run_on_engine(engine_pool.save_all, wait=True)
+        if saved:
+            logger.info(f"✅ {saved} pooled engine snapshots written to {PSI_POOL_DIR}")
+        engine_pool = None
+    if engine_worker:
+        engine_worker.close()
+        engine_worker = None
+    
     # Close RabbitMQ connection
     if mq_publisher:
         mq_publisher.close()
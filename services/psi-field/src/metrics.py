@@ -0,0 +1,225 @@
+"""
+Prometheus Exposition for Ψ-Field Service
+-----------------------------------------
+Registry with step-latency and phase histograms, intervention counters and
+collectors for the engine queue, pool, MQ outbox and step profiler. The registry
+is collected on every scrape so collector series are always current; the
+per-engine state gauge text is cached and re-rendered only for engines whose
+state changed.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.utils import floatToGoString
+
+# Sub-millisecond steps are the common case
+STEP_BUCKETS = (25e-6, 50e-6, 100e-6, 250e-6, 500e-6, 1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 0.1, 0.25, 1.0)
+
+# Per-engine state gauges: (metric name, help, state key)
+STATE_GAUGES = (
+    ("psi_field_density", "Consciousness density (ψ)", "Psi"),
+    ("psi_field_phase_coherence", "Phase coherence (Φ)", "Phi"),
+    ("psi_field_continuity", "Continuity (C)", "C"),
+    ("psi_field_futurity", "Futurity (U)", "U"),
+    ("psi_field_temporal_entropy", "Temporal entropy (H)", "H"),
+    ("psi_field_prediction_error", "Prediction error (PE)", "PE"),
+    ("psi_field_time_dilation", "Effective time dilation", "dt_eff"),
+)
+
+
+class WorkerCollector:
+    """Engine queue depth, counters and recent latency percentiles"""
+
+    def __init__(self, get_worker: Callable[[], Any]):
+        self.get_worker = get_worker
+
+    def collect(self):
+        worker = self.get_worker()
+        if worker is None:
+            return
+        stats = worker.stats()
+        yield GaugeMetricFamily("psi_field_queue_depth", "Engine jobs queued or running", value=stats["depth"])
+        yield GaugeMetricFamily("psi_field_queue_capacity", "Engine jobs admitted before 429",
+                                value=stats["capacity"])
+        yield CounterMetricFamily("psi_field_queue_completed", "Engine jobs completed", value=stats["completed"])
+        yield CounterMetricFamily("psi_field_queue_rejected", "Engine jobs rejected with 429",
+                                  value=stats["rejected"])
+        latency = GaugeMetricFamily("psi_field_queue_latency_seconds",
+                                    "Engine job latency (queue wait + run) over recent jobs", labels=["quantile"])
+        latency.add_metric(["0.5"], stats["latency_p50"])
+        latency.add_metric(["0.99"], stats["latency_p99"])
+        yield latency
+
+
+class PoolCollector:
+    """Pooled engine count, memory and lifecycle counters"""
+
+    def __init__(self, get_pool: Callable[[], Any]):
+        self.get_pool = get_pool
+
+    def collect(self):
+        pool = self.get_pool()
+        if pool is None:
+            return
+        stats = pool.stats()
+        yield GaugeMetricFamily("psi_field_pool_engines", "Resident pooled agent engines", value=stats["engines"])
+        yield GaugeMetricFamily("psi_field_pool_bytes", "Estimated memory held by pooled engines",
+                                value=stats["bytes"])
+        yield CounterMetricFamily("psi_field_pool_evictions", "Pooled engines evicted (LRU, idle or budget)",
+                                  value=stats["evicted"])
+        yield CounterMetricFamily("psi_field_pool_rejected",
+                                  "Pooled engines refused for exceeding the memory budget", value=stats["rejected"])
+
+
+class OutboxCollector:
+    """RabbitMQ outbox depth and delivery counters"""
+
+    def __init__(self, get_publisher: Callable[[], Any]):
+        self.get_publisher = get_publisher
+
+    def collect(self):
+        publisher = self.get_publisher()
+        if publisher is None or not publisher.enabled:
+            return
+        stats = publisher.stats()
+        yield GaugeMetricFamily("psi_field_mq_outbox_depth", "Telemetry records waiting to be published",
+                                value=stats["depth"])
+        yield GaugeMetricFamily("psi_field_mq_connected", "Publisher connected to RabbitMQ",
+                                value=1 if stats["connected"] else 0)
+        records = CounterMetricFamily("psi_field_mq_records", "Telemetry records by outcome", labels=["outcome"])
+        for outcome in ("published", "dropped", "sampled"):
+            records.add_metric([outcome], stats[outcome])
+        yield records
+        yield CounterMetricFamily("psi_field_mq_messages", "Messages confirmed by the broker",
+                                  value=stats["messages"])
+        yield CounterMetricFamily("psi_field_mq_reconnects", "Reconnects after a broker failure",
+                                  value=stats["reconnects"])
+
+
+class ProfileCollector:
+    """Per-phase PsiEngine.step timings from the engine's profiler (PSI_PROFILE)"""
+
+    def __init__(self, get_engine: Callable[[], Any]):
+        self.get_engine = get_engine
+
+    def collect(self):
+        engine = self.get_engine()
+        profile = engine.get_profile() if hasattr(engine, "get_profile") else {}
+        if not profile:
+            return
+        quantiles = GaugeMetricFamily("psi_field_step_phase_seconds",
+                                      "Recent per-step time in each PsiEngine.step phase", labels=["phase", "quantile"])
+        totals = CounterMetricFamily("psi_field_step_phase_time_seconds",
+                                     "Cumulative time in each PsiEngine.step phase", labels=["phase"])
+        for phase, stats in profile.items():
+            for quantile, key in (("0.5", "p50_us"), ("0.9", "p90_us"), ("0.99", "p99_us")):
+                quantiles.add_metric([phase, quantile], stats[key] / 1e6)
+            totals.add_metric([phase], stats["total_ms"] / 1e3)
+        yield quantiles
+        yield totals
+
+
+class MetricsExporter:
+    """
+    Service metrics registry with a cached text exposition.
+
+    publish() and drop() run on the engine worker and only record what
+    changed; render() runs on the event loop, rebuilds the state gauge text
+    when something has been published since the previous scrape and appends
+    a fresh collection of the registry.
+    """
+
+    def __init__(self, state_gauges: Iterable[Tuple[str, str, str]] = STATE_GAUGES,
+                 registry: Optional[CollectorRegistry] = None):
+        """
+        Initialize the registry
+
+        Args:
+            state_gauges: Per-engine gauges as (name, help, state key)
+            registry: Registry for histograms, counters and collectors
+                (a private one by default)
+        """
+        self.state_gauges = tuple(state_gauges)
+        self.registry = registry if registry is not None else CollectorRegistry(auto_describe=True)
+
+        self.step_seconds = Histogram("psi_field_step_duration_seconds",
+                                      "Engine step latency including guardian processing",
+                                      buckets=STEP_BUCKETS, registry=self.registry)
+        self.phase_seconds = Histogram("psi_field_phase_duration_seconds", "Time per step spent in each phase",
+                                       ["phase"], buckets=STEP_BUCKETS, registry=self.registry)
+        self.interventions = Counter("psi_field_guardian_interventions", "Guardian interventions applied",
+                                     ["kind", "trigger"], registry=self.registry)
+
+        self._lock = threading.Lock()
+        self._states: Dict[Optional[str], Mapping[str, Any]] = {}
+        self._lines: Dict[Optional[str], Tuple[str, ...]] = {}
+        self._dirty: set = set()
+        self._version = 0
+        self._cached_version = -1
+        self._cached_state = b""
+
+    def register(self, collector: Any):
+        """Add a custom collector (read at every scrape)"""
+        self.registry.register(collector)
+
+    def phase(self, name: str):
+        """Histogram child for one phase (bind once, observe per step)"""
+        return self.phase_seconds.labels(name)
+
+    def publish(self, agent_id: Optional[str], state: Mapping[str, Any]):
+        """
+        Record an engine's latest state; rendering is deferred to the next scrape
+
+        Args:
+            agent_id: Pooled agent id, or None for the service's own engine
+            state: Immutable state mapping (see main.state_view)
+        """
+        with self._lock:
+            self._states[agent_id] = state
+            self._dirty.add(agent_id)
+            self._version += 1
+
+    def drop(self, agent_id: Optional[str]):
+        """Remove an evicted engine's series"""
+        with self._lock:
+            self._states.pop(agent_id, None)
+            self._lines.pop(agent_id, None)
+            self._dirty.discard(agent_id)
+            self._version += 1
+
+    def _render_state(self, agent_id: Optional[str], state: Mapping[str, Any]) -> Tuple[str, ...]:
+        label = "" if agent_id is None else f'{{agent_id="{agent_id}"}}'
+        return tuple(f"{name}{label} {floatToGoString(state[key])}\n" for name, _, key in self.state_gauges)
+
+    def _state_text(self, lines: List[Tuple[str, ...]]) -> str:
+        parts = []
+        for i, (name, description, _) in enumerate(self.state_gauges):
+            parts.append(f"# HELP {name} {description}\n# TYPE {name} gauge\n")
+            parts.extend(agent_lines[i] for agent_lines in lines)
+        return "".join(parts)
+
+    def render(self) -> bytes:
+        """Full exposition: cached state gauges (rebuilt after a publish) plus the live registry"""
+        with self._lock:
+            state_text = self._cached_state
+            if self._version != self._cached_version:
+                version = self._version
+                for agent_id in self._dirty:
+                    state = self._states.get(agent_id)
+                    if state:
+                        self._lines[agent_id] = self._render_state(agent_id, state)
+                self._dirty.clear()
+                lines = list(self._lines.values())
+                state_text = None
+
+        if state_text is None:
+            state_text = self._state_text(lines).encode("utf-8")
+            with self._lock:
+                self._cached_state, self._cached_version = state_text, version
+        return state_text + generate_latest(self.registry)
+
+    def render_agent(self, agent_id: Optional[str], state: Mapping[str, Any]) -> bytes:
+        """State gauges for a single engine (uncached)"""
+        return self._state_text([self._render_state(agent_id, state)]).encode("utf-8")
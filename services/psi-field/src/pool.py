@@ -0,0 +1,273 @@
+"""
+Engine Pool for Ψ-Field Service
+-------------------------------
+Hosts one engine and guardian per agent/session id in a single process,
+with lazy creation, LRU and idle-TTL eviction, snapshot-on-evict and a
+per-tenant memory budget
+"""
+
+import os
+import re
+import sys
+import time
+import types
+import logging
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+# Agent ids double as snapshot file names
+AGENT_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$"
+_AGENT_ID_RE = re.compile(AGENT_ID_PATTERN)
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+           logging.Logger, np.random.Generator, np.random.BitGenerator)
+
+
+class TenantBudgetExceeded(Exception):
+    """Raised when a tenant's engine and guardian outgrow the memory budget"""
+
+
+def footprint(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Approximate bytes held by an object graph
+
+    Counts ndarray buffers and container overhead, following instance
+    attributes; shared objects are counted once.
+
+    Args:
+        obj: Root object (e.g. an engine)
+
+    Returns:
+        Estimated size in bytes
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen or isinstance(obj, _OPAQUE):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        # views are charged to the array that owns the buffer
+        return obj.nbytes if obj.flags.owndata else 0
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        children = obj
+    elif hasattr(obj, "__dict__"):
+        children = vars(obj).values()
+    else:
+        return size
+    return size + sum(footprint(child, seen) for child in children)
+
+
+class Tenant:
+    """One agent's engine, guardian and latest state"""
+
+    __slots__ = ("agent_id", "engine", "guardian", "last_state", "published", "last_used", "nbytes")
+
+    def __init__(self, agent_id: str, engine: Any, guardian: Any):
+        self.agent_id = agent_id
+        self.engine = engine
+        self.guardian = guardian
+        self.last_state: Optional[Dict[str, Any]] = None
+        # immutable view for read endpoints, replaced after every job
+        self.published: Mapping[str, Any] = MappingProxyType({})
+        self.last_used = time.monotonic()
+        self.nbytes = 0
+
+
+class EnginePool:
+    """
+    Registry of tenant engines keyed by agent/session id.
+
+    Mutating methods must run on the engine worker thread; peek() and
+    stats() only read and are safe from the event loop.
+    """
+
+    def __init__(self, engine_factory: Callable[[], Any], guardian_factory: Callable[[], Any],
+                 max_engines: int = 256, idle_ttl: float = 900.0, snapshot_dir: Optional[str] = None,
+                 memory_budget: Optional[int] = None, on_evict: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the pool
+
+        Args:
+            engine_factory: Builds a fresh engine for a new tenant
+            guardian_factory: Builds a fresh guardian for a new tenant
+            max_engines: Resident tenants before the least recently used is evicted
+            idle_ttl: Seconds without a step before a tenant is evicted (0 disables)
+            snapshot_dir: Directory for evicted tenant snapshots (None drops their state)
+            memory_budget: Maximum bytes per tenant (None disables the check)
+            on_evict: Called with the agent id after a tenant is evicted
+        """
+        self.engine_factory = engine_factory
+        self.guardian_factory = guardian_factory
+        self.max_engines = max_engines
+        self.idle_ttl = idle_ttl
+        self.snapshot_dir = snapshot_dir
+        self.memory_budget = memory_budget
+        self.on_evict = on_evict
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()
+        self.created = 0
+        self.restored = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._tenants
+
+    def snapshot_path(self, agent_id: str) -> Optional[str]:
+        """Snapshot file for a tenant, or None when eviction does not persist"""
+        if not _AGENT_ID_RE.match(agent_id):
+            raise ValueError(f"invalid agent id {agent_id!r}")
+        return os.path.join(self.snapshot_dir, f"{agent_id}.npz") if self.snapshot_dir else None
+
+    def has_snapshot(self, agent_id: str) -> bool:
+        path = self.snapshot_path(agent_id)
+        return bool(path) and os.path.exists(path)
+
+    def peek(self, agent_id: str) -> Optional[Tenant]:
+        """Resident tenant without touching its LRU position"""
+        return self._tenants.get(agent_id)
+
+    def get(self, agent_id: str) -> Tenant:
+        """
+        Resident tenant for agent_id, restoring or creating it on first use
+
+        Raises:
+            ValueError: If agent_id is not a valid id
+            TenantBudgetExceeded: If the tenant does not fit the memory budget
+        """
+        now = time.monotonic()
+        tenant = self._tenants.get(agent_id)
+        if tenant is not None:
+            self._tenants.move_to_end(agent_id)
+            tenant.last_used = now
+            return tenant
+
+        path = self.snapshot_path(agent_id)
+        tenant = Tenant(agent_id, self.engine_factory(), self.guardian_factory())
+        if path and os.path.exists(path) and hasattr(tenant.engine, "restore"):
+            try:
+                extra = tenant.engine.restore(path)
+                if "guardian" in extra and hasattr(tenant.guardian, "load_state_dict"):
+                    tenant.guardian.load_state_dict(extra["guardian"])
+                tenant.last_state = extra.get("last_state")
+                self.restored += 1
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unusable snapshot for {agent_id}: {e}")
+                tenant = Tenant(agent_id, self.engine_factory(), self.guardian_factory())
+                self.created += 1
+        else:
+            self.created += 1
+
+        self.measure(tenant)
+        self._tenants[agent_id] = tenant
+        self.evict_idle(now)
+        while len(self._tenants) > self.max_engines:
+            self.evict(next(iter(self._tenants)))
+        return tenant
+
+    def measure(self, tenant: Tenant) -> int:
+        """
+        Refresh a tenant's footprint and enforce the memory budget
+
+        Raises:
+            TenantBudgetExceeded: If the tenant is over budget
+        """
+        tenant.nbytes = footprint(tenant.engine) + footprint(tenant.guardian)
+        if self.memory_budget and tenant.nbytes > self.memory_budget:
+            self.rejected += 1
+            if tenant.agent_id in self._tenants:
+                self.evict(tenant.agent_id)
+            raise TenantBudgetExceeded(
+                f"agent {tenant.agent_id!r} needs {tenant.nbytes} bytes, budget is {self.memory_budget}")
+        return tenant.nbytes
+
+    def evict(self, agent_id: str) -> bool:
+        """
+        Drop a resident tenant, snapshotting it first when persistence is enabled
+
+        Returns:
+            True if the tenant was resident
+        """
+        tenant = self._tenants.pop(agent_id, None)
+        if tenant is None:
+            return False
+        self.evicted += 1
+        self._save(tenant)
+        if self.on_evict:
+            self.on_evict(agent_id)
+        return True
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        Evict tenants idle for longer than idle_ttl
+
+        The registry is kept in LRU order, so only the idle prefix is visited.
+
+        Returns:
+            Evicted agent ids
+        """
+        if not self.idle_ttl:
+            return []
+        cutoff = (time.monotonic() if now is None else now) - self.idle_ttl
+        evicted = []
+        while self._tenants:
+            agent_id, tenant = next(iter(self._tenants.items()))
+            if tenant.last_used > cutoff:
+                break
+            self.evict(agent_id)
+            evicted.append(agent_id)
+        return evicted
+
+    def sweep(self) -> List[str]:
+        """Evict idle tenants and re-check every resident tenant's memory budget"""
+        evicted = self.evict_idle()
+        for tenant in list(self._tenants.values()):
+            try:
+                self.measure(tenant)
+            except TenantBudgetExceeded as e:
+                logger.warning(str(e))
+                evicted.append(tenant.agent_id)
+        return evicted
+
+    def save_all(self) -> int:
+        """Snapshot every resident tenant (e.g. on shutdown); returns the count written"""
+        return sum(1 for tenant in self._tenants.values() if self._save(tenant))
+
+    def _save(self, tenant: Tenant) -> Optional[str]:
+        path = self.snapshot_path(tenant.agent_id)
+        if not path or not hasattr(tenant.engine, "snapshot"):
+            return None
+        extra = {"guardian": tenant.guardian.state_dict()} if hasattr(tenant.guardian, "state_dict") else {}
+        if tenant.last_state:
+            # the published view holds only the plain state fields
+            extra["last_state"] = dict(tenant.published)
+        try:
+            return tenant.engine.snapshot(path, extra=extra)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Snapshot for {tenant.agent_id} failed: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Resident tenant count, memory and lifecycle counters"""
+        tenants = list(self._tenants.values())
+        return {
+            "engines": len(tenants),
+            "capacity": self.max_engines,
+            "bytes": sum(t.nbytes for t in tenants),
+            "memory_budget": self.memory_budget,
+            "created": self.created,
+            "restored": self.restored,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,130 @@
+"""
+Rolling Window Statistics for Ψ-Field Guardians
+-----------------------------------------------
+Fixed-size sliding window that keeps its samples in sorted order, so
+percentiles cost a bisect instead of a sort and mean/std update in O(1)
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Iterable, Iterator, List
+
+
+class RollingWindow:
+    """
+    Sliding window of the last maxlen samples with incremental statistics.
+
+    Behaves like ``deque(maxlen=...)`` for appends, iteration and indexing
+    (oldest first). quantile() matches ``np.percentile`` (linear method) on
+    the same samples; mean/std are running Welford sums, re-synchronized
+    from the samples once per window to keep rounding drift bounded.
+
+    Non-finite samples (NaN, +/-inf) are skipped and counted in ``skipped``:
+    a NaN cannot be located in the sorted list again when it ages out, and
+    an infinity would poison the running sums.
+    """
+
+    def __init__(self, maxlen: int):
+        """
+        Initialize an empty window
+
+        Args:
+            maxlen: Number of most recent samples kept
+        """
+        self.maxlen = maxlen
+        self._fifo: Deque[float] = deque()
+        self._sorted: List[float] = []
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_sync = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._fifo)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._fifo)
+
+    def __getitem__(self, i: int) -> float:
+        return self._fifo[i]
+
+    def append(self, x: float):
+        """Add a sample, dropping the oldest one when the window is full (non-finite samples are skipped)"""
+        x = float(x)
+        if not math.isfinite(x):
+            self.skipped += 1
+            return
+        n = len(self._fifo)
+        if n < self.maxlen:
+            self._fifo.append(x)
+            insort(self._sorted, x)
+            delta = x - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (x - self._mean)
+            return
+
+        old = self._fifo.popleft()
+        self._fifo.append(x)
+        del self._sorted[bisect_left(self._sorted, old)]
+        insort(self._sorted, x)
+        mean = self._mean + (x - old) / n
+        self._m2 += (x - old) * (x - mean + old - self._mean)
+        self._mean = mean
+        self._since_sync += 1
+        if self._since_sync >= n:
+            self._resync()
+
+    def extend(self, xs: Iterable[float]):
+        for x in xs:
+            self.append(x)
+
+    def clear(self):
+        self._fifo.clear()
+        self._sorted.clear()
+        self._mean = self._m2 = 0.0
+        self._since_sync = 0
+
+    def _resync(self):
+        n = len(self._fifo)
+        self._mean = math.fsum(self._fifo) / n if n else 0.0
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in self._fifo)
+        self._since_sync = 0
+
+    def quantile(self, q: float) -> float:
+        """
+        Percentile of the window, same as np.percentile(window, q)
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Interpolated value (NaN for an empty window)
+        """
+        s = self._sorted
+        n = len(s)
+        if n == 0:
+            return math.nan
+        virtual = (n - 1) * (q / 100)
+        lo = min(max(math.floor(virtual), 0), n - 1)
+        hi = min(lo + 1, n - 1)
+        gamma = virtual - lo
+        a, b = s[lo], s[hi]
+        # numpy's _lerp, including its switch to the upper bound at gamma >= 0.5
+        if gamma >= 0.5:
+            return b - (b - a) * (1 - gamma)
+        return a + (b - a) * gamma
+
+    def mean(self) -> float:
+        return self._mean if self._fifo else math.nan
+
+    def std(self) -> float:
+        """Population standard deviation (np.std with ddof=0)"""
+        n = len(self._fifo)
+        return math.sqrt(max(self._m2, 0.0) / n) if n else math.nan
+
+    def min(self) -> float:
+        return self._sorted[0] if self._sorted else math.nan
+
+    def max(self) -> float:
+        return self._sorted[-1] if self._sorted else math.nan
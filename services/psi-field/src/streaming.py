@@ -0,0 +1,121 @@
+"""
+Streaming Frame Codecs for Ψ-Field Service
+------------------------------------------
+Decodes high-rate input streams (little-endian float32 frames or NDJSON)
+into frame matrices and encodes compact per-step result frames
+"""
+
+import json
+import numpy as np
+from typing import Any, AsyncIterator, Dict, List
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# Media types accepted by /step/stream
+STREAM_BINARY = "application/octet-stream"
+STREAM_NDJSON = "application/x-ndjson"
+
+# Result frame: step counter, the eight step metrics and guardian flags,
+# packed little-endian with no padding (42 bytes)
+RESULT_METRICS = ("Psi", "C", "U", "Phi", "H", "PE", "M", "dt_eff")
+RESULT_FRAME = np.dtype(
+    [("k", "<u8")] + [(name, "<f4") for name in RESULT_METRICS] + [("red_flag", "u1"), ("intervention", "u1")]
+)
+INTERVENTION_CODES = {None: 0, "nigredo": 1, "albedo": 2}
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator consumes the request body
+
+    Starlette's StreamingResponse listens for client disconnects on the same
+    receive channel, which would race the iterator for request chunks.
+    Disconnects still surface here: request.stream() raises ClientDisconnect.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def float32_frames(chunks: AsyncIterator[bytes], dim: int) -> AsyncIterator[np.ndarray]:
+    """
+    Decode a byte stream of little-endian float32 frames
+
+    Complete frames in each chunk are returned as an (n, dim) view over the
+    received bytes; only a frame split across chunks is copied.
+
+    Args:
+        chunks: Raw body chunks
+        dim: Floats per frame
+
+    Yields:
+        Frame matrices (n, dim), float32
+    """
+    frame_bytes = 4 * dim
+    pending = b""
+    async for data in chunks:
+        if pending:
+            data = pending + data
+        n = len(data) // frame_bytes
+        if n:
+            yield np.frombuffer(data, dtype="<f4", count=n * dim).reshape(n, dim)
+        pending = data[n * frame_bytes:]
+    if pending:
+        raise ValueError(f"stream ended inside a frame ({len(pending)} of {frame_bytes} bytes)")
+
+
+def _ndjson_row(line: bytes) -> Any:
+    obj = json.loads(line)
+    return obj["x"] if isinstance(obj, dict) else obj
+
+
+async def ndjson_frames(chunks: AsyncIterator[bytes]) -> AsyncIterator[np.ndarray]:
+    """
+    Decode a newline-delimited JSON stream of input vectors
+
+    Each line is either a JSON array or an object with an "x" array.
+
+    Yields:
+        Frame matrices (n, dim) for the complete lines in each chunk
+    """
+    pending = b""
+    async for data in chunks:
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        rows = [_ndjson_row(line) for line in lines if line.strip()]
+        if rows:
+            yield np.asarray(rows, dtype=float)
+    if pending.strip():
+        yield np.asarray([_ndjson_row(pending)], dtype=float)
+
+
+def encode_results(recs: List[Dict[str, Any]]) -> bytes:
+    """Pack step results into consecutive RESULT_FRAME records"""
+    out = np.empty(len(recs), dtype=RESULT_FRAME)
+    out["k"] = [rec["k"] for rec in recs]
+    for name in RESULT_METRICS:
+        out[name] = [rec[name] for rec in recs]
+    guard = [rec.get("_guardian") or {} for rec in recs]
+    out["red_flag"] = [bool(g.get("red_flag")) for g in guard]
+    out["intervention"] = [INTERVENTION_CODES.get(g.get("intervention"), 255) for g in guard]
+    return out.tobytes()
+
+
+def decode_results(data: bytes) -> np.ndarray:
+    """Structured array view of a result stream produced by encode_results"""
+    return np.frombuffer(data, dtype=RESULT_FRAME)
+
+
+def ndjson_results(recs: List[Dict[str, Any]]) -> bytes:
+    """One compact JSON line per step result"""
+    lines = []
+    for rec in recs:
+        row = {"k": rec["k"]}
+        row.update({name: float(rec[name]) for name in RESULT_METRICS})
+        g = rec.get("_guardian")
+        if g and g.get("intervention"):
+            row["intervention"] = g["intervention"]
+        lines.append(json.dumps(row, separators=(",", ":")))
+    return ("\n".join(lines) + "\n").encode("utf-8")
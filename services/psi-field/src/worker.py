@@ -0,0 +1,114 @@
+"""
+Engine Worker for Ψ-Field Service
+---------------------------------
+Runs every engine mutation on one dedicated thread behind a bounded queue,
+so steps stay ordered and NumPy work never runs on the event loop
+"""
+
+import asyncio
+import logging
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised when the engine queue has no free slot"""
+
+
+class EngineWorker:
+    """
+    Single-thread executor with bounded admission and latency tracking.
+    Jobs run one at a time in submission order.
+    """
+
+    def __init__(self, max_queue: int = 256, latency_window: int = 1024):
+        """
+        Initialize the worker; call from the running event loop
+
+        Args:
+            max_queue: Jobs admitted (queued or running) before submit refuses
+            latency_window: Recent jobs kept for latency percentiles
+        """
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="psi-engine")
+        self._slots = asyncio.Semaphore(max_queue)
+
+        # Counters (only touched from the event loop)
+        self.depth = 0
+        self.max_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._wait: deque = deque(maxlen=latency_window)
+        self._run: deque = deque(maxlen=latency_window)
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, wait: bool = False) -> Any:
+        """
+        Run fn(*args) on the engine thread and return its result
+
+        Args:
+            fn: Callable to run
+            *args: Arguments for fn
+            wait: Wait for a free slot instead of raising QueueFull (for
+                streams and housekeeping, where the caller is the backpressure)
+
+        Returns:
+            Result of fn
+
+        Raises:
+            QueueFull: If no slot is free and wait is False
+        """
+        if not wait and self._slots.locked():
+            self.rejected += 1
+            raise QueueFull(f"engine queue full ({self.max_queue} jobs)")
+
+        async with self._slots:
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            submitted = time.perf_counter()
+            started = []
+
+            def job():
+                started.append(time.perf_counter())
+                return fn(*args)
+
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                done = time.perf_counter()
+                self.depth -= 1
+                self.completed += 1
+                if started:
+                    self._wait.append(started[0] - submitted)
+                    self._run.append(done - started[0])
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and recent latency percentiles (seconds)"""
+        wait = np.array(self._wait)
+        run = np.array(self._run)
+        stats = {
+            "depth": self.depth,
+            "capacity": self.max_queue,
+            "max_depth": self.max_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
+        for name, values in (("wait", wait), ("run", run), ("latency", wait + run)):
+            p50, p99 = np.percentile(values, [50, 99]) if len(values) else (0.0, 0.0)
+            stats[f"{name}_p50"] = float(p50)
+            stats[f"{name}_p99"] = float(p99)
+        return stats
+
+    def close(self):
+        """Finish queued jobs and stop the engine thread"""
+        self._executor.shutdown(wait=True)
+        logger.info("Engine worker stopped")
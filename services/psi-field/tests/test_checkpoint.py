@@ -0,0 +1,124 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params, PsiEngine
+from vaultmesh_psi.backends.simple import SimpleBackend
+from vaultmesh_psi import checkpoint
+
+
+def _engine(**kw):
+    return PsiEngine(SimpleBackend(seed=9), Params(em_capacity=40, seed=1, **kw))
+
+
+def test_restored_engine_continues_identically(tmp_path):
+    """A restored engine produces the same records as one that never stopped"""
+    xs = np.random.default_rng(0).standard_normal((120, 16))
+    eng = _engine()
+    for x in xs[:80]:
+        eng.step(x)
+    path = eng.snapshot(str(tmp_path / "engine.npz"), extra={"note": "warm"})
+
+    ref = [eng.step(x) for x in xs[80:]]
+
+    fresh = _engine()
+    assert fresh.restore(path) == {"note": "warm"}
+    assert [fresh.step(x) for x in xs[80:]] == ref
+    assert fresh.ledgers.heads() == eng.ledgers.heads()
+    assert fresh.wm.scores == eng.wm.scores
+
+
+def test_snapshot_rebuilds_ivf_index(tmp_path):
+    """Episodic indexes are rebuilt from the restored live slots"""
+    params = dict(em_index="ivf", em_index_params={"nlist": 4, "train_size": 16})
+    eng = _engine(**params)
+    for x in np.random.default_rng(3).standard_normal((60, 16)):
+        eng.step(x)
+    fresh = _engine(**params)
+    fresh.restore(eng.snapshot(str(tmp_path / "ivf.npz")))
+    q = np.random.default_rng(4).standard_normal(32)
+    ctx, quality = fresh.em.attend(q)
+    ref_ctx, ref_quality = eng.em.attend(q)
+    assert len(fresh.em) == len(eng.em) and fresh.em.index.count == eng.em.index.count
+    np.testing.assert_allclose(ctx, ref_ctx, atol=1e-6)
+
+
+def test_snapshot_rejects_mismatched_engine(tmp_path):
+    """Restoring into a differently shaped engine fails instead of corrupting it"""
+    src = _engine()
+    for x in np.random.default_rng(6).standard_normal((30, 16)):
+        src.step(x)
+    path = src.snapshot(str(tmp_path / "a.npz"))
+    other = PsiEngine(SimpleBackend(seed=9), Params(em_capacity=80))
+    for x in np.random.default_rng(7).standard_normal((10, 16)):
+        other.step(x)
+    before = dict(k=other.k, theta=other.theta.copy(), prev_P=other.prev_P.copy(), ret=other.ret.state_dict(),
+                  backend=other.backend.state_dict(), rng=other.rng.bit_generator.state, capacity=other.params.em_capacity)
+    try:
+        other.restore(path)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert other.k == before["k"] and other.params.em_capacity == before["capacity"]
+    assert other.rng.bit_generator.state == before["rng"]
+    np.testing.assert_array_equal(other.theta, before["theta"])
+    np.testing.assert_array_equal(other.prev_P, before["prev_P"])
+    np.testing.assert_array_equal(other.ret.state_dict()["buf"], before["ret"]["buf"])
+    for key in ("E", "A"):
+        np.testing.assert_array_equal(other.backend.state_dict()[key], before["backend"][key])
+
+
+def test_snapshot_params_structural_mismatch_and_live_tunables(tmp_path):
+    """Structural params must match; tunables stay as the restoring engine was configured"""
+    src = _engine(C_w=64)
+    for x in np.random.default_rng(8).standard_normal((20, 16)):
+        src.step(x)
+    path = src.snapshot(str(tmp_path / "cw.npz"))
+    small = _engine(C_w=4)
+    try:
+        small.restore(path)
+    except ValueError as e:
+        assert "C_w" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+    assert small.params.C_w == 4 and small.wm.capacity == 4
+
+    tuned = _engine(C_w=64, consolidate_thresholds=(0.9, 0.4, (0.1, 1.5)))
+    tuned.restore(path)
+    assert tuned.params.tau_psi == 0.9 and tuned.k == src.k
+
+
+def test_service_backends_round_trip():
+    """Kalman and seasonal backend state survives a binary round trip"""
+    from src.backends.kalman import KalmanBackend
+    from src.backends.seasonal import SeasonalBackend
+    x = np.random.default_rng(5).standard_normal(16)
+    for cls in (KalmanBackend, SeasonalBackend):
+        a = cls()
+        a.encode(x)
+        a.adapt(x, a.z)
+        b = cls()
+        b.load_state_dict(checkpoint.loads(checkpoint.dumps(a.state_dict())))
+        restored = b.state_dict()
+        for name, value in a.state_dict().items():
+            if isinstance(value, np.ndarray):
+                assert np.array_equal(restored[name], value)
+        if cls is SeasonalBackend:
+            assert b.ref_time == a.ref_time
+            np.testing.assert_array_equal(b.seasonal_weights["daily"], a.seasonal_weights["daily"])
+
+
+def test_guardian_history_round_trip():
+    """AdvancedGuardian resumes with adaptive thresholds after a restore"""
+    from src.guardian_advanced import AdvancedGuardian
+    g = AdvancedGuardian(min_samples=10)
+    for i in range(30):
+        g.process_state({"Psi": 0.5 + 0.01 * i, "PE": 0.1 * i, "H": 1.0}, i)
+    h = AdvancedGuardian(min_samples=10)
+    h.load_state_dict(checkpoint.loads(checkpoint.dumps(g.state_dict())))
+    assert h._compute_thresholds() == g._compute_thresholds()
+    assert h.process_state({"Psi": 0.6, "PE": 0.2, "H": 1.0}, 31)["_guardian"]["thresholds"]["type"] == "adaptive"
@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import main
+from src.codec import (FEDERATION_METRICS, RESULT_METRICS, TELEMETRY_BINARY, decode, decode_federation,
+                       decode_telemetry, encode_federation, encode_telemetry, wants_binary)
+from src.federation import PsiFederation
+
+
+def _records(n):
+    rng = np.random.default_rng(0)
+    return [{"agent_id": "psi-field-agent" if i % 3 else "tenant-7", "k": i,
+             **{m: float(v) for m, v in zip(RESULT_METRICS, rng.random(8))},
+             "timestamp": datetime.utcnow().isoformat()} for i in range(n)]
+
+
+def test_telemetry_round_trip_and_size():
+    recs = _records(200)
+    data = encode_telemetry(recs)
+    assert len(data) < len(json.dumps(recs)) / 5
+
+    decoded = decode_telemetry(data)
+    for rec, out in zip(recs, decoded):
+        assert out["agent_id"] == rec["agent_id"] and out["k"] == rec["k"]
+        assert out["timestamp"] == rec["timestamp"]
+        assert all(out[m] == float(np.float32(rec[m])) for m in RESULT_METRICS)
+
+    schema, agents, rows = decode(data)
+    assert schema == 1 and agents == ["tenant-7", "psi-field-agent"] and len(rows) == 200
+    with pytest.raises(ValueError):
+        decode(data[:-1])
+    with pytest.raises(ValueError):
+        decode(b"JSON" + data[4:])
+    with pytest.raises(ValueError):
+        decode(data[:4] + b"\x09\x00" + data[6:])
+    with pytest.raises(ValueError):
+        decode_federation(data)
+
+
+def test_federation_round_trip_and_negotiation():
+    payload = {"agent_id": "psi-field-a", "psi": 0.75, "metrics": {m: 0.25 for m in FEDERATION_METRICS},
+               "timestamp": time.time(), "phase": {"real": 0.5, "imag": -0.5}}
+    got = decode_federation(encode_federation(payload))
+    assert got["agent_id"] == payload["agent_id"] and got["psi"] == 0.75 and got["phase"] == payload["phase"]
+    assert got["metrics"] == payload["metrics"] and got["timestamp"] == pytest.approx(payload["timestamp"])
+    del payload["phase"]
+    assert "phase" not in decode_federation(encode_federation(payload))
+
+    assert wants_binary(f"{TELEMETRY_BINARY}, application/json;q=0.5")
+    assert not wants_binary(f"application/json, {TELEMETRY_BINARY};q=0")
+    assert not wants_binary("*/*")
+
+    with TestClient(main.app) as client:
+        as_json = client.get("/federation/metrics")
+        as_binary = client.get("/federation/metrics", headers={"Accept": TELEMETRY_BINARY})
+    assert as_json.headers["content-type"].startswith("application/json")
+    assert as_binary.headers["content-type"] == TELEMETRY_BINARY
+    got = PsiFederation.parse_metrics(as_binary.headers["content-type"], as_binary.content)
+    assert got["agent_id"] == as_json.json()["agent_id"]
+    assert got["psi"] == pytest.approx(as_json.json()["psi"], rel=1e-6)
+
+
+def test_federation_metrics_post_accepts_both_encodings():
+    payload = {"agent_id": "psi-field-peer", "psi": 0.5, "metrics": {m: 0.125 for m in FEDERATION_METRICS},
+               "timestamp": time.time(), "phase": {"real": 0.25, "imag": 0.75}}
+    main.federation.peer_metrics.clear()
+    with TestClient(main.app) as client:
+        as_json = client.post("/federation/metrics", content=json.dumps(payload),
+                              headers={"Content-Type": "application/json"})
+        assert as_json.status_code == 200 and as_json.json()["agent_id"] == "psi-field-peer"
+        assert main.federation.peer_metrics["psi-field-peer"]["metrics"] == payload["metrics"]
+
+        binary = dict(payload, agent_id="psi-field-peer-2")
+        as_binary = client.post("/federation/metrics", content=encode_federation(binary),
+                                headers={"Content-Type": TELEMETRY_BINARY})
+        assert as_binary.status_code == 200
+        got = main.federation.peer_metrics["psi-field-peer-2"]
+        assert got["phase"] == payload["phase"] and got["metrics"] == payload["metrics"]
+
+        bad = client.post("/federation/metrics", content=encode_federation(binary)[:-1],
+                          headers={"Content-Type": TELEMETRY_BINARY})
+        assert bad.status_code == 400
+        assert client.post("/federation/metrics", json={"psi": 1.0}).status_code == 400
+    main.federation.peer_metrics.clear()
@@ -0,0 +1,54 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params, PsiEngine
+from vaultmesh_psi.backends.simple import SimpleBackend
+from vaultmesh_psi.adversary import AdversarialEnv
+
+METRICS = ("Psi", "C", "U", "Phi", "H", "PE")
+
+
+def _run(dtype, xs, **kw):
+    eng = PsiEngine(SimpleBackend(seed=4, dtype=dtype), Params(dtype=dtype, seed=0, **kw))
+    return eng, [eng.step(x) for x in xs]
+
+
+def test_float32_tracks_float64_reference():
+    """Float32 metrics stay within a fixed tolerance of the float64 run"""
+    env = AdversarialEnv(seed=3)
+    xs = [env.step() for _ in range(300)]
+    _, ref = _run("float64", xs)
+    eng, out = _run("float32", xs)
+    for name in METRICS:
+        a = np.array([r[name] for r in ref])
+        b = np.array([r[name] for r in out])
+        np.testing.assert_allclose(b, a, atol=1e-4, err_msg=name)
+    assert [r["k"] for r in out] == [r["k"] for r in ref]
+
+
+def test_float32_state_is_float32():
+    """Encode, rollouts, theta and retention all run in the configured dtype"""
+    eng, _ = _run("float32", np.random.default_rng(1).standard_normal((20, 16)))
+    assert eng.params.dtype == "float32"
+    assert eng.prev_P.dtype == np.float32
+    assert eng.theta["A"].dtype == np.float32
+    assert eng.ret._buf.dtype == np.float32 and eng.ret.summary().dtype == np.float32
+    assert eng.wm.items[0].dtype == np.float32
+    ref, _ = _run("float64", [])
+    assert eng.ret._buf.nbytes * 2 == ref.ret._buf.nbytes
+
+
+def test_service_backends_honour_dtype():
+    """Kalman and seasonal backends keep float32 state through encode/adapt"""
+    from src.backends.kalman import KalmanBackend
+    from src.backends.seasonal import SeasonalBackend
+    x = np.random.default_rng(2).standard_normal(16)
+    for cls in (KalmanBackend, SeasonalBackend):
+        b = cls(dtype=np.float32)
+        z = b.encode(x)
+        b.adapt(x, z)
+        assert z.dtype == np.float32 and b.A.dtype == np.float32 and b.C.dtype == np.float32
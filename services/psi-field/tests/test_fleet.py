@@ -0,0 +1,53 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params
+from vaultmesh_psi.backends.simple import SimpleBackend
+from vaultmesh_psi.adversary import AdversarialEnv
+from vaultmesh_psi.fleet import FleetGuardian
+from vaultmesh_psi.swarm import PsiSwarmEngine
+from src.guardian_advanced import AdvancedGuardian
+
+
+def test_fleet_matches_per_agent_guardians():
+    """One FleetGuardian tick == N AdvancedGuardian.process_state calls"""
+    rng = np.random.default_rng(0)
+    n, steps = 20, 400
+    Psi, PE, H = rng.uniform(0, 1, (steps, n)), rng.exponential(1, (steps, n)), rng.normal(1.5, 0.4, (steps, n))
+    fleet = FleetGuardian(n, window=120, min_samples=30, cooldown=25)
+    guards = [AdvancedGuardian(history_window=120, min_samples=30, intervention_cooldown=25) for _ in range(n)]
+
+    total = 0
+    for k in range(steps):
+        ref = []
+        for i, g in enumerate(guards):
+            info = g.process_state({"Psi": Psi[k, i], "PE": PE[k, i], "H": H[k, i]}, k)["_guardian"]
+            if info["intervention"]:
+                ref.append(dict(agent=i, intervention=info["intervention"], reason=info["reason"], k=k))
+                g.manual_intervention(info["intervention"], None)
+        assert fleet.observe(Psi[k], PE[k], H[k], k) == ref
+        total += len(ref)
+    assert total > 50
+    psi_low, pe_high, h_high = fleet.thresholds()
+    assert np.array_equal(pe_high, [g._compute_thresholds()[1] for g in guards])
+
+
+def test_fleet_drives_swarm():
+    n = 8
+    envs = [AdversarialEnv(seed=i) for i in range(n)]
+    swarm = PsiSwarmEngine([SimpleBackend(seed=i) for i in range(n)], Params())
+    fleet = FleetGuardian(n, window=40, min_samples=10, cooldown=5)
+    noise = np.array([b.noise for b in swarm.backends])
+    seen = []
+    for _ in range(60):
+        interventions = fleet.step(swarm.step(np.stack([e.step() for e in envs])))
+        fleet.apply(swarm, interventions)
+        seen.extend(interventions)
+    assert seen and fleet.intervention_count.sum() == len(seen)
+    hit = sorted({iv["agent"] for iv in seen})
+    assert all(b.noise != noise[i] for i, b in enumerate(swarm.backends) if i in hit)
+    assert all(b.noise == noise[i] for i, b in enumerate(swarm.backends) if i not in hit)
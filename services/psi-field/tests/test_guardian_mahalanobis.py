@@ -0,0 +1,73 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.guardian_advanced import AdvancedGuardian
+from src.guardian_mahalanobis import METRICS, MahalanobisGuardian, chi2_quantile
+
+
+def _states(xs):
+    return [{m: float(v) for m, v in zip(METRICS, x)} for x in xs]
+
+
+def test_factor_tracks_moving_covariance():
+    rng = np.random.default_rng(0)
+    xs = rng.standard_normal((1500, 7)) @ (0.3 * rng.standard_normal((7, 7))) + 1.0
+    xs[:, 6] = 0.5                     # a constant metric stays scoreable thanks to the ridge
+    g = MahalanobisGuardian(history_window=100, ridge=1e-4)
+
+    mu, cov = xs[0].copy(), np.zeros((7, 7))
+    g._update(list(xs[0]))
+    for n, x in enumerate(xs[1:], start=2):
+        dev = x - mu
+        g._update(list(x))
+        a = 1.0 / min(n, 100)
+        cov = (1 - a) * (cov + a * np.outer(dev, dev))
+        mu = mu + a * dev
+        if g._since_ridge == 0:        # the ridge is exactly 1e-4 right after a refresh
+            assert np.allclose(g.covariance(), cov + 1e-4 * np.eye(7), rtol=1e-9, atol=1e-12)
+            assert np.allclose(g._mean, mu)
+    probe = xs[-1] + 0.05
+    dev, before = probe - mu, g.covariance()
+    assert np.isclose(g._update(list(probe)), dev @ np.linalg.solve(before, dev), rtol=1e-6)
+    assert abs(chi2_quantile(0.99, 7) - 18.475) < 0.1
+
+
+def test_joint_drift_flagged_where_marginals_stay_in_range():
+    rng = np.random.default_rng(1)
+    z = rng.standard_normal(400)
+    xs = np.column_stack([z + 0.05 * rng.standard_normal(400) for _ in METRICS]) + 1.0
+    xs[:, METRICS.index("PE")] = 2.0 - z          # PE falls as Psi rises
+    adv, mah = AdvancedGuardian(), MahalanobisGuardian()
+    for s in _states(xs):
+        adv.assess_threat(s)
+        mah.assess_threat(s)
+
+    # Psi high together with PE high: each value is ordinary, the pair is not
+    odd = {m: 1.5 for m in METRICS}
+    odd["PE"] = 2.5
+    assert adv.assess_threat(dict(odd)) == (False, None)
+    threat, reason = mah.assess_threat(dict(odd))
+    assert threat and reason.startswith("high_PE:D2=")
+    assert mah.select_intervention(odd, reason) == "nigredo"
+    assert mah.select_intervention(odd, "low_C:D2=40.00>chi2_p99.0:18.48") == "albedo"
+
+
+def test_process_batch_and_snapshot_match_process_state():
+    rng = np.random.default_rng(2)
+    states = _states(rng.standard_normal((300, 7)) * 0.2 + 1.0)
+    a, b = MahalanobisGuardian(), MahalanobisGuardian()
+    for k, s in enumerate(states[:200]):
+        a.process_state(dict(s), k)
+    b.process_batch([dict(s) for s in states[:200]], list(range(200)))
+    assert a._chol == b._chol and a.last_d2 == b.last_d2
+
+    c = MahalanobisGuardian()
+    c.load_state_dict({k: (np.asarray(v) if isinstance(v, np.ndarray) else v) for k, v in a.state_dict().items()})
+    for k, s in enumerate(states[200:], start=200):
+        ra, rc = a.process_state(dict(s), k), c.process_state(dict(s), k)
+        assert ra["_guardian"] == rc["_guardian"]
+    assert a.get_statistics()["mahalanobis"]["samples"] == 300
+    assert a.get_statistics()["thresholds"]["type"] == "mahalanobis"
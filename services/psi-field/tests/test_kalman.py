@@ -0,0 +1,106 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backends.kalman import AdaptSchedule, KalmanBackend, benchmark_adapt, solve_dare
+
+
+def test_dare_solution_satisfies_riccati():
+    """Doubling solve returns a symmetric fixed point of the filter Riccati map"""
+    kb = KalmanBackend(seed=1)
+    A, C, Q, R = kb.A, kb.C, kb.Q, kb.R
+    P = solve_dare(A, C, Q, R)
+    S = C @ P @ C.T + R
+    rhs = A @ P @ A.T - A @ P @ C.T @ np.linalg.solve(S, C @ P @ A.T) + Q
+    np.testing.assert_allclose(rhs, P, atol=1e-10)
+    np.testing.assert_allclose(P, P.T, atol=1e-14)
+
+
+def test_steady_state_gain_matches_converged_full_update():
+    """The cached gain is where the full covariance recursion settles"""
+    cached, full = KalmanBackend(seed=2), KalmanBackend(seed=2, steady_state=False)
+    xs = np.random.default_rng(0).standard_normal((300, 16))
+    for x in xs:
+        za, zb = cached.encode(x), full.encode(x)
+    np.testing.assert_allclose(za, zb, atol=1e-9)
+    np.testing.assert_allclose(cached.P, full.P, atol=1e-9)
+
+
+def test_gain_cache_invalidation():
+    """adapt, noise interventions and restores drop the cached gain"""
+    kb = KalmanBackend(seed=3)
+    x = np.random.default_rng(1).standard_normal(16)
+    kb.encode(x)
+    K0, P0 = kb._gain
+    kb.encode(x)
+    assert kb._gain[0] is K0
+
+    kb.increase_noise(1.5)
+    assert kb._gain is None
+    kb.encode(x)
+    # scaling Q and R together keeps K and scales the covariance
+    np.testing.assert_allclose(kb._gain[0], K0, atol=1e-9)
+    np.testing.assert_allclose(kb._gain[1], 1.5 * P0, atol=1e-9)
+
+    for action in (lambda: kb.decrease_noise(0.7), lambda: kb.load_state_dict(kb.state_dict())):
+        kb.encode(x)
+        action()
+        assert kb._gain is None
+
+
+def test_adapt_resolves_gain_only_after_drift():
+    """adapt keeps the cached gain until A drifts past gain_tolerance"""
+    kb = KalmanBackend(seed=3, schedule=AdaptSchedule(gain_tolerance=0.02))
+    solves = 0
+    for x in np.random.default_rng(1).standard_normal((200, 16)):
+        solves += kb._gain is None
+        z = kb.encode(x)
+        kb.adapt(x, z)
+        if kb._gain is not None:
+            drift = np.linalg.norm(kb.A - kb._gain_A) / np.linalg.norm(kb._gain_A)
+            assert drift <= 0.02
+    assert 1 < solves < 100
+
+    exact = KalmanBackend(seed=3, schedule=AdaptSchedule.exact())
+    x = np.random.default_rng(1).standard_normal(16)
+    exact.adapt(x, exact.encode(x))
+    assert exact._gain is None
+
+
+def _radius(A):
+    return float(np.max(np.abs(np.linalg.eigvals(A))))
+
+
+def test_exact_schedule_matches_per_update_clip():
+    """AdaptSchedule.exact() reproduces the eigvals clip after every update"""
+    kb = KalmanBackend(seed=4, schedule=AdaptSchedule.exact())
+    A = kb.A.copy()
+    for x in np.random.default_rng(2).standard_normal((50, 16)):
+        z = kb.encode(x)
+        A = A + kb.lr * (-2 * kb.C.T @ (x - kb.C @ (A @ z))[:, None] @ z[None, :]).T
+        if _radius(A) > 0.99:
+            A *= 0.99 / _radius(A)
+        kb.adapt(x, z)
+        np.testing.assert_allclose(kb.A, A, atol=1e-12)
+
+
+def test_power_iteration_tracks_radius():
+    """The warm-started estimate converges to the exact radius and audits clip exactly"""
+    kb = KalmanBackend(seed=5, schedule=AdaptSchedule(check_every=1, audit_every=10))
+    for _ in range(30):
+        est = kb.spectral_radius_estimate(10)
+    assert abs(est - _radius(kb.A)) < 1e-3 * _radius(kb.A)
+
+    xs = np.random.default_rng(3).standard_normal((200, 16))
+    for x in xs:
+        kb.adapt(x, kb.encode(x))
+        if kb._adapt_count % 10 == 0:
+            assert _radius(kb.A) <= 0.99 + 1e-9
+
+
+def test_benchmark_reports_speedup():
+    res = benchmark_adapt(updates=200, latent_dim=64)
+    assert res["exact_max_radius"] <= 0.99 + 1e-9
+    assert res["speedup"] > 1.0
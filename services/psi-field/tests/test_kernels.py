@@ -0,0 +1,60 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params, PsiEngine, cos_sim, entropy_hist, pseudo_phase, phase_coherence
+from vaultmesh_psi.kernels import HistEntropy, entropy_rows, phase_coherence_rows, phase_terms, pseudo_phases, row_cos
+from vaultmesh_psi.backends.simple import SimpleBackend
+
+
+def _stacks(seed=0):
+    rng = np.random.default_rng(seed)
+    for d in (1, 2, 7, 32, 96, 257):
+        X = rng.standard_normal((9, d)) * rng.uniform(0.01, 50.0)
+        yield X
+        yield np.round(X)                  # ties and repeated values land on bin edges
+        yield np.repeat(X[:, :1], d, 1)    # constant rows take histogram's +-0.5 range
+
+
+def test_entropy_rows_match_reference():
+    """Bincount entropy equals entropy_hist exactly, row by row and for 1-D input"""
+    kernel = HistEntropy(32)
+    for X in _stacks():
+        ref = np.array([entropy_hist(x) for x in X])
+        assert np.array_equal(kernel(X), ref)
+        assert np.array_equal(entropy_rows(X), ref)
+        assert kernel(X[0]) == entropy_hist(X[0])
+
+
+def test_entropy_scratch_survives_shape_changes():
+    """Scratch buffers are reused per shape and reallocated when it changes"""
+    rng = np.random.default_rng(1)
+    kernel = HistEntropy(16)
+    for shape in [(4, 10), (4, 10), (1, 30), (6, 3), (4, 10)]:
+        X = rng.standard_normal(shape)
+        assert np.array_equal(kernel(X), [entropy_hist(x, bins=16) for x in X])
+
+
+def test_phase_kernels_match_reference():
+    """Stacked pseudo-phase, cos/sin, coherence and cosine equal the scalar helpers"""
+    for X in _stacks(2):
+        ph = pseudo_phases(X)
+        assert np.array_equal(ph, [pseudo_phase(x) for x in X])
+        c, s = phase_terms(X)
+        assert np.array_equal(c, np.cos(ph)) and np.array_equal(s, np.sin(ph))
+        assert abs(phase_coherence_rows(X) - phase_coherence(list(X))) < 1e-12
+        Y = X[::-1]
+        np.testing.assert_allclose(row_cos(X, Y), [cos_sim(a, b) for a, b in zip(X, Y)], atol=1e-12)
+
+
+def test_engine_fast_kernels_flag_is_transparent():
+    """PsiEngine produces the same records with and without the kernel path"""
+    rng = np.random.default_rng(3)
+    xs = rng.standard_normal((60, 16))
+    runs = []
+    for fast in (False, True):
+        eng = PsiEngine(SimpleBackend(seed=5, input_dim=16), Params(em_capacity=40, fast_kernels=fast, seed=11))
+        runs.append([eng.step(x) for x in xs])
+    assert runs[0] == runs[1]
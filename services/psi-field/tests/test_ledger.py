@@ -0,0 +1,105 @@
+import os
+import sys
+import json
+import hashlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.ledger import MerkleFrontier, StreamLedger, JsonLedgerIO, canonical, leaf_hash, node_hash
+from vaultmesh_psi.psi_core import Ledgers
+
+
+def _mth(leaves):
+    # RFC 6962 Merkle Tree Hash, computed from scratch
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return node_hash(_mth(leaves[:k]), _mth(leaves[k:]))
+
+
+def _records(n):
+    return [{"hash": hashlib.sha256(str(i).encode()).hexdigest(), "meta": {"k": i, "Psi": i / 7.0}} for i in range(n)]
+
+
+def test_merkle_frontier_matches_full_tree():
+    """Incremental frontier root equals the RFC 6962 root at every size"""
+    fr = MerkleFrontier()
+    leaves = []
+    assert fr.root() == _mth(leaves)
+    for r in _records(70):
+        leaf = leaf_hash(canonical(r))
+        fr.append(leaf)
+        leaves.append(leaf)
+        assert fr.root() == _mth(leaves)
+    assert len([n for n in fr.nodes if n is not None]) == bin(70).count("1")
+
+
+def test_stream_ledger_bounded_tail_without_spill():
+    """Without a directory only the tail is kept, but the root covers everything"""
+    led = StreamLedger("L_proto", tail=16)
+    ref = StreamLedger("ref", tail=1000)
+    for r in _records(100):
+        led.append(r)
+        ref.append(r)
+    assert len(led) == 100 and len(led.tail) == 16
+    assert led.first_in_memory == 84
+    assert list(led.replay()) == _records(100)[84:]
+    assert led.root == ref.root
+
+
+def test_stream_ledger_spill_and_replay(tmp_path):
+    """Spilled segments replay the full history in order, in both formats"""
+    recs = _records(300)
+    for fmt in ("jsonl", "bin"):
+        led = StreamLedger("L_ret", tail=8, directory=str(tmp_path / fmt), spill_every=32,
+                           segment_records=100, fmt=fmt)
+        for r in recs:
+            led.append(r)
+        assert list(led.replay()) == recs  # pending batch is replayed from memory
+        led.flush()
+        assert len(led.segments) == 3
+        assert list(led) == recs
+        assert led.verify()
+
+
+def test_stream_ledger_rerun_overwrites_and_restore_resumes(tmp_path):
+    """A fresh ledger never appends into an earlier run's segments; a restored one resumes them"""
+    recs = _records(250)
+    kw = dict(tail=8, directory=str(tmp_path), spill_every=32, segment_records=100)
+    first = StreamLedger("L_ret", **kw)
+    for r in recs:
+        first.append(r)
+    first.flush()
+
+    rerun = StreamLedger("L_ret", **kw)
+    for r in recs[:120]:
+        rerun.append(r)
+    rerun.flush()
+    assert list(rerun) == recs[:120] and rerun.verify()
+
+    resumed = StreamLedger("L_ret", **kw)
+    for r in recs:
+        resumed.append(r)
+    st = resumed.state_dict()
+    again = StreamLedger("L_ret", **kw)
+    again.load_state_dict(st)
+    for r in _records(60):
+        again.append(r)
+    again.flush()
+    assert list(again) == recs + _records(60) and again.verify()
+
+
+def test_ledgers_and_json_io_consume_stream(tmp_path):
+    """Ledgers keep the L_* views; JsonLedgerIO streams a StreamLedger to disk"""
+    L = Ledgers(tail=4, directory=str(tmp_path / "seg"), spill_every=2)
+    for r in _records(10):
+        L.append_proto(r)
+    assert L.L_proto == _records(10)[6:]
+    assert L.heads()["L_proto"]["count"] == 10
+    path = JsonLedgerIO(str(tmp_path / "out")).write("L_proto", L.proto)
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == _records(10)
@@ -0,0 +1,52 @@
+import os
+import sys
+from types import MappingProxyType
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.parser import text_string_to_metric_families
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.metrics import MetricsExporter, STATE_GAUGES
+
+
+def _state(psi):
+    return MappingProxyType({key: psi for _, _, key in STATE_GAUGES})
+
+
+class _DepthCollector:
+    def __init__(self):
+        self.depth = 0
+
+    def collect(self):
+        yield GaugeMetricFamily("psi_field_queue_depth", "Engine jobs queued or running", value=self.depth)
+
+
+def test_exposition_is_cached_and_rerenders_only_changed_engines():
+    exporter = MetricsExporter()
+    depth = _DepthCollector()
+    exporter.register(depth)
+    exporter.publish(None, _state(0.1))
+    for agent in ("a", "b", "c"):
+        exporter.publish(agent, _state(0.2))
+    rendered = []
+    render_state = exporter._render_state
+    exporter._render_state = lambda agent_id, state: rendered.append(agent_id) or render_state(agent_id, state)
+    text = exporter.render()
+    assert sorted(rendered, key=str) == sorted([None, "a", "b", "c"], key=str)
+
+    # collectors are read on every scrape, without re-rendering any engine
+    rendered.clear()
+    depth.depth = 7
+    assert b"psi_field_queue_depth 7.0" in exporter.render() and rendered == []
+    exporter.publish("b", _state(0.7))
+    exporter.step_seconds.observe(1e-4)
+    text = exporter.render().decode("utf-8")
+    assert rendered == ["b"]
+
+    families = {f.name: f for f in text_string_to_metric_families(text)}
+    density = {s.labels.get("agent_id"): s.value for s in families["psi_field_density"].samples}
+    assert density == {None: 0.1, "a": 0.2, "b": 0.7, "c": 0.2}
+    assert families["psi_field_step_duration_seconds"].type == "histogram"
+
+    exporter.drop("c")
+    assert 'agent_id="c"' not in exporter.render().decode("utf-8")
@@ -0,0 +1,199 @@
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.mq import RabbitMQPublisher
+
+
+class StandInBroker:
+    """In-process AMQP stand-in: connections, confirms, failures and a slow-ack gate"""
+
+    def __init__(self, refuse=0):
+        self.refuse = refuse          # connection attempts to refuse
+        self.fail_next = 0            # basic_publish calls to fail (connection drop)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.messages = []
+        self.connections = 0
+
+    def connect(self):
+        if self.refuse:
+            self.refuse -= 1
+            raise ConnectionError("broker unavailable")
+        self.connections += 1
+        return StandInConnection(self)
+
+    def records(self):
+        return [r for key, body, _ in self.messages if key.endswith(".telemetry.batch")
+                for r in json.loads(body)["records"]]
+
+    def wait_for(self, predicate, timeout=5.0):
+        end = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < end, "stand-in broker timed out"
+            time.sleep(0.005)
+
+
+class StandInConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.is_open = True
+
+    def channel(self):
+        return StandInChannel(self.broker)
+
+    def process_data_events(self, time_limit=0):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+class StandInChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.confirming = False
+
+    def exchange_declare(self, exchange, exchange_type, durable):
+        assert exchange_type == "topic" and durable
+
+    def confirm_delivery(self):
+        self.confirming = True
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        assert self.confirming
+        self.broker.gate.wait()       # confirms held back: a slow broker
+        if self.broker.fail_next:
+            self.broker.fail_next -= 1
+            raise ConnectionError("connection reset")
+        self.broker.messages.append((routing_key, body, properties))
+
+
+def _publisher(monkeypatch, broker, **kw):
+    monkeypatch.setenv("RABBIT_ENABLED", "1")
+    kw.setdefault("flush_ms", 20)
+    kw.setdefault("batching", True)
+    return RabbitMQPublisher(agent_id="a1", exchange="swarm", connection_factory=broker.connect,
+                             reconnect_min=0.01, **kw)
+
+
+def test_coalesces_telemetry_and_sends_alerts(monkeypatch):
+    broker = StandInBroker()
+    pub = _publisher(monkeypatch, broker, batch_max=100)
+    pub.publish_telemetry_batch([{"k": k} for k in range(250)])
+    pub.publish_guardian_alert({"intervention": "nigredo"})
+    broker.wait_for(lambda: len(broker.records()) == 250)
+
+    keys = [key for key, _, _ in broker.messages]
+    assert keys.count("swarm.a1.telemetry.batch") == 3 and keys.count("guardian.alerts") == 1
+    assert [r["k"] for r in broker.records()] == list(range(250))
+    assert broker.messages[0][2].delivery_mode == 2
+
+    pub.publish_telemetry({"k": 250})             # a lone record goes out on the flush timer
+    broker.wait_for(lambda: len(broker.records()) == 251)
+    pub.close()
+    stats = pub.stats()
+    assert stats["published"] == 251 and stats["alerts_published"] == 1 and stats["dropped"] == 0
+
+
+def test_default_routing_keeps_per_record_telemetry_key(monkeypatch):
+    broker = StandInBroker()
+    monkeypatch.delenv("RABBIT_BATCH", raising=False)
+    pub = _publisher(monkeypatch, broker, batching=None, batch_max=4)
+    assert not pub.batching
+    pub.publish_telemetry({"k": 0})
+    pub.publish_telemetry_batch([{"k": k} for k in range(1, 7)])
+    pub.publish_telemetry({"k": 7})
+    broker.wait_for(lambda: len(broker.messages) == 4)
+    pub.close()
+
+    keys = [key for key, _, _ in broker.messages]
+    assert keys == ["swarm.a1.telemetry", "swarm.a1.telemetry.batch", "swarm.a1.telemetry.batch",
+                    "swarm.a1.telemetry"]
+    assert json.loads(broker.messages[0][1]) == {"k": 0, "agent_id": "a1"}
+    assert [r["k"] for r in broker.records()] == list(range(1, 7))
+    assert pub.stats()["published"] == 8
+
+
+def test_slow_broker_never_blocks_and_overflow_is_counted(monkeypatch):
+    broker = StandInBroker()
+    broker.gate.clear()
+    pub = _publisher(monkeypatch, broker, batch_max=10, outbox_max=50)
+    t0 = time.perf_counter()
+    for k in range(1000):
+        pub.publish_telemetry({"k": k})
+    assert time.perf_counter() - t0 < 0.5
+    stats = pub.stats()
+    assert stats["depth"] == 50 and stats["dropped"] >= 900
+
+    broker.gate.set()
+    pub.close()
+    stats = pub.stats()
+    assert stats["depth"] == 0 and stats["published"] + stats["dropped"] == 1000
+    assert broker.records()[-1]["k"] == 999       # the newest records survive
+
+    sampler = _publisher(monkeypatch, StandInBroker(refuse=10 ** 6), outbox_max=40, overflow="sample")
+    for k in range(400):
+        sampler.publish_telemetry({"k": k})
+    stats = sampler.stats()
+    assert stats["sampled"] > 0 and stats["depth"] + stats["sampled"] + stats["dropped"] == 400
+    sampler.close(timeout=0.05)
+
+
+def test_reconnects_with_backoff_without_losing_records(monkeypatch):
+    broker = StandInBroker(refuse=3)
+    pub = _publisher(monkeypatch, broker, batch_max=5)
+    pub.publish_telemetry_batch([{"k": k} for k in range(10)])
+    broker.wait_for(lambda: len(broker.records()) == 10)
+    broker.fail_next = 1
+    pub.publish_telemetry_batch([{"k": k} for k in range(10, 20)])
+    broker.wait_for(lambda: len(broker.records()) == 20)
+    pub.close()
+
+    assert [r["k"] for r in broker.records()] == list(range(20))
+    stats = pub.stats()
+    assert stats["failures"] == 4 and stats["reconnects"] == 1 and broker.connections == 2
+
+
+def test_binary_telemetry_batches(monkeypatch):
+    from src.codec import TELEMETRY_BINARY, decode_telemetry
+    broker = StandInBroker()
+    pub = _publisher(monkeypatch, broker, batch_max=50, content_type=TELEMETRY_BINARY)
+    pub.publish_telemetry_batch([{"agent_id": "a1", "k": k, "timestamp": "2026-01-01T00:00:00.000001",
+                                  **dict.fromkeys(("Psi", "C", "U", "Phi", "H", "PE", "M", "dt_eff"), 0.5)}
+                                 for k in range(120)])
+    broker.wait_for(lambda: sum(1 for m in broker.messages) == 3)
+    pub.close()
+    assert all(props.content_type == TELEMETRY_BINARY for _, _, props in broker.messages)
+    records = [r for _, body, _ in broker.messages for r in decode_telemetry(body)]
+    assert [r["k"] for r in records] == list(range(120)) and records[0]["timestamp"] == "2026-01-01T00:00:00.000001"
+
+
+def test_unserializable_batch_is_dropped_and_thread_survives(monkeypatch):
+    import numpy as np
+    from src.codec import TELEMETRY_BINARY, decode_telemetry
+    broker = StandInBroker()
+    pub = _publisher(monkeypatch, broker, batch_max=5)
+    pub.publish_telemetry_batch([{"k": np.int64(k), "psi": np.float32(0.5)} for k in range(5)])
+    pub.publish_telemetry_batch([{"k": object()}] * 5)
+    pub.publish_telemetry_batch([{"k": k} for k in range(5, 10)])
+    broker.wait_for(lambda: len(broker.records()) == 10)
+    assert [r["k"] for r in broker.records()] == list(range(10))
+    stats = pub.stats()
+    assert stats["failures"] == 1 and stats["dropped"] == 5 and stats["published"] == 10
+    pub.close()
+
+    broker = StandInBroker()
+    binary = _publisher(monkeypatch, broker, batch_max=2, content_type=TELEMETRY_BINARY)
+    good = {"agent_id": "a1", "timestamp": "2026-01-01T00:00:00",
+            **dict.fromkeys(("Psi", "C", "U", "Phi", "H", "PE", "M", "dt_eff"), 0.5)}
+    binary.publish_telemetry_batch([dict(good, k=0), {"agent_id": "a1", "k": 1}])   # no timestamp
+    binary.publish_telemetry_batch([dict(good, k=2), dict(good, k=3)])
+    broker.wait_for(lambda: len(broker.messages) == 1)
+    binary.close()
+    assert [r["k"] for r in decode_telemetry(broker.messages[0][1])] == [2, 3]
+    assert binary.stats()["failures"] == 1 and binary.stats()["dropped"] == 2
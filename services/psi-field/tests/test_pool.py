@@ -0,0 +1,68 @@
+import os
+import sys
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params, PsiEngine
+from vaultmesh_psi.backends.simple import SimpleBackend
+from src import main
+from src.guardian_advanced import AdvancedGuardian
+from src.pool import EnginePool, TenantBudgetExceeded
+
+
+def _pool(tmp_path, **kw):
+    return EnginePool(lambda: PsiEngine(SimpleBackend(seed=9), Params(em_capacity=40, seed=1)),
+                      lambda: AdvancedGuardian(history_window=50, min_samples=10),
+                      snapshot_dir=str(tmp_path), **kw)
+
+
+def test_pool_evicts_lru_and_restores_from_snapshot(tmp_path):
+    pool = _pool(tmp_path, max_engines=2)
+    xs = np.random.default_rng(0).standard_normal((30, 16))
+    a = pool.get("a")
+    for x in xs[:20]:
+        a.engine.step(x)
+    pool.get("b")
+    pool.get("a")            # a becomes most recently used
+    pool.get("c")            # evicts b
+    assert "b" not in pool and "a" in pool and pool.evicted == 1
+    pool.get("d")            # evicts a, snapshotting it
+    assert "a" not in pool and pool.has_snapshot("a")
+
+    restored = pool.get("a")
+    assert restored is not a and restored.engine.k == a.engine.k and pool.restored == 1
+    for x in xs[20:]:
+        assert restored.engine.step(x) == a.engine.step(x)
+
+
+def test_pool_idle_ttl_and_memory_budget(tmp_path):
+    pool = _pool(tmp_path, idle_ttl=10.0)
+    pool.get("idle").last_used -= 11
+    pool.get("busy")
+    assert "idle" not in pool and "busy" in pool
+
+    with pytest.raises(TenantBudgetExceeded):
+        _pool(tmp_path, memory_budget=1024).get("big")
+    with pytest.raises(ValueError):
+        pool.get("../escape")
+
+
+def test_agent_id_routes_to_separate_engines():
+    x = np.ones(16).tolist()
+    with TestClient(main.app) as client:
+        k0 = client.get("/state").json()["k"]
+        for _ in range(3):
+            assert client.post("/step?agent_id=pool-test-a", json={"x": x}).status_code == 200
+        client.post("/step?agent_id=pool-test-b", json={"x": x})
+
+        assert client.get("/state").json()["k"] == k0
+        assert client.get("/state?agent_id=pool-test-a").json()["k"] > client.get(
+            "/state?agent_id=pool-test-b").json()["k"]
+        assert client.get("/state?agent_id=never-seen").status_code == 404
+        assert client.get("/state?agent_id=bad/id").status_code == 422
+        assert 'psi_field_density{agent_id="pool-test-a"}' in client.get("/metrics?agent_id=pool-test-a").text
+        assert "psi_field_pool_engines 2.0" in client.get("/metrics").text
@@ -0,0 +1,46 @@
+import os
+import sys
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params, PsiEngine
+from vaultmesh_psi.backends.simple import SimpleBackend
+from vaultmesh_psi.profile import PHASES
+from src import main
+
+
+def test_profiler_reports_phases_without_changing_records():
+    xs = np.random.default_rng(0).standard_normal((60, 16))
+    plain = PsiEngine(SimpleBackend(seed=3), Params(seed=1))
+    profiled = PsiEngine(SimpleBackend(seed=3), Params(seed=1), profile=True)
+    profiled.enable_profiling(window=32)
+    for x in xs:
+        assert profiled.step(x) == plain.step(x)
+
+    assert plain.get_profile() == {}
+    profile = profiled.get_profile()
+    assert set(profile) == set(PHASES) | {"total"}
+    assert all(stats["count"] == 60 for stats in profile.values())
+    assert sum(profile[phase]["mean_us"] for phase in PHASES) <= profile["total"]["mean_us"]
+    assert profile["total"]["p50_us"] <= profile["total"]["p99_us"]
+
+    profiled.disable_profiling()
+    profiled.step(xs[0])
+    assert profiled.get_profile() == {}
+
+
+def test_profile_exposed_via_metrics_and_mcp(monkeypatch):
+    if not main.IMPORT_SUCCESS:
+        pytest.skip("the synthetic fallback engine has no step phases")
+    monkeypatch.setattr(main, "PSI_PROFILE", True)
+    with TestClient(main.app) as client:
+        client.post("/step/batch", json={"xs": np.ones((5, 16)).tolist()})
+        text = client.get("/metrics").text
+        assert 'psi_field_step_phase_seconds{phase="encode",quantile="0.5"}' in text
+        rpc = client.post("/mcp", json={"jsonrpc": "2.0", "id": "1", "method": "psi_get_profile", "params": {}})
+        result = rpc.json()["result"]
+        assert result["enabled"] and result["phases"]["total"]["count"] == 5
@@ -0,0 +1,173 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# The core package lives one level down (vaultmesh_psi/vaultmesh_psi)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import EpisodicMemory, RetentionBuffer, cos_sim, softmax, pseudo_phase, phase_coherence
+from vaultmesh_psi.index import recall_report
+
+
+def _reference_attend(vectors, q, topk=8):
+    sims = np.array([cos_sim(q, v) for v in vectors])
+    idxs = np.argsort(sims)[-topk:]
+    weights = softmax(sims[idxs])
+    ctx = np.sum([vectors[i] * weights[j] for j, i in enumerate(idxs)], axis=0)
+    return ctx, float(np.mean(sims[idxs]))
+
+
+def test_episodic_memory_eviction_matches_drop_policy():
+    """Ring buffer keeps the same vectors and meta as the list-based drop-10% policy"""
+    rng = np.random.default_rng(0)
+    em = EpisodicMemory(8, capacity=50)
+    ref, ref_meta = [], []
+    for i in range(173):
+        v = rng.standard_normal(8)
+        em.add(v, {"i": i})
+        if len(ref) >= 50:
+            ref, ref_meta = ref[5:], ref_meta[5:]
+        ref.append(v)
+        ref_meta.append({"i": i})
+
+    assert em.meta == ref_meta
+    assert len(em) == len(ref)
+    assert em.vectors.shape == (len(ref), 8)
+    np.testing.assert_allclose(em.vectors, np.array(ref), atol=1e-5)
+
+
+def test_episodic_memory_attend_matches_reference():
+    """Batched attention returns the same context and quality as pairwise cos_sim"""
+    rng = np.random.default_rng(1)
+    em = EpisodicMemory(16, capacity=64)
+    for _ in range(100):
+        em.add(rng.standard_normal(16))
+    q = rng.standard_normal(16)
+
+    ctx, quality = em.attend(q, topk=8)
+    ref_ctx, ref_quality = _reference_attend(em.vectors, q, topk=8)
+    np.testing.assert_allclose(ctx, ref_ctx, atol=1e-5)
+    assert abs(quality - ref_quality) < 1e-6
+
+
+def test_episodic_memory_empty():
+    """Empty memory returns a zero context"""
+    em = EpisodicMemory(4)
+    ctx, quality = em.attend(np.ones(4))
+    assert np.all(ctx == 0) and quality == 0.0
+
+
+def test_ivf_index_tracks_live_slots_through_eviction():
+    """IVF lists always hold exactly the live ring-buffer slots"""
+    rng = np.random.default_rng(2)
+    em = EpisodicMemory(16, capacity=2000, index="ivf", index_params={"nlist": 16})
+    for _ in range(7000):
+        em.add(rng.standard_normal(16))
+    ix = em.index
+    assert ix.trained
+    filed = np.concatenate([ix._lists[c][:ix._sizes[c]] for c in range(ix.nlist)])
+    assert sorted(filed.tolist()) == np.flatnonzero(ix.flat.live).tolist()
+    assert len(filed) == len(em)
+    # online centroids stay the normalized sums of their current members
+    for c in np.flatnonzero(ix._sizes):
+        members = ix._lists[c][:ix._sizes[c]]
+        assert np.all(ix.assign[members] == c)
+        s = em._units[members].astype(np.float64).sum(axis=0)
+        assert np.allclose(ix.centroids[c], s / np.linalg.norm(s), atol=1e-4)
+
+
+def test_ivf_default_params():
+    """IVF builds with its default nlist/nprobe, standalone and through PsiEngine"""
+    from vaultmesh_psi.psi_core import Params, PsiEngine
+    from vaultmesh_psi.backends.simple import SimpleBackend
+    rng = np.random.default_rng(0)
+    em = EpisodicMemory(8, capacity=512, index="ivf")
+    assert em.index.nlist == 22 and em.index.nprobe == 19
+    for _ in range(1200):
+        em.add(rng.standard_normal(8))
+    assert em.index.trained and em.index.count == len(em)
+    eng = PsiEngine(SimpleBackend(seed=1), Params(em_capacity=512, em_index="ivf", seed=0))
+    assert eng.em.index.nlist == 22
+    for _ in range(300):
+        eng.step(rng.standard_normal(eng.backend.input_dim))
+    assert eng.em.index.count == len(eng.em)
+
+
+def test_ivf_recall_report():
+    """Default nprobe keeps recall@8 >= 0.9 even on unstructured latents"""
+    report = recall_report("ivf", n=20000, queries=50, data="isotropic")
+    assert report["recall"] >= 0.9
+    assert report["approx_us"] > 0 and report["exact_us"] > 0
+    # the same data does fail with too few probes
+    assert recall_report("ivf", n=20000, queries=50, data="isotropic", nprobe=8)["recall"] < 0.9
+    assert recall_report("ivf", n=20000, queries=50, nprobe=8)["recall"] >= 0.9
+    with pytest.raises(ValueError):
+        recall_report("ivf", n=100, data="uniform")
+
+
+def test_simple_rollout_matches_loop():
+    """Batched rollout reproduces the per-trajectory recurrence from one noise draw"""
+    from vaultmesh_psi.backends.simple import SimpleBackend
+    a, b = SimpleBackend(seed=3), SimpleBackend(seed=3)
+    theta = a.init_theta(32)
+    start = np.tanh(np.random.default_rng(3).standard_normal(32))
+
+    traj = a.rollout(theta, start, horizon=3.0, N=16, dt=0.2)
+    assert traj.shape == (16, 15, 32)
+
+    for n in range(16):
+        z = start.copy()
+        for t in range(15):
+            z = theta["A"] @ z + b.noise * b.rng.standard_normal(32)
+            np.testing.assert_allclose(traj[n, t], z, atol=1e-12)
+
+    first = a.rollout(theta, start, horizon=3.0, N=16, dt=0.2, first_only=True)
+    assert first.shape == (16, 1, 32)
+
+
+def test_retention_running_sums_match_recomputation():
+    """Running mean and phase sums track a full recomputation over the traces"""
+    rng = np.random.default_rng(4)
+    ret = RetentionBuffer(3.0, 0.2, 8)
+    for i in range(100):
+        ret.push(rng.standard_normal(8))
+        traces = ret.traces
+        assert len(traces) == min(i + 1, 15)
+        np.testing.assert_allclose(ret.summary(), np.mean(traces, axis=0), atol=1e-12)
+        phases = [pseudo_phase(t) for t in traces]
+        assert abs(ret.cos_sum - np.sum(np.cos(phases))) < 1e-12
+        assert abs(ret.sin_sum - np.sum(np.sin(phases))) < 1e-12
+
+    phi = rng.standard_normal(8)
+    n = 1 + len(ret)
+    re = (np.cos(pseudo_phase(phi)) + ret.cos_sum) / n
+    im = (np.sin(pseudo_phase(phi)) + ret.sin_sum) / n
+    assert abs(np.sqrt(re * re + im * im) - phase_coherence([phi] + ret.traces)) < 1e-12
+
+    ret.clear()
+    assert len(ret) == 0 and ret.traces == []
+    assert np.all(ret.summary() == 0)
+
+
+def test_working_memory_keeps_top_scores():
+    """Heap admission keeps the same top-C scores as sort-and-trim"""
+    from vaultmesh_psi.psi_core import WorkingMemory
+    rng = np.random.default_rng(5)
+    wm = WorkingMemory(16)
+    ref = []
+    for i in range(200):
+        s = float(rng.random())
+        wm.add(np.full(4, s), s)
+        ref = sorted(ref + [s])[-16:]
+    assert wm.scores == ref
+    assert all(item[0] == s for item, s in zip(wm.items, wm.scores))
+    assert wm.usage() == 1.0
+
+    bulk = WorkingMemory(16)
+    scores = rng.random(100)
+    bulk.add_many(np.repeat(scores[:, None], 4, axis=1), scores)
+    assert bulk.scores == sorted(scores)[-16:]
+
+    bulk.clear()
+    assert bulk.usage() == 0.0 and bulk.items == []
@@ -0,0 +1,59 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.rolling import RollingWindow
+from src.guardian_advanced import AdvancedGuardian
+
+
+def test_rolling_window_matches_numpy():
+    xs = np.random.default_rng(0).exponential(size=700)
+    w = RollingWindow(150)
+    for i, x in enumerate(xs):
+        w.append(x)
+        win = xs[max(0, i - 149):i + 1]
+        for q in (5.0, 50.0, 95.0, 99.0):
+            assert w.quantile(q) == np.percentile(win, q)
+        assert np.isclose(w.mean(), win.mean(), rtol=1e-12)
+        assert np.isclose(w.std(), win.std(), rtol=1e-9, atol=1e-12)
+        assert (w.min(), w.max()) == (win.min(), win.max())
+    assert list(w) == list(xs[-150:])
+
+
+def test_guardian_thresholds_are_window_percentiles():
+    rng = np.random.default_rng(1)
+    g = AdvancedGuardian(history_window=80, min_samples=20)
+    for k in range(200):
+        state = g.process_state(dict(Psi=float(rng.uniform()), PE=float(rng.exponential()), H=1.0), k)
+    th = state["_guardian"]["thresholds"]
+    assert th["type"] == "adaptive"
+    assert th["psi_low"] == np.percentile(list(g.psi_history), 5.0)
+    assert th["pe_high"] == np.percentile(list(g.pe_history), 95.0)
+    assert g.get_statistics()["statistics"]["pe"]["p95"] == np.percentile(list(g.pe_history), 95)
+
+
+def test_non_finite_samples_are_skipped():
+    rng = np.random.default_rng(2)
+    xs = rng.normal(size=400)
+    xs[[10, 13, 17, 120]] = np.nan
+    xs[[50, 51]] = [np.inf, -np.inf]
+    w = RollingWindow(60)
+    w.extend(xs)
+    finite = xs[np.isfinite(xs)][-60:]
+    assert w.skipped == 6 and list(w) == list(finite)
+    assert w.quantile(95.0) == np.percentile(finite, 95.0)
+    assert np.isclose(w.mean(), finite.mean()) and np.isclose(w.std(), finite.std())
+
+
+def test_guardians_survive_nan_metrics():
+    from src.guardian_mahalanobis import MahalanobisGuardian
+    rng = np.random.default_rng(3)
+    for cls in (AdvancedGuardian, MahalanobisGuardian):
+        g = cls(history_window=40, min_samples=20)
+        for k in range(200):
+            pe = np.nan if k in (10, 13, 17) else float(rng.exponential())
+            state = g.process_state(dict(Psi=float(rng.uniform()), PE=pe, H=1.0, C=0.5, U=0.5, Phi=0.5, M=0.5), k)
+        assert np.isfinite(state["_guardian"]["thresholds"].get("pe_high", 0.0))
+        assert g.pe_history.skipped == 3
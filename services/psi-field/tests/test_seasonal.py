@@ -0,0 +1,71 @@
+import os
+import sys
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backends.seasonal import SeasonalBackend
+
+
+def _reference_features(sb, timestamp):
+    """Per-period cos/sin pairs as the original dict-based implementation computed them"""
+    elapsed = (timestamp - sb.ref_time).total_seconds()
+    out = []
+    for period in sb.seasonal_periods.values():
+        phase = 2 * np.pi * (elapsed % period) / period
+        out += [np.cos(phase), np.sin(phase)]
+    return np.array(out)
+
+
+def test_stacked_features_match_per_period_formula():
+    sb = SeasonalBackend(seed=0)
+    sb.ref_time = datetime(2025, 1, 6)
+    for hours in (0.0, 1.25, 30.5, 200.0):
+        ts = datetime(2025, 1, 6) + timedelta(hours=hours)
+        np.testing.assert_allclose(sb._compute_seasonal_features(ts), _reference_features(sb, ts), atol=1e-12)
+        np.testing.assert_allclose(sb._compute_seasonal_features(ts.timestamp()), _reference_features(sb, ts),
+                                   atol=1e-12)
+
+
+def test_encode_many_matches_sequential_encode():
+    rng = np.random.default_rng(1)
+    xs = rng.standard_normal((500, 16))
+    ts = 1.7e9 + np.cumsum(rng.uniform(1, 120, size=500))
+    a, b = SeasonalBackend(seed=2), SeasonalBackend(seed=2)
+    b.ref_time = a.ref_time
+    a.W[:] = b.W[:] = rng.standard_normal(a.W.shape) * 0.1
+
+    za = np.stack([a.encode(x, t) for x, t in zip(xs, ts)])
+    zb = b.encode_many(xs, ts)
+    np.testing.assert_allclose(zb, za, rtol=0, atol=1e-10)
+    np.testing.assert_allclose(b.trend, a.trend, rtol=0, atol=1e-12)
+    assert b.current_time == a.current_time
+    # adapt after a batch uses the last row's features, as after a single encode
+    a.adapt(xs[-1], a.z)
+    b.adapt(xs[-1], b.z)
+    np.testing.assert_allclose(b.seasonal_weights["weekly"], a.seasonal_weights["weekly"], rtol=0, atol=1e-10)
+
+
+def test_seasonal_weights_are_read_only_views():
+    sb = SeasonalBackend(seed=3)
+    w = np.arange(32, dtype=float).reshape(16, 2)
+    with pytest.raises(TypeError):
+        sb.seasonal_weights["daily"] = w
+    sb.set_seasonal_weights("daily", w)
+    np.testing.assert_array_equal(sb.seasonal_weights["daily"], w)
+    assert not sb.seasonal_weights["hourly"].any() and not sb.seasonal_weights["weekly"].any()
+    with pytest.raises(ValueError):
+        sb.set_seasonal_weights("daily", w.T)
+    with pytest.raises(KeyError):
+        sb.set_seasonal_weights("monthly", w)
+
+
+def test_phase_table_is_within_resolution():
+    exact, table = SeasonalBackend(seed=3), SeasonalBackend(seed=3, phase_resolution=1.0)
+    table.ref_time = exact.ref_time
+    ts = exact._ref_epoch + np.random.default_rng(4).uniform(0, 2e6, size=1000)
+    err = np.abs(table._compute_seasonal_features(ts) - exact._compute_seasonal_features(ts))
+    # nearest sample is at most half a step away in phase
+    assert err.max() <= np.pi / 3600 + 1e-12
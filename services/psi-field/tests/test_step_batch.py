@@ -0,0 +1,66 @@
+import copy
+import os
+import sys
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import main
+from src.guardian_advanced import AdvancedGuardian
+
+
+def test_process_batch_matches_process_state():
+    """The vectorized guardian pass is step-for-step identical to process_state"""
+    rng = np.random.default_rng(0)
+    states = [dict(Psi=float(rng.uniform()), PE=float(rng.exponential()), H=float(rng.uniform(0, 3)))
+              for _ in range(600)]
+    a = AdvancedGuardian(history_window=120, min_samples=30, intervention_cooldown=25)
+    b = copy.deepcopy(a)
+    expected = [a.process_state(dict(s), k) for k, s in enumerate(states)]
+    got = []
+    for i in range(0, len(states), 97):  # uneven chunks cross the warm-up boundary
+        chunk = [dict(s) for s in states[i:i + 97]]
+        got += b.process_batch(chunk, list(range(i, i + len(chunk))))
+    assert got == expected
+    assert list(b.psi_history) == list(a.psi_history)
+
+
+def test_step_batch_endpoint():
+    xs = np.random.default_rng(1).standard_normal((20, 16)).tolist()
+    with TestClient(main.app) as client:
+        k0 = getattr(main.psi_engine, "k", 0)
+        resp = client.post("/step/batch", json={"xs": xs})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["count"] == 20
+        assert all(len(body[key]) == 20 for key in main.STEP_METRICS)
+        assert body["k"] == sorted(body["k"]) and body["k"][0] > k0
+        assert client.get("/state").json()["k"] == body["k"][-1]
+
+        assert client.post("/step/batch", json={"xs": [[1.0, 2.0], [3.0]]}).status_code == 422
+        assert client.post("/step/batch", json={"xs": []}).status_code == 422
+
+        rpc = client.post("/mcp", json={"jsonrpc": "2.0", "id": "1", "method": "psi_step_batch",
+                                        "params": {"xs": xs[:3]}})
+        assert rpc.json()["result"]["count"] == 3
+
+
+def test_batch_interventions_match_per_row_steps():
+    """Interventions in a batch apply before the next row, exactly as with /step"""
+    from src.pool import Tenant
+    xs = np.random.default_rng(2).standard_normal((120, 16)) * 3.0
+
+    def tenant():
+        g = AdvancedGuardian(history_window=40, percentile_threshold=80.0, intervention_cooldown=10, min_samples=10)
+        return Tenant("batch-parity", main.build_engine({"seed": 5}), g)
+
+    a, b = tenant(), tenant()
+    per_row = [main.run_step(x, True, a) for x in xs]
+    batched, interventions = main.run_batch(xs, True, b)
+    assert len(interventions) > 1 and interventions[0]["k"] < len(xs)
+    assert [r["k"] for r in per_row if r["_guardian"]["intervention"]] == [iv["k"] for iv in interventions]
+    for ra, rb in zip(per_row, batched):
+        assert {key: ra[key] for key in main.STEP_METRICS} == {key: rb[key] for key in main.STEP_METRICS}
+        assert ra["_guardian"] == rb["_guardian"]
+    assert list(a.guardian.pe_history) == list(b.guardian.pe_history)
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import os
+import sys
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import main
+from src.streaming import RESULT_FRAME, decode_results, float32_frames, ndjson_frames
+
+
+async def _collect(gen):
+    return [x async for x in gen]
+
+
+async def _aiter(chunks):
+    for c in chunks:
+        yield c
+
+
+def test_decoders_reassemble_split_frames():
+    X = np.arange(5 * 4, dtype="<f4").reshape(5, 4)
+    raw = X.tobytes()
+    chunks = [raw[:7], raw[7:40], raw[40:41], raw[41:]]
+    got = asyncio.run(_collect(float32_frames(_aiter(chunks), 4)))
+    np.testing.assert_array_equal(np.concatenate(got), X)
+
+    text = b'[1, 2]\n{"x": [3, 4]}\n[5, 6]'
+    got = asyncio.run(_collect(ndjson_frames(_aiter([text[:9], text[9:20], text[20:]]))))
+    np.testing.assert_array_equal(np.concatenate(got), [[1, 2], [3, 4], [5, 6]])
+
+
+def test_step_stream_binary_and_ndjson():
+    X = np.random.default_rng(0).standard_normal((50, 16)).astype("<f4")
+    raw = X.tobytes()
+    with TestClient(main.app) as client:
+        resp = client.post("/step/stream?dim=16", content=(raw[i:i + 300] for i in range(0, len(raw), 300)),
+                           headers={"content-type": "application/octet-stream"})
+        assert resp.status_code == 200
+        frames = decode_results(resp.content)
+        assert len(frames) == 50 and RESULT_FRAME.itemsize == 42
+        assert np.all(np.diff(frames["k"].astype(np.int64)) > 0)
+        assert client.get("/state").json()["k"] == int(frames["k"][-1])
+
+        body = "\n".join(json.dumps(x) for x in X[:3].tolist())
+        resp = client.post("/step/stream", content=body, headers={"content-type": "application/x-ndjson"})
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(rows) == 3 and rows[0]["k"] > frames["k"][-1]
+
+        # a truncated frame ends the stream with an error line for NDJSON readers
+        resp = client.post("/step/stream?dim=16", content=raw[:70],
+                           headers={"content-type": "application/octet-stream", "accept": "application/x-ndjson"})
+        assert "error" in json.loads(resp.text.splitlines()[-1])
+        assert client.post("/step/stream", content=b"1", headers={"content-type": "text/plain"}).status_code == 415
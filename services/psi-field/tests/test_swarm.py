@@ -0,0 +1,58 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'vaultmesh_psi')))
+
+from vaultmesh_psi.psi_core import Params, PsiEngine
+from vaultmesh_psi.backends.simple import SimpleBackend
+from vaultmesh_psi.adversary import AdversarialEnv
+from vaultmesh_psi.swarm import PsiSwarmEngine
+
+
+def _inputs(n, steps):
+    envs = [AdversarialEnv(seed=100 + i) for i in range(n)]
+    return [np.stack([e.step() for e in envs]) for _ in range(steps)]
+
+
+def test_swarm_matches_independent_engines():
+    """PsiSwarmEngine records and ledgers equal N sequential PsiEngine.step calls"""
+    n, steps = 6, 40
+    X = _inputs(n, steps)
+
+    engines = [PsiEngine(SimpleBackend(seed=100 + i), Params(em_capacity=30), rng=7 + i) for i in range(n)]
+    ref = [[eng.step(x) for eng, x in zip(engines, xs)] for xs in X]
+
+    swarm = PsiSwarmEngine([SimpleBackend(seed=100 + i) for i in range(n)], Params(em_capacity=30),
+                           rngs=[7 + i for i in range(n)])
+    out = [swarm.step(xs) for xs in X]
+
+    assert out == ref
+    for eng, led in zip(engines, swarm.ledgers):
+        assert eng.ledgers.L_ret == led.L_ret
+        assert eng.ledgers.L_epi == led.L_epi
+        assert eng.ledgers.L_proto == led.L_proto
+
+
+def test_swarm_clear_masks():
+    """Clearing retention/working memory only touches the selected agents"""
+    swarm = PsiSwarmEngine([SimpleBackend(seed=i) for i in range(3)], Params())
+    for xs in _inputs(3, 5):
+        swarm.step(xs)
+    swarm.clear_retention([True, False, False])
+    swarm.clear_working_memory([False, True, False])
+    assert swarm.ret_count.tolist() == [0, 4, 4]
+    assert swarm.wm_count.tolist() == [5, 0, 5]
+
+
+def test_parallel_runs_match_serial():
+    """Per-agent SeedSequence streams make process-parallel runs bit-identical to serial"""
+    from vaultmesh_psi.swarm import run_agents
+    params = Params(em_capacity=30)
+    serial, serial_heads = run_agents(5, 25, seed=42, params=params)
+    parallel, parallel_heads = run_agents(5, 25, seed=42, params=params, workers=2)
+    batched, batched_heads = run_agents(5, 25, seed=42, params=params, workers=2, batched=True)
+    assert serial == parallel == batched
+    assert serial_heads == parallel_heads == batched_heads
+    other, _ = run_agents(5, 25, seed=43, params=params)
+    assert other != serial
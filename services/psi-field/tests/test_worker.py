@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import main
+from src.worker import EngineWorker, QueueFull
+
+
+def test_worker_orders_jobs_and_bounds_queue():
+    async def scenario():
+        worker = EngineWorker(max_queue=2)
+        order = []
+        await asyncio.gather(*(worker.submit(order.append, i, wait=True) for i in range(50)))
+        assert order == list(range(50))
+
+        gate = threading.Event()
+        blocked = [asyncio.ensure_future(worker.submit(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):
+            await worker.submit(order.append, -1)
+        waiting = asyncio.ensure_future(worker.submit(order.append, 50, wait=True))
+        gate.set()
+        await asyncio.gather(*blocked, waiting)
+        assert order[-1] == 50
+
+        stats = worker.stats()
+        assert stats["rejected"] == 1 and stats["completed"] == 53 and stats["depth"] == 0
+        assert stats["max_depth"] == 2 and stats["latency_p99"] >= stats["latency_p50"] >= 0
+        worker.close()
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_returns_429_while_reads_serve_snapshot(monkeypatch):
+    monkeypatch.setattr(main, "PSI_QUEUE_MAX", 1)
+    x = np.zeros(16).tolist()
+    with TestClient(main.app) as client:
+        k = client.post("/step", json={"x": x}).json()["k"]
+
+        gate = threading.Event()
+        busy = client.portal.start_task_soon(main.engine_worker.submit, gate.wait)
+        while main.engine_worker.depth == 0:
+            time.sleep(0.001)
+
+        resp = client.post("/step", json={"x": x})
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "1"
+        assert client.get("/state").json()["k"] == k
+        assert "psi_field_queue_rejected_total 1.0" in client.get("/metrics").text
+
+        gate.set()
+        busy.result()
+        assert client.post("/step", json={"x": x}).status_code == 200
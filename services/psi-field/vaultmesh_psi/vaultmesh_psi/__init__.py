@@ -1,2 +1,2 @@
-__all__ = ["psi_core", "ledger", "telemetry", "run_demo", "adversary", "swarm", "cli"]
+__all__ = ["psi_core", "index", "kernels", "rng", "ledger", "telemetry", "run_demo", "adversary", "swarm", "fleet", "profile", "cli"]
 __version__ = "0.2.0"
@@ -1,26 +1,27 @@
 import numpy as np, math
+from .rng import make_rng
 
 class AdversarialEnv:
-    def __init__(self, input_dim=16, shock_prob=0.05, drift=0.02, burst_len=5, seed=123):
+    def __init__(self, input_dim=16, shock_prob=0.05, drift=0.02, burst_len=5, seed=123, rng=None):
         self.input_dim = input_dim
         self.shock_prob = shock_prob
         self.drift = drift
         self.burst_len = burst_len
-        self.rng = np.random.RandomState(seed)
-        self.state = self.rng.randn(input_dim)
+        self.rng = make_rng(seed if rng is None else rng)
+        self.state = self.rng.standard_normal(input_dim)
         self.burst_counter = 0
 
     def step(self):
-        self.state += self.drift * self.rng.randn(self.input_dim)
+        self.state += self.drift * self.rng.standard_normal(self.input_dim)
         if self.burst_counter > 0:
             self.state += 0.8 * np.sign(np.sin(self.burst_counter)) * np.ones(self.input_dim)
             self.burst_counter -= 1
-        elif self.rng.rand() < 0.03:
+        elif self.rng.random() < 0.03:
             self.burst_counter = self.burst_len
-        if self.rng.rand() < self.shock_prob:
-            idx = self.rng.randint(0, self.input_dim)
-            self.state[idx] += self.rng.randn() * (2.0 + self.rng.rand()*3.0)
-        t = (self.rng.rand()*2*math.pi)
+        if self.rng.random() < self.shock_prob:
+            idx = self.rng.integers(0, self.input_dim)
+            self.state[idx] += self.rng.standard_normal() * (2.0 + self.rng.random()*3.0)
+        t = (self.rng.random()*2*math.pi)
         self.state += 0.1 * math.sin(t) * np.ones(self.input_dim)
         return self.state.copy()
 
@@ -1,38 +1,51 @@
 import numpy as np
+from ..rng import make_rng
 
 class SimpleBackend:
-    def __init__(self, input_dim=16, latent_dim=32, seed=7, eta=0.05, noise=0.02):
+    def __init__(self, input_dim=16, latent_dim=32, seed=7, eta=0.05, noise=0.02, dtype=np.float64, rng=None):
         self.input_dim = input_dim
         self.latent_dim = latent_dim
-        self.rng = np.random.RandomState(seed)
-        self.E = 0.5 * self.rng.randn(latent_dim, input_dim)
-        self.A = np.eye(latent_dim) + 0.05 * self.rng.randn(latent_dim, latent_dim)
+        self.dtype = np.dtype(dtype)
+        self.rng = make_rng(seed if rng is None else rng)
+        # weights are drawn in float64 so every dtype sees the same model and RNG stream
+        self.E = (0.5 * self.rng.standard_normal((latent_dim, input_dim))).astype(self.dtype)
+        self.A = (np.eye(latent_dim) + 0.05 * self.rng.standard_normal((latent_dim, latent_dim))).astype(self.dtype)
         self.eta = eta
         self.noise = noise
 
+    def state_dict(self):
+        return dict(E=self.E.copy(), A=self.A.copy(), eta=self.eta, noise=self.noise, rng=self.rng.bit_generator.state)
+
+    def load_state_dict(self, st):
+        self.E, self.A = np.array(st["E"], dtype=self.dtype), np.array(st["A"], dtype=self.dtype)
+        self.eta, self.noise = float(st["eta"]), float(st["noise"])
+        self.rng.bit_generator.state = st["rng"]
+
     def init_theta(self, latent_dim):
         return dict(A=self.A.copy())
 
     def encode(self, x):
-        z_lin = self.E @ np.asarray(x).reshape(-1)
+        z_lin = self.E @ np.asarray(x, dtype=self.dtype).reshape(-1)
         return np.tanh(z_lin)
 
     def predict(self, z, theta, EM=None):
         A = theta["A"]
         return A @ z
 
-    def rollout(self, theta, start, horizon=2.0, N=8, dt=0.2):
+    def rollout(self, theta, start, horizon=2.0, N=8, dt=0.2, first_only=False):
+        # all N trajectories at once from a single noise draw: (N, steps, latent_dim)
         steps = max(1, int(round(horizon / dt)))
         A = theta["A"]
-        res = []
-        for _ in range(N):
-            z = start.copy()
-            traj = []
-            for _ in range(steps):
-                z = A @ z + self.noise * self.rng.randn(*z.shape)
-                traj.append(z.copy())
-            res.append(traj)
-        return res
+        z0 = A @ start
+        if first_only:
+            # callers that only read traj[0] skip the recurrence and the unused noise
+            return (z0 + (self.noise * self.rng.standard_normal((N, z0.shape[0]))).astype(self.dtype, copy=False))[:, None, :]
+        noise = (self.noise * self.rng.standard_normal((N, steps, z0.shape[0]))).astype(self.dtype, copy=False)
+        traj = np.empty_like(noise)
+        traj[:, 0] = z0 + noise[:, 0]
+        for t in range(1, steps):
+            traj[:, t] = traj[:, t - 1] @ A.T + noise[:, t]
+        return traj
 
     def update_theta(self, theta, z_prev, z_curr):
         A = theta["A"]
@@ -0,0 +1,64 @@
+import io, json, os
+import numpy as np
+
+# Engine snapshots: one uncompressed .npz whose "header" entry is a UTF-8 JSON
+# document. The header mirrors the nested state dict; every ndarray in it is
+# replaced by {"__npz__": key} and stored as its own npz member, so arrays are
+# written and read as raw buffers and never round-trip through JSON.
+
+FORMAT = "psi-snapshot"
+VERSION = 1
+
+def pack(state, arrays, prefix=""):
+    if isinstance(state, np.ndarray):
+        arrays[prefix] = state
+        return {"__npz__": prefix}
+    if isinstance(state, np.generic):
+        return state.item()
+    if isinstance(state, dict):
+        return {str(k): pack(v, arrays, f"{prefix}.{k}" if prefix else str(k)) for k, v in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [pack(v, arrays, f"{prefix}.{i}") for i, v in enumerate(state)]
+    return state
+
+def unpack(state, arrays):
+    if isinstance(state, dict):
+        if set(state) == {"__npz__"}:
+            return arrays[state["__npz__"]]
+        return {k: unpack(v, arrays) for k, v in state.items()}
+    if isinstance(state, list):
+        return [unpack(v, arrays) for v in state]
+    return state
+
+def save(path, state):
+    """Write a nested state dict to ``path`` (atomically) or to a binary file object."""
+    arrays = {}
+    header = dict(format=FORMAT, version=VERSION, state=pack(state, arrays))
+    arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    if not isinstance(path, (str, os.PathLike)):
+        np.savez(path, **arrays)
+        return path
+    path = os.fspath(path)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+    return path
+
+def load(path):
+    with np.load(path, allow_pickle=False) as z:
+        header = json.loads(bytes(z["header"]).decode("utf-8"))
+        if header.get("format") != FORMAT:
+            raise ValueError(f"not a psi snapshot: {path!r}")
+        if header.get("version") != VERSION:
+            raise ValueError(f"unsupported psi snapshot version: {header.get('version')!r}")
+        arrays = {k: z[k] for k in z.files if k != "header"}
+    return unpack(header["state"], arrays)
+
+def dumps(state):
+    buf = io.BytesIO()
+    save(buf, state)
+    return buf.getvalue()
+
+def loads(data):
+    return load(io.BytesIO(data))
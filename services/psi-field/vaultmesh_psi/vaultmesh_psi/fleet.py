@@ -0,0 +1,115 @@
+import numpy as np
+
+# Guardian for a fleet of agents stepped in lockstep (PsiSwarmEngine, or any
+# loop that steps every agent once per tick). It applies the same rules as the
+# service's AdvancedGuardian: per-agent percentile thresholds over the last
+# `window` steps, static thresholds until `min_samples`, a sticky red flag and a
+# cooldown between interventions. All agents are evaluated at once: histories
+# live in one (metric, agent, window) ring with a shared cursor, thresholds are
+# one np.percentile call per side, and threats are boolean masks. Only agents
+# that intervene this tick cost any Python work (their reason string).
+
+METRICS = ("Psi", "PE", "H")
+REASONS = (None, "high_PE", "low_Psi", "high_H")
+PLAYBOOK = {"high_PE": "nigredo", "low_Psi": "albedo", "high_H": "nigredo"}
+
+class FleetGuardian:
+    def __init__(self, n, window=200, percentile=95.0, cooldown=100, min_samples=50,
+                 psi_low=0.25, pe_high=2.0, h_high=2.2):
+        self.n = int(n)
+        self.window = int(window)
+        self.percentile = float(percentile)
+        self.cooldown = int(cooldown)
+        self.min_samples = int(min_samples)
+        self.static = (psi_low, pe_high, h_high)
+        self.hist = np.zeros((len(METRICS), self.n, self.window))
+        self.fill = 0
+        self._cursor = 0
+        self.red = np.zeros(self.n, dtype=bool)
+        # latest threat per agent: REASONS index, offending value and threshold
+        self.reason = np.zeros(self.n, dtype=np.int8)
+        self.reason_value = np.zeros(self.n)
+        self.reason_threshold = np.zeros(self.n)
+        self.last_intervention = np.full(self.n, -self.cooldown, dtype=np.int64)
+        self.intervention_count = np.zeros(self.n, dtype=np.int64)
+
+    def thresholds(self):
+        """(psi_low, pe_high, h_high) arrays over agents; same values as np.percentile per agent."""
+        if self.fill < self.min_samples:
+            return tuple(np.full(self.n, float(v)) for v in self.static)
+        h = self.hist if self.fill == self.window else self.hist[:, :, :self.fill]
+        psi_low = np.percentile(h[0], 100 - self.percentile, axis=1)
+        pe_high, h_high = np.percentile(h[1:], self.percentile, axis=2)
+        return psi_low, pe_high, h_high
+
+    def observe(self, Psi, PE, H, k):
+        """Record one tick of metrics (arrays over agents) and return the interventions it triggers.
+
+        Each intervention is a dict(agent, intervention, reason, k); the
+        agents' red flags are cleared as if the caller applies them (see apply).
+        """
+        c = self._cursor
+        self.hist[0, :, c] = Psi
+        self.hist[1, :, c] = PE
+        self.hist[2, :, c] = H
+        self._cursor = (c + 1) % self.window
+        self.fill = min(self.fill + 1, self.window)
+        psi_low, pe_high, h_high = self.thresholds()
+        Psi, PE, H = self.hist[0, :, c], self.hist[1, :, c], self.hist[2, :, c]
+
+        # first matching rule wins, in AdvancedGuardian's order
+        pe_t = PE > pe_high
+        psi_t = ~pe_t & (Psi < psi_low)
+        h_t = ~pe_t & ~psi_t & (H > h_high)
+        threat = pe_t | psi_t | h_t
+        if threat.any():
+            self.reason[threat] = np.select([pe_t, psi_t], [1, 2], 3)[threat]
+            self.reason_value[threat] = np.select([pe_t, psi_t], [PE, Psi], H)[threat]
+            self.reason_threshold[threat] = np.select([pe_t, psi_t], [pe_high, psi_low], h_high)[threat]
+            self.red |= threat
+
+        due = np.flatnonzero(self.red & (k - self.last_intervention >= self.cooldown))
+        if due.size == 0:
+            return []
+        self.last_intervention[due] = k
+        self.intervention_count[due] += 1
+        self.red[due] = False
+        out = []
+        for i in due:
+            reason = self.reason_text(i)
+            out.append(dict(agent=int(i), intervention=PLAYBOOK[REASONS[self.reason[i]]], reason=reason, k=int(k)))
+        return out
+
+    def step(self, records):
+        """observe() for one PsiSwarmEngine.step (or any per-agent list of records)."""
+        Psi = np.fromiter((r["Psi"] for r in records), float, self.n)
+        PE = np.fromiter((r["PE"] for r in records), float, self.n)
+        H = np.fromiter((r["H"] for r in records), float, self.n)
+        return self.observe(Psi, PE, H, records[0]["k"])
+
+    def reason_text(self, i):
+        """Agent i's latest threat in AdvancedGuardian's reason format."""
+        name = REASONS[self.reason[i]]
+        if name is None:
+            return None
+        q = 100 - self.percentile if name == "low_Psi" else self.percentile
+        op = "<" if name == "low_Psi" else ">"
+        return f"{name}:{self.reason_value[i]:.3f}{op}p{q}:{self.reason_threshold[i]:.3f}"
+
+    def apply(self, swarm, interventions):
+        """Apply a tick's interventions to a PsiSwarmEngine.
+
+        nigredo clears the agent's retention and working memory and raises its
+        rollout noise (x1.5); albedo lowers the noise (x0.7).
+        """
+        nig = np.zeros(swarm.n, dtype=bool)
+        for iv in interventions:
+            b = swarm.backends[iv["agent"]]
+            if iv["intervention"] == "nigredo":
+                nig[iv["agent"]] = True
+                b.noise *= 1.5
+            else:
+                b.noise *= 0.7
+        if nig.any():
+            swarm.clear_retention(nig)
+            swarm.clear_working_memory(nig)
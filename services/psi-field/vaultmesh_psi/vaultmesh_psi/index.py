@@ -0,0 +1,281 @@
+import time
+import numpy as np
+
+# Search indexes over EpisodicMemory slots. An index never owns vectors:
+# it is bound to the memory's (capacity, latent_dim) matrix of unit rows
+# and only tracks which slots are live. Scores are cosine similarities.
+
+class FlatIndex:
+    """Exact brute-force search over all live slots."""
+
+    def __init__(self, units):
+        self.units = units
+        self.live = np.zeros(units.shape[0], dtype=bool)
+        self.count = 0
+
+    def add(self, slot):
+        if not self.live[slot]:
+            self.live[slot] = True
+            self.count += 1
+
+    def remove(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        self.count -= int(self.live[slots].sum())
+        self.live[slots] = False
+
+    def search(self, q, topk=8):
+        if self.count == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.units.dtype)
+        # always scan the whole preallocated matrix so a slot's score does not
+        # depend on how many other slots are live (keeps batched engines in parity)
+        sims = self.units @ q
+        if self.count < self.live.shape[0]:
+            sims[~self.live] = -np.inf
+        if 0 < topk < sims.shape[0]:
+            top = np.argpartition(sims, -topk)[-topk:]
+            top = top[self.live[top]]
+        else:
+            top = np.flatnonzero(self.live)
+        return top, sims[top]
+
+
+class IVFIndex:
+    """Approximate inverted-file index with spherical k-means coarse centroids.
+
+    Until ``train_size`` live slots exist it answers exactly. After training,
+    each slot is filed under its nearest centroid and a query scans only the
+    ``nprobe`` closest lists. There is no stop-the-world retrain afterwards:
+    each centroid is the normalized running sum of its members (online
+    spherical k-means), and every add re-files a few of the oldest slots
+    against the current centroids, so the whole memory is revisited once
+    every ``retrain_after`` times its capacity in inserts.
+
+    ``nprobe`` defaults to ``4 * sqrt(nlist)`` (at least 8), which targets
+    recall@8 >= 0.9 even on unstructured (isotropic) latents; see
+    ``recall_report`` for measured numbers. Clustered memories reach full
+    recall with far fewer probes, so pass a small ``nprobe`` when the traces
+    are known to be structured and latency matters more.
+    """
+
+    def __init__(self, units, nlist=None, nprobe=None, train_size=None, retrain_after=1.0,
+                 kmeans_iters=10, seed=0):
+        self.units = units
+        self.capacity = units.shape[0]
+        self.nlist = int(nlist or max(16, int(np.sqrt(self.capacity))))
+        if nprobe is None:
+            nprobe = max(8, int(np.ceil(4 * np.sqrt(self.nlist))))
+        self.nprobe = int(min(nprobe, self.nlist))
+        self.train_size = int(train_size or max(self.nlist * 16, 256))
+        self.retrain_after = float(retrain_after)
+        self.refile_per_add = max(1, int(np.ceil(1.0 / self.retrain_after)))
+        self.kmeans_iters = int(kmeans_iters)
+        self.rng = np.random.default_rng(seed)
+        self.flat = FlatIndex(units)
+        self.centroids = None
+        self._sums = None
+        self.assign = np.full(self.capacity, -1, dtype=np.int64)
+        self._lists = [np.empty(16, dtype=np.int64) for _ in range(self.nlist)]
+        self.pos = np.zeros(self.capacity, dtype=np.int64)
+        self._sizes = np.zeros(self.nlist, dtype=np.int64)
+        self._refile_cursor = 0
+
+    @property
+    def count(self):
+        return self.flat.count
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def _append(self, lst, slot):
+        buf = self._lists[lst]
+        n = self._sizes[lst]
+        if n == buf.shape[0]:
+            buf = np.concatenate([buf, np.empty_like(buf)])
+            self._lists[lst] = buf
+        buf[n] = slot
+        self.pos[slot] = n
+        self._sizes[lst] = n + 1
+
+    def _discard(self, lst, slot):
+        # swap-remove keeps every list dense, so search never sees stale slots
+        buf = self._lists[lst]
+        last = self._sizes[lst] - 1
+        i = self.pos[slot]
+        moved = buf[last]
+        buf[i] = moved
+        self.pos[moved] = i
+        self._sizes[lst] = last
+
+    def _nearest(self, slot):
+        return int(np.argmax(self.centroids @ self.units[slot].astype(np.float32)))
+
+    def _file(self, lst, slot):
+        self.assign[slot] = lst
+        self._append(lst, slot)
+        self._sums[lst] += self.units[slot]
+        self._recenter(lst)
+
+    def _unfile(self, lst, slot):
+        self._discard(lst, slot)
+        self.assign[slot] = -1
+        self._sums[lst] -= self.units[slot]
+        self._recenter(lst)
+
+    def _recenter(self, lst):
+        # an emptied list keeps its last centroid so it can attract slots again
+        n = np.linalg.norm(self._sums[lst])
+        if self._sizes[lst] > 0 and n > 1e-6:
+            self.centroids[lst] = self._sums[lst] / n
+
+    def train(self):
+        live = np.flatnonzero(self.flat.live)
+        if live.shape[0] < self.nlist:
+            return
+        sample = live
+        if sample.shape[0] > self.nlist * 64:
+            sample = self.rng.choice(sample, self.nlist * 64, replace=False)
+        X = self.units[sample].astype(np.float32)
+        C = X[self.rng.choice(X.shape[0], self.nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            lab = np.argmax(X @ C.T, axis=1)
+            sums = np.zeros_like(C)
+            np.add.at(sums, lab, X)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = np.flatnonzero(norms < 1e-12)
+            C = sums / np.maximum(norms, 1e-12)[:, None]
+            C[empty] = X[self.rng.integers(X.shape[0], size=empty.shape[0])]
+        self.centroids = C
+        self.assign[:] = -1
+        self._sizes[:] = 0
+        lab = np.argmax(self.units[live] @ C.T.astype(self.units.dtype), axis=1)
+        self.assign[live] = lab
+        self._sums = np.zeros((self.nlist, self.units.shape[1]))
+        np.add.at(self._sums, lab, self.units[live])
+        order = np.argsort(lab, kind="stable")
+        bounds = np.searchsorted(lab[order], np.arange(self.nlist + 1))
+        for c in range(self.nlist):
+            members = live[order[bounds[c]:bounds[c + 1]]]
+            if members.shape[0] > self._lists[c].shape[0]:
+                self._lists[c] = np.empty(2 * members.shape[0], dtype=np.int64)
+            self._lists[c][:members.shape[0]] = members
+            self.pos[members] = np.arange(members.shape[0])
+            self._sizes[c] = members.shape[0]
+        for c in np.flatnonzero(self._sizes):
+            self._recenter(c)
+
+    def _refile(self):
+        # bounded slice of the incremental retrain: move a few slots to their
+        # now-nearest centroid, sweeping the whole ring over time
+        for _ in range(self.refile_per_add):
+            slot = self._refile_cursor
+            self._refile_cursor = (slot + 1) % self.capacity
+            old = self.assign[slot]
+            if old < 0:
+                continue
+            new = self._nearest(slot)
+            if new != old:
+                self._unfile(old, slot)
+                self._file(new, slot)
+
+    def add(self, slot):
+        self.flat.add(slot)
+        if not self.trained:
+            if self.count >= self.train_size:
+                self.train()
+            return
+        self._file(self._nearest(slot), slot)
+        self._refile()
+
+    def remove(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        self.flat.remove(slots)
+        if not self.trained:
+            return
+        for slot in slots.tolist():
+            lst = self.assign[slot]
+            if lst >= 0:
+                self._unfile(lst, slot)
+
+    def search(self, q, topk=8):
+        if not self.trained:
+            return self.flat.search(q, topk)
+        cs = self.centroids @ q.astype(np.float32)
+        probe = np.argpartition(cs, -self.nprobe)[-self.nprobe:] if self.nprobe < self.nlist else np.arange(self.nlist)
+        cand = np.concatenate([self._lists[p][:self._sizes[p]] for p in probe])
+        if cand.shape[0] < topk:
+            return self.flat.search(q, topk)
+        sims = self.units[cand] @ q
+        if topk < sims.shape[0]:
+            top = np.argpartition(sims, -topk)[-topk:]
+            return cand[top], sims[top]
+        return cand, sims
+
+
+INDEXES = {"flat": FlatIndex, "ivf": IVFIndex}
+
+def make_index(kind, units, **kwargs):
+    if not isinstance(kind, str):
+        return kind(units, **kwargs)
+    try:
+        cls = INDEXES[kind]
+    except KeyError:
+        raise ValueError(f"unknown episodic index: {kind!r} (expected one of {sorted(INDEXES)})")
+    return cls(units, **kwargs)
+
+def recall_report(kind="ivf", n=100_000, latent_dim=32, queries=200, topk=8, clusters=256,
+                  data="clusters", seed=0, **index_kwargs):
+    """Recall@topk against exact search plus mean per-query latency (microseconds).
+
+    ``data="clusters"`` draws a mixture of ``clusters`` gaussian blobs, which is
+    closer to consolidated traces; ``data="isotropic"`` draws unstructured
+    standard normal vectors, the worst case for coarse quantization.
+
+    Measured recall@8 at latent_dim=32 with the default nlist (sqrt(n)):
+
+        n        data        nprobe       recall
+        20_000   clusters    8            1.00
+        20_000   isotropic   8            0.50
+        20_000   isotropic   48 (default) 0.93
+        100_000  clusters    8            1.00
+        100_000  isotropic   8            0.43
+        100_000  isotropic   72 (default) 0.93
+
+    Clustered data with ``nprobe=8`` answers about 2x faster than the flat scan
+    at 100k. At the probe counts isotropic data needs, the flat scan is faster
+    than this pure-numpy IVF, so the default trades speed for recall.
+    """
+    from .psi_core import EpisodicMemory
+    if data not in ("clusters", "isotropic"):
+        raise ValueError(f"unknown recall data: {data!r} (expected 'clusters' or 'isotropic')")
+    rng = np.random.default_rng(seed)
+
+    def sample(m):
+        if data == "isotropic":
+            return rng.standard_normal((m, latent_dim))
+        return centers[rng.integers(clusters, size=m)] + 0.3 * rng.standard_normal((m, latent_dim))
+
+    centers = rng.standard_normal((clusters, latent_dim))
+    vecs = sample(n)
+    exact = EpisodicMemory(latent_dim, capacity=n, index="flat")
+    approx = EpisodicMemory(latent_dim, capacity=n, index=kind, index_params=index_kwargs)
+    for v in vecs:
+        exact.add(v)
+        approx.add(v)
+    qs = sample(queries)
+    qs = (qs / np.linalg.norm(qs, axis=1, keepdims=True)).astype(exact.dtype)
+
+    def run(mem):
+        out = []
+        t0 = time.perf_counter()
+        for q in qs:
+            out.append(mem.index.search(q, topk)[0])
+        return out, (time.perf_counter() - t0) / queries * 1e6
+
+    truth, exact_us = run(exact)
+    found, approx_us = run(approx)
+    hits = sum(len(set(a.tolist()) & set(b.tolist())) for a, b in zip(truth, found))
+    return dict(kind=kind, n=n, latent_dim=latent_dim, topk=topk, data=data,
+                recall=hits / float(topk * queries),
+                exact_us=exact_us, approx_us=approx_us,
+                speedup=exact_us / max(approx_us, 1e-9))
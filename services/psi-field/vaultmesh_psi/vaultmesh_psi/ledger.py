@@ -1,4 +1,184 @@
-import json, os
+import json, os, struct, hashlib
+from collections import deque
+
+# Append-only anchor ledgers. A StreamLedger keeps a bounded in-memory tail,
+# spills older records to append-only segment files and folds every record
+# into an incremental Merkle frontier, so memory stays flat on long runs and
+# the head root costs O(log n) per append. Leaves and nodes follow RFC 6962
+# (0x00 / 0x01 domain prefixes over SHA-256).
+
+def canonical(record):
+    return json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def leaf_hash(data):
+    return hashlib.sha256(b"\x00" + data).digest()
+
+def node_hash(left, right):
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+class MerkleFrontier:
+    """Rightmost perfect-subtree roots of an append-only Merkle tree."""
+
+    def __init__(self):
+        self.count = 0
+        self.nodes = []  # nodes[level] is a pending left sibling or None
+
+    def append(self, leaf):
+        node = leaf
+        level = 0
+        n = self.count
+        while n & 1:
+            node = node_hash(self.nodes[level], node)
+            self.nodes[level] = None
+            level += 1
+            n >>= 1
+        if level == len(self.nodes):
+            self.nodes.append(node)
+        else:
+            self.nodes[level] = node
+        self.count += 1
+
+    def root(self):
+        if self.count == 0:
+            return hashlib.sha256(b"").digest()
+        acc = None
+        for node in self.nodes:
+            if node is not None:
+                acc = node if acc is None else node_hash(node, acc)
+        return acc
+
+
+class StreamLedger:
+    """Bounded, replayable ledger with an incremental Merkle head.
+
+    Args:
+        name: ledger name, used for segment file names.
+        tail: number of most recent records kept in memory.
+        directory: spill directory; without one, records older than the tail
+            are dropped from memory (they still count towards the root). Segment
+            files of the same name are overwritten unless the ledger is restored
+            with load_state_dict, which resumes the recorded segments.
+        spill_every: records buffered before a batch is written to disk.
+        segment_records: records per segment file.
+        fmt: "jsonl" (one JSON object per line) or "bin" (little-endian u32
+            length-prefixed JSON frames).
+    """
+
+    def __init__(self, name, tail=1024, directory=None, spill_every=256, segment_records=65536, fmt="jsonl"):
+        if fmt not in ("jsonl", "bin"):
+            raise ValueError(f"unknown ledger segment format: {fmt!r}")
+        self.name = name
+        self.tail = deque(maxlen=int(tail))
+        self.directory = directory
+        self.spill_every = int(spill_every)
+        self.segment_records = int(segment_records)
+        self.fmt = fmt
+        self.frontier = MerkleFrontier()
+        self.segments = []
+        self._pending = []
+        self._in_segment = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return self.frontier.count
+
+    @property
+    def first_in_memory(self):
+        return len(self) - len(self.tail)
+
+    @property
+    def root(self):
+        return self.frontier.root().hex()
+
+    def head(self):
+        return dict(name=self.name, count=len(self), root=self.root)
+
+    def append(self, record):
+        data = canonical(record)
+        self.frontier.append(leaf_hash(data))
+        self.tail.append(record)
+        if self.directory:
+            self._pending.append(data)
+            if len(self._pending) >= self.spill_every:
+                self.flush()
+
+    def state_dict(self):
+        # pending records are flushed so the segments on disk match the head
+        self.flush()
+        return dict(count=self.frontier.count, nodes=[n.hex() if n is not None else None for n in self.frontier.nodes],
+                    tail=list(self.tail), segments=list(self.segments), in_segment=self._in_segment)
+
+    def load_state_dict(self, st):
+        self.frontier.count = int(st["count"])
+        self.frontier.nodes = [bytes.fromhex(n) if n is not None else None for n in st["nodes"]]
+        self.tail.clear()
+        self.tail.extend(st["tail"])
+        self._pending = []
+        # keep appending to the same segment files only when spilling to the same place
+        if self.directory and all(os.path.dirname(p) == os.path.normpath(self.directory) for p in st["segments"]):
+            self.segments = list(st["segments"])
+            self._in_segment = int(st["in_segment"])
+
+    def _segment_path(self, i):
+        ext = "jsonl" if self.fmt == "jsonl" else "bin"
+        return os.path.join(self.directory, f"{self.name}.{i:06d}.{ext}")
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        while pending:
+            if not self.segments or self._in_segment >= self.segment_records:
+                # a segment this ledger opens starts empty, so files left by an
+                # earlier run under the same name never mix into its history
+                self.segments.append(self._segment_path(len(self.segments)))
+                self._in_segment = 0
+            room = self.segment_records - self._in_segment
+            batch, pending = pending[:room], pending[room:]
+            if self.fmt == "jsonl":
+                blob = b"".join(d + b"\n" for d in batch)
+            else:
+                blob = b"".join(struct.pack("<I", len(d)) + d for d in batch)
+            with open(self.segments[-1], "ab" if self._in_segment else "wb") as f:
+                f.write(blob)
+            self._in_segment += len(batch)
+
+    def _read_segment(self, path):
+        with open(path, "rb") as f:
+            if self.fmt == "jsonl":
+                for line in f:
+                    yield json.loads(line)
+            else:
+                while True:
+                    hdr = f.read(4)
+                    if len(hdr) < 4:
+                        return
+                    yield json.loads(f.read(struct.unpack("<I", hdr)[0]))
+
+    def replay(self):
+        """Yield every retained record, oldest first.
+
+        With a spill directory that is the full history; otherwise only the
+        in-memory tail (starting at ``first_in_memory``).
+        """
+        if not self.directory:
+            yield from list(self.tail)
+            return
+        for path in self.segments:
+            yield from self._read_segment(path)
+        for data in list(self._pending):
+            yield json.loads(data)
+
+    def __iter__(self):
+        return self.replay()
+
+    def verify(self):
+        """Recompute the root from a full replay; only meaningful with a spill directory."""
+        fr = MerkleFrontier()
+        for record in self.replay():
+            fr.append(leaf_hash(canonical(record)))
+        return fr.count == len(self) and fr.root() == self.frontier.root()
+
 
 class JsonLedgerIO:
     def __init__(self, directory):
@@ -6,6 +186,9 @@ class JsonLedgerIO:
         os.makedirs(directory, exist_ok=True)
 
     def write(self, name, records):
+        # StreamLedgers are replayed from their segments instead of materialized
+        if isinstance(records, StreamLedger):
+            records = records.replay()
         path = os.path.join(self.directory, f"{name}.jsonl")
         with open(path, "w", encoding="utf-8") as f:
             for r in records:
@@ -0,0 +1,63 @@
+import numpy as np
+from time import perf_counter_ns
+
+# Opt-in per-phase timing for PsiEngine.step. The engine calls lap(phase) at
+# each phase boundary; a lap charges the nanoseconds since the previous
+# boundary to that phase, and finish() closes the step, storing one sample per
+# phase (phases visited twice in a step, like retention, are summed) in a ring
+# of the most recent `window` steps. Engines without a profiler skip every
+# hook on a single `if prof:` test, so profiling costs nothing when disabled.
+
+PHASES = ("encode", "retention", "predict", "rollout", "attend", "metrics",
+          "entropy", "consolidate", "theta", "proto")
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+class StepProfiler:
+    def __init__(self, window=1024, phases=PHASES):
+        self.window = int(window)
+        self.phases = tuple(phases) + ("total",)
+        self._index = {name: i for i, name in enumerate(self.phases)}
+        # plain lists: cheaper per lap than numpy scalar indexing
+        self._samples = [[0] * self.window for _ in self.phases]
+        self._current = [0] * len(self.phases)
+        self._total_ns = [0] * len(self.phases)
+        self.steps = 0
+        self._t0 = self._t = 0
+
+    def start(self):
+        self._t0 = self._t = perf_counter_ns()
+
+    def lap(self, phase):
+        now = perf_counter_ns()
+        self._current[self._index[phase]] += now - self._t
+        self._t = now
+
+    def finish(self):
+        cur = self._current
+        cur[-1] = perf_counter_ns() - self._t0
+        slot = self.steps % self.window
+        for i, ns in enumerate(cur):
+            self._samples[i][slot] = ns
+            self._total_ns[i] += ns
+            cur[i] = 0
+        self.steps += 1
+
+    def reset(self):
+        self.__init__(self.window, self.phases[:-1])
+
+    def summary(self, quantiles=QUANTILES):
+        """Per-phase stats over the recent window, in microseconds; `share` is of total step time."""
+        n = min(self.steps, self.window)
+        if n == 0:
+            return {}
+        samples = np.array([s[:n] for s in self._samples], dtype=np.float64) / 1e3
+        qs = np.percentile(samples, [100 * q for q in quantiles], axis=1)
+        mean = samples.mean(axis=1)
+        out = {}
+        for i, name in enumerate(self.phases):
+            st = dict(count=self.steps, mean_us=float(mean[i]), total_ms=self._total_ns[i] / 1e6,
+                      share=float(mean[i] / mean[-1]) if mean[-1] > 0 else 0.0)
+            st.update({f"p{round(100 * q):d}_us": float(qs[j, i]) for j, q in enumerate(quantiles)})
+            out[name] = st
+        return out
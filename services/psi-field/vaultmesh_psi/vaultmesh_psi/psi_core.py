@@ -1,8 +1,11 @@
 import numpy as np
-from collections import deque
-import hashlib, time, json, random
-
-EPS = 1e-8
+import hashlib, heapq, time, json
+from .index import make_index
+from .kernels import EPS, HistEntropy, phase_terms
+from .ledger import StreamLedger
+from . import checkpoint
+from .rng import make_rng
+from .profile import StepProfiler
 
 def cos_sim(a, b):
     a = np.asarray(a).reshape(-1)
@@ -53,81 +56,275 @@ def hash_trace(vec, meta=None):
     return h.hexdigest()
 
 class RetentionBuffer:
-    def __init__(self, max_seconds, dt, latent_dim):
+    def __init__(self, max_seconds, dt, latent_dim, dtype=np.float64):
         self.max_len = int(max(1, round(max_seconds / dt)))
-        self.buf = deque(maxlen=self.max_len)
         self.latent_dim = latent_dim
+        self.dtype = np.dtype(dtype)
+        # fixed ring with running sums of the traces and of their pseudo-phase cos/sin
+        # (the per-trace phase terms stay float64, they are one scalar per slot)
+        self._buf = np.zeros((self.max_len, latent_dim), dtype=self.dtype)
+        self._cos = np.zeros(self.max_len)
+        self._sin = np.zeros(self.max_len)
+        self._sum = np.zeros(latent_dim, dtype=self.dtype)
+        self.cos_sum = 0.0
+        self.sin_sum = 0.0
+        self._head = 0
+        self._len = 0
+        self._since_sync = 0
+
+    def __len__(self):
+        return self._len
 
     def push(self, z):
-        self.buf.append(np.asarray(z))
+        z = np.asarray(z, dtype=self.dtype).reshape(-1)
+        h = self._head
+        ph = pseudo_phase(z)
+        if self._len == self.max_len:
+            self._sum -= self._buf[h]
+            self.cos_sum -= self._cos[h]
+            self.sin_sum -= self._sin[h]
+        self._buf[h] = z
+        self._cos[h] = np.cos(ph)
+        self._sin[h] = np.sin(ph)
+        self._sum += z
+        self.cos_sum += self._cos[h]
+        self.sin_sum += self._sin[h]
+        self._head = (h + 1) % self.max_len
+        self._len = min(self._len + 1, self.max_len)
+        self._since_sync += 1
+        if self._len == self.max_len and self._since_sync >= self.max_len:
+            # bound the drift of the running sums once per full turn of the ring
+            self._sum = self._buf.sum(axis=0)
+            self.cos_sum = float(self._cos.sum())
+            self.sin_sum = float(self._sin.sum())
+            self._since_sync = 0
+
+    def clear(self):
+        # the write cursor keeps moving so ring layout stays aligned with PsiSwarmEngine
+        self._len = 0
+        self._sum[:] = 0.0
+        self.cos_sum = 0.0
+        self.sin_sum = 0.0
+        self._since_sync = 0
 
     def summary(self):
-        if len(self.buf) == 0:
-            return np.zeros(self.latent_dim, dtype=float)
-        return np.mean(np.stack(self.buf, axis=0), axis=0)
+        if self._len == 0:
+            return np.zeros(self.latent_dim, dtype=self.dtype)
+        return self._sum / self._len
 
     @property
     def traces(self):
-        return list(self.buf)
+        idx = (self._head - self._len + np.arange(self._len)) % self.max_len
+        return list(self._buf[idx])
+
+    def state_dict(self):
+        return dict(buf=self._buf.copy(), cos=self._cos.copy(), sin=self._sin.copy(), sum=self._sum.copy(),
+                    cos_sum=self.cos_sum, sin_sum=self.sin_sum, head=self._head, len=self._len,
+                    since_sync=self._since_sync)
+
+    def load_state_dict(self, st):
+        if st["buf"].shape != self._buf.shape:
+            raise ValueError(f"retention shape mismatch: {st['buf'].shape} != {self._buf.shape}")
+        self._buf[...] = st["buf"]
+        self._cos[...] = st["cos"]
+        self._sin[...] = st["sin"]
+        self._sum = np.array(st["sum"], dtype=self.dtype)
+        self.cos_sum, self.sin_sum = float(st["cos_sum"]), float(st["sin_sum"])
+        self._head, self._len, self._since_sync = int(st["head"]), int(st["len"]), int(st["since_sync"])
 
 class EpisodicMemory:
-    def __init__(self, latent_dim, capacity=4096):
+    def __init__(self, latent_dim, capacity=4096, dtype=np.float32, index="flat", index_params=None):
         self.latent_dim = latent_dim
         self.capacity = capacity
-        self.vectors = []
+        self.dtype = np.dtype(dtype)
+        # ring buffer of unit rows + their norms; raw vector = unit * norm
+        self._units = np.zeros((capacity, latent_dim), dtype=self.dtype)
+        self._norms = np.zeros(capacity, dtype=self.dtype)
+        self._index_spec = (index, dict(index_params or {}))
+        self.index = make_index(index, self._units, **self._index_spec[1])
+        self._head = 0
+        self._size = 0
         self.meta = []
 
+    def __len__(self):
+        return self._size
+
+    def _slots(self):
+        return (self._head + np.arange(self._size)) % self.capacity
+
+    @property
+    def vectors(self):
+        # inspection only (attend/add never use it): live raw vectors, oldest
+        # first, as a fresh (len, latent_dim) array
+        idx = self._slots()
+        return self._units[idx] * self._norms[idx, None]
+
     def add(self, vec, meta=None):
-        if len(self.vectors) >= self.capacity:
+        if self._size >= self.capacity:
             drop = max(1, self.capacity // 10)
-            self.vectors = self.vectors[drop:]
+            self.index.remove((self._head + np.arange(drop)) % self.capacity)
+            self._head = (self._head + drop) % self.capacity
+            self._size -= drop
             self.meta = self.meta[drop:]
-        self.vectors.append(np.asarray(vec))
+        v = np.asarray(vec).reshape(-1)
+        n = np.linalg.norm(v)
+        slot = (self._head + self._size) % self.capacity
+        self._units[slot] = v / (n + 1e-12)
+        self._norms[slot] = n
+        self.index.add(slot)
+        self._size += 1
         self.meta.append(meta or {})
 
+    def state_dict(self):
+        return dict(units=self._units.copy(), norms=self._norms.copy(), head=self._head, size=self._size,
+                    meta=list(self.meta))
+
+    def load_state_dict(self, st):
+        if st["units"].shape != self._units.shape:
+            raise ValueError(f"episodic memory shape mismatch: {st['units'].shape} != {self._units.shape}")
+        self._units[...] = st["units"]
+        self._norms[...] = st["norms"]
+        self._head, self._size = int(st["head"]), int(st["size"])
+        self.meta = list(st["meta"])
+        # indexes are derived state: rebuild over the live slots, oldest first
+        self.index = make_index(self._index_spec[0], self._units, **self._index_spec[1])
+        for slot in self._slots().tolist():
+            self.index.add(slot)
+
     def attend(self, q, topk=8):
-        if len(self.vectors) == 0:
+        if self._size == 0:
             return np.zeros_like(q), 0.0
-        sims = np.array([cos_sim(q, v) for v in self.vectors])
-        idxs = np.argsort(sims)[-topk:]
+        qv = np.asarray(q).reshape(-1)
+        qu = (qv / (np.linalg.norm(qv) + 1e-12)).astype(self.dtype, copy=False)
+        idxs, sims = self.index.search(qu, topk)
         if idxs.size == 0:
             return np.zeros_like(q), 0.0
-        weights = softmax(sims[idxs])
-        ctx = np.sum([self.vectors[i] * weights[j] for j, i in enumerate(idxs)], axis=0)
-        quality = float(np.mean(sims[idxs]))
-        return ctx, quality
+        order = np.argsort(idxs)
+        idxs, sims = idxs[order], sims[order]
+        top = sims.astype(float)
+        weights = softmax(top) * self._norms[idxs]
+        ctx = weights @ self._units[idxs].astype(float)
+        quality = float(np.mean(top))
+        return ctx.astype(qv.dtype, copy=False), quality
 
 class WorkingMemory:
     def __init__(self, capacity):
         self.capacity = capacity
-        self.items = []
-        self.scores = []
+        # bounded min-heap of (score, seq, slot); vectors live in a preallocated slot array
+        self._heap = []
+        self._vecs = None
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _store(self, slot, vec):
+        if self._vecs is None:
+            self._vecs = np.zeros((self.capacity,) + vec.shape, dtype=vec.dtype)
+        self._vecs[slot] = vec
 
     def add(self, vec, score):
-        self.items.append(np.asarray(vec))
-        self.scores.append(float(score))
-        if len(self.items) > self.capacity:
-            idxs = np.argsort(self.scores)[-self.capacity:]
-            self.items = [self.items[i] for i in idxs]
-            self.scores = [self.scores[i] for i in idxs]
+        score = float(score)
+        vec = np.asarray(vec)
+        self._seq += 1
+        if len(self._heap) < self.capacity:
+            slot = len(self._heap)
+            heapq.heappush(self._heap, (score, self._seq, slot))
+        elif score >= self._heap[0][0]:
+            slot = heapq.heapreplace(self._heap, (score, self._seq, self._heap[0][2]))[2]
+        else:
+            return
+        self._store(slot, vec)
+
+    def add_many(self, vecs, scores):
+        vecs = np.asarray(vecs)
+        scores = np.asarray(scores, dtype=float).reshape(-1)
+        if scores.shape[0] > self.capacity:
+            # only the best `capacity` of the batch can survive; later entries win ties
+            keep = np.argsort(scores, kind="stable")[-self.capacity:]
+            keep.sort()
+            vecs, scores = vecs[keep], scores[keep]
+        for v, s in zip(vecs, scores):
+            self.add(v, s)
+
+    def clear(self):
+        self._heap = []
+
+    def state_dict(self):
+        return dict(scores=np.array([h[0] for h in self._heap], dtype=float),
+                    seqs=np.array([h[1] for h in self._heap], dtype=np.int64),
+                    slots=np.array([h[2] for h in self._heap], dtype=np.int64),
+                    vecs=self._vecs, seq=self._seq)
+
+    def load_state_dict(self, st):
+        self._heap = [(float(s), int(q), int(i)) for s, q, i in zip(st["scores"], st["seqs"], st["slots"])]
+        heapq.heapify(self._heap)
+        self._vecs = None if st["vecs"] is None else np.array(st["vecs"])
+        self._seq = int(st["seq"])
+
+    def _ordered(self):
+        return sorted(self._heap)
+
+    @property
+    def items(self):
+        return [self._vecs[slot] for _, _, slot in self._ordered()]
+
+    @property
+    def scores(self):
+        return [score for score, _, _ in self._ordered()]
 
     def usage(self):
-        return min(1.0, len(self.items) / float(self.capacity))
+        return min(1.0, len(self._heap) / float(self.capacity))
 
 class Ledgers:
-    def __init__(self):
-        self.L_ret = []
-        self.L_epi = []
-        self.L_proto = []
+    def __init__(self, tail=1024, directory=None, **ledger_kw):
+        # three streaming ledgers; L_* expose the in-memory tails
+        def make(name):
+            return StreamLedger(name, tail=tail, directory=directory, **ledger_kw)
+        self.ret = make("L_ret")
+        self.epi = make("L_epi")
+        self.proto = make("L_proto")
+
+    @property
+    def L_ret(self):
+        return list(self.ret.tail)
+
+    @property
+    def L_epi(self):
+        return list(self.epi.tail)
+
+    @property
+    def L_proto(self):
+        return list(self.proto.tail)
 
     def append_ret(self, anchor):
-        self.L_ret.append(anchor)
+        self.ret.append(anchor)
 
     def append_epi(self, anchor):
-        self.L_epi.append(anchor)
+        self.epi.append(anchor)
 
     def append_proto(self, anchor):
-        self.L_proto.append(anchor)
+        self.proto.append(anchor)
+
+    def flush(self):
+        for led in (self.ret, self.epi, self.proto):
+            led.flush()
+
+    def heads(self):
+        return {led.name: led.head() for led in (self.ret, self.epi, self.proto)}
+
+    def state_dict(self):
+        return dict(ret=self.ret.state_dict(), epi=self.epi.state_dict(), proto=self.proto.state_dict())
+
+    def load_state_dict(self, st):
+        self.ret.load_state_dict(st["ret"])
+        self.epi.load_state_dict(st["epi"])
+        self.proto.load_state_dict(st["proto"])
+
+# Params that size or select engine state built in PsiEngine.__init__; a
+# snapshot can only be restored into an engine built with the same values
+STRUCTURAL_PARAMS = ("latent_dim", "C_w", "W_r", "dt", "em_capacity", "em_index", "em_index_params",
+                     "dtype", "fast_kernels")
 
 class Params:
     def __init__(self,
@@ -138,7 +335,9 @@ class Params:
                  eps=1e-6,
                  g0=1.0, g1=0.5, g2=0.2,
                  consolidate_thresholds=(0.6, 0.4, (0.1, 1.5)),
-                 rollout_dt_fraction=1.0):
+                 rollout_dt_fraction=1.0,
+                 em_capacity=4096, em_index="flat", em_index_params=None,
+                 fast_kernels=False, dtype="float64", seed=None):
         self.dt = float(dt)
         self.W_r = float(W_r)
         self.H = float(H)
@@ -155,20 +354,105 @@ class Params:
         self.g0, self.g1, self.g2 = g0, g1, g2
         self.tau_psi, self.tau_c, self.tau_pe_range = consolidate_thresholds
         self.rollout_dt_fraction = float(rollout_dt_fraction)
+        self.em_capacity = int(em_capacity)
+        self.em_index = em_index
+        self.em_index_params = dict(em_index_params or {})
+        self.fast_kernels = bool(fast_kernels)
+        # numeric mode for encode, rollouts, retention and metrics; kept as a name so
+        # Params stays JSON-serializable for snapshots
+        self.dtype = np.dtype(dtype).name
+        self.seed = seed
 
 class PsiEngine:
-    def __init__(self, backend, params: Params):
+    def __init__(self, backend, params: Params, ledgers=None, rng=None, profile=False):
         self.backend = backend
         self.params = params
-        self.ret = RetentionBuffer(params.W_r, params.dt, params.latent_dim)
-        self.em = EpisodicMemory(params.latent_dim)
+        self.dtype = np.dtype(params.dtype)
+        self.ret = RetentionBuffer(params.W_r, params.dt, params.latent_dim, dtype=self.dtype)
+        self.em = EpisodicMemory(params.latent_dim, capacity=params.em_capacity,
+                                 index=params.em_index, index_params=params.em_index_params)
         self.wm = WorkingMemory(params.C_w)
-        self.ledgers = Ledgers()
+        self.ledgers = ledgers if ledgers is not None else Ledgers()
+        # drives L_epi admission; pass a spawned stream per agent (see rng.agent_streams)
+        self.rng = make_rng(params.seed if rng is None else rng)
+        # bincount entropy with reusable scratch; same values as entropy_hist
+        self._entropy = HistEntropy(32) if params.fast_kernels else None
         self.theta = backend.init_theta(params.latent_dim)
         self.prev_P = None
         self.prev_z_hat = None
         self.k = 0
         self.time_s = 0.0
+        # per-phase step timing (see profile.py); None keeps step() uninstrumented
+        self.profiler = None
+        if profile:
+            self.enable_profiling()
+
+    def enable_profiling(self, window=1024):
+        if self.profiler is None or self.profiler.window != window:
+            self.profiler = StepProfiler(window)
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+
+    def get_profile(self):
+        """Per-phase step timings over the profiler window ({} when profiling is off)."""
+        return self.profiler.summary() if self.profiler is not None else {}
+
+    def snapshot(self, path, extra=None):
+        # theta, memories, ledger heads, backend and RNG state in one .npz (see checkpoint.py)
+        st = dict(k=self.k, time_s=self.time_s, params=dict(vars(self.params)),
+                  backend=dict(kind=type(self.backend).__name__, state=self.backend.state_dict()),
+                  rng=self.rng.bit_generator.state, theta=self.theta, prev_P=self.prev_P, prev_z_hat=self.prev_z_hat,
+                  ret=self.ret.state_dict(), em=self.em.state_dict(), wm=self.wm.state_dict(),
+                  ledgers=self.ledgers.state_dict(), extra=extra or {})
+        return checkpoint.save(path, st)
+
+    def restore(self, path):
+        st = checkpoint.load(path)
+        self._check_snapshot(st)
+        self.backend.load_state_dict(st["backend"]["state"])
+        self.rng.bit_generator.state = st["rng"]
+        self.theta = st["theta"]
+        self.prev_P, self.prev_z_hat = st["prev_P"], st["prev_z_hat"]
+        self.ret.load_state_dict(st["ret"])
+        self.em.load_state_dict(st["em"])
+        self.wm.load_state_dict(st["wm"])
+        self.ledgers.load_state_dict(st["ledgers"])
+        # params stay the live ones: structural fields were checked to match, and
+        # tunables (thresholds, weights) follow the current configuration
+        self.k, self.time_s = int(st["k"]), float(st["time_s"])
+        return st["extra"]
+
+    def _check_snapshot(self, st):
+        # validate everything up front: a snapshot from a differently shaped
+        # engine must fail before any live state has been overwritten
+        kind = type(self.backend).__name__
+        if st["backend"]["kind"] != kind:
+            raise ValueError(f"snapshot backend {st['backend']['kind']!r} does not match {kind!r}")
+        live = vars(self.params)
+        changed = [name for name in STRUCTURAL_PARAMS if st["params"].get(name) != live.get(name)]
+        if changed:
+            raise ValueError("snapshot params differ on " + ", ".join(
+                f"{name} ({st['params'].get(name)!r} != {live.get(name)!r})" for name in changed))
+        arrays = [("prev_P", st["prev_P"], self.prev_P), ("retention", st["ret"]["buf"], self.ret._buf),
+                  ("episodic memory", st["em"]["units"], self.em._units)]
+        if isinstance(self.theta, dict):
+            if set(st["theta"]) != set(self.theta):
+                raise ValueError(f"snapshot theta keys {sorted(st['theta'])} != {sorted(self.theta)}")
+            arrays += [(f"theta {key}", st["theta"][key], value) for key, value in self.theta.items()]
+        else:
+            arrays.append(("theta", st["theta"], self.theta))
+        for name, got, want in arrays:
+            if got is None or not isinstance(want, np.ndarray):
+                continue
+            got = np.asarray(got)
+            if got.shape != want.shape or got.dtype != want.dtype:
+                raise ValueError(f"snapshot {name} mismatch: {got.shape}/{got.dtype} != {want.shape}/{want.dtype}")
+        backend_st = st["backend"]["state"]
+        for key, want in self.backend.state_dict().items():
+            if isinstance(want, np.ndarray) and np.shape(backend_st.get(key)) != want.shape:
+                raise ValueError(f"snapshot backend {key} shape mismatch: {np.shape(backend_st.get(key))} != {want.shape}")
 
     def consolidate_gate(self, Psi, PE, C):
         lo, hi = self.params.tau_pe_range
@@ -176,43 +460,65 @@ class PsiEngine:
 
     def step(self, x_k, guardian_in=None, guardian_out=None):
         p = self.params
+        prof = self.profiler
+        if prof:
+            prof.start()
         if callable(guardian_in):
             x_k = guardian_in(x_k, self)
 
-        z = self.backend.encode(x_k)
+        z = np.asarray(self.backend.encode(x_k), dtype=self.dtype)
         P_k = z
+        if prof:
+            prof.lap("encode")
 
         if self.prev_P is not None:
             self.ret.push(self.prev_P)
+        if prof:
+            prof.lap("retention")
 
         if self.prev_P is not None:
             z_hat_from_prev = self.backend.predict(self.prev_P, self.theta, self.em)
         else:
             z_hat_from_prev = np.copy(P_k)
+        if prof:
+            prof.lap("predict")
 
-        rollouts = self.backend.rollout(self.theta, P_k, horizon=p.H, N=p.N, dt=p.dt * p.rollout_dt_fraction)
+        rollouts = self.backend.rollout(self.theta, P_k, horizon=p.H, N=p.N, dt=p.dt * p.rollout_dt_fraction,
+                                        first_only=True)
+        rollout_snaps = list(rollouts[:, 0]) if len(rollouts) > 0 else []
+        if prof:
+            prof.lap("rollout")
 
         phi = P_k + 0.5*self.ret.summary()
+        if prof:
+            prof.lap("retention")
         ctx, q = self.em.attend(P_k, topk=8)
+        if prof:
+            prof.lap("attend")
 
         M_k = p.alpha * self.wm.usage() + p.beta * max(0.0, q)
 
         C_k = cos_sim(phi, ctx) if np.linalg.norm(ctx) > 0 else 0.0
 
-        if len(rollouts) > 0:
-            first_steps = [traj[0] for traj in rollouts if len(traj) > 0]
-            U_k = float(np.mean([cos_sim(P_k, fs) for fs in first_steps])) if len(first_steps) > 0 else 0.0
+        U_k = float(np.mean([cos_sim(P_k, fs) for fs in rollout_snaps])) if len(rollout_snaps) > 0 else 0.0
+
+        # phase coherence over [phi] + retention traces + rollout snapshots; the
+        # retention part comes from the buffer's running cos/sin sums
+        snap_cos, snap_sin = phase_terms(rollouts[:, 0]) if rollout_snaps else (np.zeros(0), np.zeros(0))
+        ph_phi = pseudo_phase(phi)
+        n_ph = 1 + len(self.ret) + len(snap_cos)
+        re = (np.cos(ph_phi) + self.ret.cos_sum + snap_cos.sum()) / n_ph
+        im = (np.sin(ph_phi) + self.ret.sin_sum + snap_sin.sum()) / n_ph
+        Phi_k = float(np.sqrt(re*re + im*im))
+        if prof:
+            prof.lap("metrics")
+
+        if self._entropy is not None:
+            H_k = float(self._entropy(np.concatenate([P_k, ctx, phi])[None])[0])
         else:
-            U_k = 0.0
-
-        rollout_snaps = []
-        for traj in rollouts:
-            if len(traj) > 0:
-                rollout_snaps.append(traj[0])
-        vectors_for_phase = [phi] + self.ret.traces + rollout_snaps
-        Phi_k = phase_coherence(vectors_for_phase)
-
-        H_k = entropy_hist(np.concatenate([P_k, ctx, phi]))
+            H_k = entropy_hist(np.concatenate([P_k, ctx, phi]))
+        if prof:
+            prof.lap("entropy")
 
         PE_k = float(np.linalg.norm(P_k - z_hat_from_prev))
 
@@ -224,6 +530,8 @@ class PsiEngine:
         dt_eff = clamp(p.dt * (1.0 + p.lambda_*(1.0 - Psi_k)), p.dt_min, p.dt_max)
 
         sal = max(0.0, Psi_k - 0.5*PE_k)
+        if prof:
+            prof.lap("metrics")
         self.wm.add(phi, score=sal)
 
         if self.consolidate_gate(Psi_k, PE_k, C_k):
@@ -231,15 +539,21 @@ class PsiEngine:
             self.em.add(phi, meta=meta)
             anchor = dict(hash=hash_trace(phi, meta), meta=meta)
             self.ledgers.append_ret(anchor)
-            if sal > 0.0 and random.random() < 0.3:
+            if sal > 0.0 and self.rng.random() < 0.3:
                 self.ledgers.append_epi(anchor)
+        if prof:
+            prof.lap("consolidate")
 
         if self.prev_P is not None:
             self.theta = self.backend.update_theta(self.theta, self.prev_P, P_k)
+        if prof:
+            prof.lap("theta")
 
         proto_meta = dict(t=self.time_s, k=self.k, U=U_k)
         proto_hash = hashlib.sha256((str(P_k[:4]) + str(U_k)).encode("utf-8")).hexdigest()
         self.ledgers.append_proto(dict(hash=proto_hash, meta=proto_meta))
+        if prof:
+            prof.lap("proto")
 
         if callable(guardian_out):
             guardian_out(dict(Psi=Psi_k, PE=PE_k, C=C_k, U=U_k, Phi=Phi_k, t=self.time_s, k=self.k), self)
@@ -250,20 +564,22 @@ class PsiEngine:
         self.time_s += dt_eff
 
         rec = dict(k=self.k, t=self.time_s, Psi=Psi_k, C=C_k, U=U_k, Phi=Phi_k, H=H_k, PE=PE_k, dt_eff=dt_eff, M=M_k, att_gain=att_gain)
+        if prof:
+            prof.finish()
         return rec
 
 class SyntheticEnv:
-    def __init__(self, input_dim=16, change_prob=0.02, drift=0.02, seed=42):
+    def __init__(self, input_dim=16, change_prob=0.02, drift=0.02, seed=42, rng=None):
         self.input_dim = input_dim
         self.change_prob = change_prob
         self.drift = drift
-        self.rng = np.random.RandomState(seed)
-        self.state = self.rng.randn(input_dim)
+        self.rng = make_rng(seed if rng is None else rng)
+        self.state = self.rng.standard_normal(input_dim)
 
     def step(self):
-        self.state += self.drift * self.rng.randn(self.input_dim)
-        if self.rng.rand() < self.change_prob:
-            self.state = self.rng.randn(self.input_dim) * (1.0 + 0.5*self.rng.rand())
+        self.state += self.drift * self.rng.standard_normal(self.input_dim)
+        if self.rng.random() < self.change_prob:
+            self.state = self.rng.standard_normal(self.input_dim) * (1.0 + 0.5*self.rng.random())
         t = time.time() % (2*np.pi)
         self.state += 0.1 * np.sin(t) * np.ones(self.input_dim)
         return self.state.copy()
@@ -0,0 +1,19 @@
+import numpy as np
+
+# Seeded randomness. Every stochastic component owns a numpy Generator; agents
+# get independent streams from SeedSequence.spawn, so an agent's draws depend
+# only on (seed, agent index) and never on how agents are split across
+# processes or in which order they are stepped.
+
+def make_rng(seed=None):
+    """Generator from an int, SeedSequence or None (OS entropy); Generators pass through."""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+def agent_streams(seed, n, per_agent=("env", "backend", "engine")):
+    """One dict of independent Generators per agent, keyed by ``per_agent`` names."""
+    out = []
+    for child in np.random.SeedSequence(seed).spawn(n):
+        out.append({name: np.random.default_rng(s) for name, s in zip(per_agent, child.spawn(len(per_agent)))})
+    return out
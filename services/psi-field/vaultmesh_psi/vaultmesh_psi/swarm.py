@@ -0,0 +1,276 @@
+import numpy as np
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from .psi_core import Ledgers, hash_trace
+from .rng import agent_streams, make_rng
+from .kernels import EPS, HistEntropy, groups, pseudo_phases, row_cos, row_dot, row_norm
+
+# Batched counterpart of PsiEngine for swarms of SimpleBackend agents that
+# share one Params. Every per-agent structure (retention ring, working and
+# episodic memory, theta) is a stacked array with the agent on axis 0, so a
+# tick is a handful of batched matmul calls instead of N Python step() calls.
+# Records, ledgers and RNG consumption match N independent PsiEngine.step
+# calls, given the same per-agent engine streams (``rngs``).
+
+class PsiSwarmEngine:
+    def __init__(self, backends, params, em_capacity=None, topk=8, ledgers=None, rngs=None):
+        if np.dtype(getattr(params, "dtype", "float64")) != np.float64:
+            # parity with PsiEngine is defined (and tested) in float64 only
+            raise ValueError(f"PsiSwarmEngine runs in float64, got dtype={params.dtype!r}")
+        self.backends = list(backends)
+        self.params = params
+        self.n = n = len(self.backends)
+        d = params.latent_dim
+        self.latent_dim = d
+        self.topk = topk
+        self.E = np.stack([b.E for b in self.backends])
+        self.A = np.stack([b.init_theta(d)["A"] for b in self.backends])
+        self.eta = np.array([b.eta for b in self.backends], dtype=float)
+        # retention: shared write cursor, per-agent fill (agents can be cleared independently)
+        self.ret_len = int(max(1, round(params.W_r / params.dt)))
+        self.ret_buf = np.zeros((n, self.ret_len, d))
+        self.ret_cos = np.zeros((n, self.ret_len))
+        self.ret_sin = np.zeros((n, self.ret_len))
+        self.ret_sum = np.zeros((n, d))
+        self.ret_cos_sum = np.zeros(n)
+        self.ret_sin_sum = np.zeros(n)
+        self.ret_count = np.zeros(n, dtype=np.int64)
+        self._ret_since_sync = np.zeros(n, dtype=np.int64)
+        self._ret_cursor = 0
+        # working memory: only occupancy feeds the metrics, items kept for inspection
+        self.wm_items = np.zeros((n, params.C_w, d))
+        self.wm_scores = np.full((n, params.C_w), -np.inf)
+        self.wm_count = np.zeros(n, dtype=np.int64)
+        # episodic memory: per-agent ring of unit rows + norms, same drop-10% policy
+        self.em_capacity = int(em_capacity or params.em_capacity)
+        self.em_units = np.zeros((n, self.em_capacity, d), dtype=np.float32)
+        self.em_norms = np.zeros((n, self.em_capacity), dtype=np.float32)
+        self.em_head = np.zeros(n, dtype=np.int64)
+        self.em_size = np.zeros(n, dtype=np.int64)
+        self.em_meta = [[] for _ in range(n)]
+        self.ledgers = list(ledgers) if ledgers is not None else [Ledgers() for _ in range(n)]
+        # per-agent L_epi admission streams, as PsiEngine(rng=...) would own them
+        self.rngs = [make_rng(r) for r in rngs] if rngs is not None else [make_rng(params.seed) for _ in range(n)]
+        self.prev_P = None
+        self.k = 0
+        self.time_s = np.zeros(n)
+        self._entropy = HistEntropy(32)
+
+    def consolidate_gate(self, Psi, PE, C):
+        lo, hi = self.params.tau_pe_range
+        return ((Psi > self.params.tau_psi) & (C > self.params.tau_c)) | ((lo <= PE) & (PE <= hi))
+
+    def clear_retention(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        self.ret_count[mask] = 0
+        self.ret_sum[mask] = 0.0
+        self.ret_cos_sum[mask] = 0.0
+        self.ret_sin_sum[mask] = 0.0
+        self._ret_since_sync[mask] = 0
+
+    def clear_working_memory(self, mask):
+        mask = np.asarray(mask, dtype=bool)
+        self.wm_count[mask] = 0
+        self.wm_scores[mask] = -np.inf
+
+    def _ret_push(self, Z):
+        # same running-sum arithmetic as RetentionBuffer.push, for every agent at once
+        c = self._ret_cursor
+        ph = pseudo_phases(Z)
+        full = self.ret_count == self.ret_len
+        self.ret_sum[full] -= self.ret_buf[full, c]
+        self.ret_cos_sum[full] -= self.ret_cos[full, c]
+        self.ret_sin_sum[full] -= self.ret_sin[full, c]
+        self.ret_buf[:, c] = Z
+        self.ret_cos[:, c] = np.cos(ph)
+        self.ret_sin[:, c] = np.sin(ph)
+        self.ret_sum += Z
+        self.ret_cos_sum += self.ret_cos[:, c]
+        self.ret_sin_sum += self.ret_sin[:, c]
+        self._ret_cursor = (c + 1) % self.ret_len
+        self.ret_count = np.minimum(self.ret_count + 1, self.ret_len)
+        self._ret_since_sync += 1
+        sync = (self.ret_count == self.ret_len) & (self._ret_since_sync >= self.ret_len)
+        if sync.any():
+            self.ret_sum[sync] = self.ret_buf[sync].sum(axis=1)
+            self.ret_cos_sum[sync] = self.ret_cos[sync].sum(axis=1)
+            self.ret_sin_sum[sync] = self.ret_sin[sync].sum(axis=1)
+            self._ret_since_sync[sync] = 0
+
+    def _wm_add(self, Z, score):
+        rows = np.arange(self.n)
+        free = self.wm_count < self.params.C_w
+        slot = np.where(free, self.wm_count, np.argmin(self.wm_scores, axis=1))
+        admit = free | (score >= self.wm_scores[rows, slot])
+        r, s = rows[admit], slot[admit]
+        self.wm_items[r, s] = Z[admit]
+        self.wm_scores[r, s] = score[admit]
+        self.wm_count = np.minimum(self.wm_count + 1, self.params.C_w)
+
+    def _em_mask(self):
+        age = (np.arange(self.em_capacity)[None, :] - self.em_head[:, None]) % self.em_capacity
+        return age < self.em_size[:, None]
+
+    def _em_attend(self, Q):
+        n, cap = self.n, self.em_capacity
+        ctx = np.zeros_like(Q)
+        q = np.zeros(n)
+        if not (self.em_size > 0).any():
+            return ctx, q
+        qu = (Q / (row_norm(Q) + 1e-12)[:, None]).astype(np.float32)
+        sims = np.matmul(self.em_units, qu[:, :, None])[:, :, 0]
+        sims[~self._em_mask()] = -np.inf
+        kk = self.topk if 0 < self.topk < cap else cap
+        idx = np.argpartition(sims, -kk, axis=1)[:, -kk:]
+        rows = np.arange(n)[:, None]
+        valid = np.isfinite(sims[rows, idx])
+        # live slots first in slot order, matching EpisodicMemory.attend
+        idx = np.take_along_axis(idx, np.argsort(np.where(valid, idx, cap), axis=1, kind="stable"), axis=1)
+        for c, grp in groups(valid.sum(axis=1)):
+            if c == 0:
+                continue
+            gi = idx[grp, :c]
+            r = grp[:, None]
+            top = sims[r, gi].astype(float)
+            ex = np.exp(top - top.max(axis=1, keepdims=True))
+            w = ex / (ex.sum(axis=1, keepdims=True) + EPS) * self.em_norms[r, gi]
+            ctx[grp] = np.matmul(w[:, None, :], self.em_units[r, gi].astype(float))[:, 0, :]
+            q[grp] = top.mean(axis=1)
+        return ctx, q
+
+    def _em_add(self, agents, Z, metas):
+        cap = self.em_capacity
+        drop = max(1, cap // 10)
+        for i, z, meta in zip(agents, Z, metas):
+            if self.em_size[i] >= cap:
+                self.em_head[i] = (self.em_head[i] + drop) % cap
+                self.em_size[i] -= drop
+                self.em_meta[i] = self.em_meta[i][drop:]
+            nrm = np.linalg.norm(z)
+            slot = (self.em_head[i] + self.em_size[i]) % cap
+            self.em_units[i, slot] = z / (nrm + 1e-12)
+            self.em_norms[i, slot] = nrm
+            self.em_size[i] += 1
+            self.em_meta[i].append(meta)
+
+    def _rollout_first(self, P):
+        # same draws as SimpleBackend.rollout(first_only=True), one per agent RNG
+        N = self.params.N
+        noise = np.stack([b.noise * b.rng.standard_normal((N, self.latent_dim)) for b in self.backends])
+        return np.matmul(self.A, P[:, :, None])[:, None, :, 0] + noise
+
+    def step(self, X):
+        p = self.params
+        n = self.n
+        X = np.asarray(X, dtype=float).reshape(n, -1)
+        P = np.tanh(np.matmul(self.E, X[:, :, None])[:, :, 0])
+
+        if self.prev_P is not None:
+            self._ret_push(self.prev_P)
+            z_hat = np.matmul(self.A, self.prev_P[:, :, None])[:, :, 0]
+        else:
+            z_hat = P.copy()
+
+        first = self._rollout_first(P) if p.N > 0 else np.zeros((n, 0, self.latent_dim))
+
+        cnt = np.maximum(self.ret_count, 1)[:, None]
+        summ = np.where(self.ret_count[:, None] > 0, self.ret_sum / cnt, 0.0)
+        phi = P + 0.5 * summ
+        ctx, q = self._em_attend(P)
+
+        wm_usage = np.minimum(1.0, self.wm_count / float(p.C_w))
+        M = p.alpha * wm_usage + p.beta * np.maximum(0.0, q)
+
+        C = np.where(row_norm(ctx) > 0, row_cos(phi, ctx), 0.0)
+        U = row_cos(P[:, None, :], first).mean(axis=1) if first.shape[1] > 0 else np.zeros(n)
+
+        # phase coherence over [phi] + retention traces + first rollout steps
+        ph_phi = pseudo_phases(phi)
+        ph_roll = pseudo_phases(first)
+        n_ph = 1 + self.ret_count + first.shape[1]
+        re = (np.cos(ph_phi) + self.ret_cos_sum + np.cos(ph_roll).sum(axis=1)) / n_ph
+        im = (np.sin(ph_phi) + self.ret_sin_sum + np.sin(ph_roll).sum(axis=1)) / n_ph
+        Phi = np.sqrt(re * re + im * im)
+
+        H = self._entropy(np.concatenate([P, ctx, phi], axis=1))
+        PE = row_norm(P - z_hat)
+
+        rho = p.dt / (p.eps + M)
+        x_val = p.w1 * (1.0 / rho) + p.w2 * C + p.w3 * U + p.w4 * Phi - p.w5 * H - p.w6 * PE
+        Psi = 1.0 / (1.0 + np.exp(-x_val))
+        att_gain = p.g0 + p.g1 * Psi - p.g2 * PE
+        dt_eff = np.clip(p.dt * (1.0 + p.lambda_ * (1.0 - Psi)), p.dt_min, p.dt_max)
+
+        sal = np.maximum(0.0, Psi - 0.5 * PE)
+        self._wm_add(phi, sal)
+
+        gate = np.flatnonzero(self.consolidate_gate(Psi, PE, C))
+        metas = [dict(t=float(self.time_s[i]), Psi=float(Psi[i]), k=self.k) for i in gate]
+        self._em_add(gate, phi[gate], metas)
+        for i, meta in zip(gate, metas):
+            anchor = dict(hash=hash_trace(phi[i], meta), meta=meta)
+            self.ledgers[i].append_ret(anchor)
+            if sal[i] > 0.0 and self.rngs[i].random() < 0.3:
+                self.ledgers[i].append_epi(anchor)
+
+        if self.prev_P is not None:
+            err = np.matmul(self.A, self.prev_P[:, :, None])[:, :, 0] - P
+            denom = row_dot(self.prev_P, self.prev_P) + 1e-6
+            grad = err[:, :, None] * self.prev_P[:, None, :] / denom[:, None, None]
+            self.A = self.A - self.eta[:, None, None] * grad
+
+        for i in range(n):
+            proto_meta = dict(t=float(self.time_s[i]), k=self.k, U=float(U[i]))
+            proto_hash = hashlib.sha256((str(P[i, :4]) + str(float(U[i]))).encode("utf-8")).hexdigest()
+            self.ledgers[i].append_proto(dict(hash=proto_hash, meta=proto_meta))
+
+        self.prev_P = P
+        self.k += 1
+        self.time_s = self.time_s + dt_eff
+
+        return [dict(k=self.k, t=float(self.time_s[i]), Psi=float(Psi[i]), C=float(C[i]), U=float(U[i]),
+                     Phi=float(Phi[i]), H=float(H[i]), PE=float(PE[i]), dt_eff=float(dt_eff[i]),
+                     M=float(M[i]), att_gain=float(att_gain[i])) for i in range(n)]
+
+
+def _run_chunk(job):
+    seed, n, agents, steps, params, batched = job
+    from .psi_core import PsiEngine
+    from .backends.simple import SimpleBackend
+    from .adversary import AdversarialEnv
+    streams = agent_streams(seed, n)
+    envs = [AdversarialEnv(rng=streams[i]["env"]) for i in agents]
+    backends = [SimpleBackend(rng=streams[i]["backend"]) for i in agents]
+    rngs = [streams[i]["engine"] for i in agents]
+    if batched:
+        swarm = PsiSwarmEngine(backends, params, rngs=rngs)
+        out = [swarm.step(np.stack([e.step() for e in envs])) for _ in range(steps)]
+        roots = [led.heads() for led in swarm.ledgers]
+        return [[tick[j] for tick in out] for j in range(len(agents))], roots
+    engines = [PsiEngine(b, params, rng=r) for b, r in zip(backends, rngs)]
+    records = [[eng.step(env.step()) for _ in range(steps)] for eng, env in zip(engines, envs)]
+    return records, [eng.ledgers.heads() for eng in engines]
+
+def run_agents(n, steps, seed=0, params=None, workers=1, batched=False):
+    """Run ``n`` independent SimpleBackend agents on AdversarialEnv inputs.
+
+    Agent ``i`` draws its env, backend and engine streams from child ``i`` of
+    ``SeedSequence(seed)``, so the per-agent records and ledger heads are
+    bit-identical for any ``workers`` count and for batched (PsiSwarmEngine)
+    or per-agent (PsiEngine) stepping.
+
+    Returns:
+        (records, heads): per-agent lists of step records and ledger heads.
+    """
+    from .psi_core import Params
+    params = params or Params()
+    chunks = [c.tolist() for c in np.array_split(np.arange(n), max(1, min(workers, n)))]
+    jobs = [(seed, n, c, steps, params, batched) for c in chunks if c]
+    if workers <= 1:
+        results = [_run_chunk(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_chunk, jobs))
+    records = [r for recs, _ in results for r in recs]
+    heads = [h for _, hs in results for h in hs]
+    return records, heads
@@ -3,9 +3,10 @@ import os, json, hashlib, argparse
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from .psi_core import Params, PsiEngine
+from .psi_core import Params, PsiEngine, Ledgers
 from .backends.simple import SimpleBackend
 from .adversary import AdversarialEnv
+from .rng import agent_streams
 
 class TaskCollector:
     def __init__(self): self.tasks=[]
@@ -42,8 +43,8 @@ class VoidGuardianPP:
             engine._red_flag=True; engine._red_reason=("high_PE" if PE>self.pe_hi else ("low_Psi" if Psi<self.psi_lo else "high_H"))
             engine.params.lambda_=-0.9
             if hasattr(engine.backend,"noise"): engine.backend.noise=engine._noise_default+0.06
-            if hasattr(engine,"wm"): engine.wm.items=[]; engine.wm.scores=[]
-            if hasattr(engine,"ret"): engine.ret.buf.clear()
+            if hasattr(engine,"wm"): engine.wm.clear()
+            if hasattr(engine,"ret"): engine.ret.clear()
             self.cooldowns[eid]=6
             tid=hashlib.sha256(f"task|{eid}|{k}|{Psi:.6f}|{PE:.6f}|{H:.6f}".encode("utf-8")).hexdigest()
             self.collector.add({"id":tid,"engine":int(engine_idx or 0),"k":int(k),"t":float(stats["t"]),"type":"counterfactual_rehearsal",
@@ -71,10 +72,12 @@ def run_vigil_plus(num_agents=50, steps=80, seed=13579, out_dir="./vigil_pp_outp
             ("Aftershocks",71,80,{"shock_prob":"alt(0.40,0.12,5)","drift":0.03,"burst_len":8})]
     collectors=[TaskCollector() for _ in range(num_agents)]
     guardians=[VoidGuardianPP(collectors[i]) for i in range(num_agents)]
-    envs=[AdversarialEnv(input_dim=16, shock_prob=0.10, drift=0.02, burst_len=5, seed=seed+i) for i in range(num_agents)]
+    streams=agent_streams(seed, num_agents, per_agent=("env","backend","engine","desync"))
+    envs=[AdversarialEnv(input_dim=16, shock_prob=0.10, drift=0.02, burst_len=5, rng=streams[i]["env"]) for i in range(num_agents)]
     params=[Params(dt=0.2, W_r=3.0, H=2.0, N=8, C_w=32, latent_dim=32) for _ in range(num_agents)]
-    backends=[SimpleBackend(input_dim=16, latent_dim=32, seed=seed+i) for i in range(num_agents)]
-    agents=[PsiEngine(backends[i], params[i]) for i in range(num_agents)]
+    backends=[SimpleBackend(input_dim=16, latent_dim=32, rng=streams[i]["backend"]) for i in range(num_agents)]
+    ledger_dir=os.path.join(out_dir,"ledgers")
+    agents=[PsiEngine(backends[i], params[i], ledgers=Ledgers(directory=os.path.join(ledger_dir,f"agent_{i}")), rng=streams[i]["engine"]) for i in range(num_agents)]
     per_agent=[[] for _ in range(num_agents)]; swarm_rows=[]
     def alt(val_str,k): a,b,per = val_str.strip()[4:-1].split(","); a=float(a); b=float(b); per=int(per); return a if ((k//per)%2==0) else b
     for k in range(1, steps+1):
@@ -86,9 +89,9 @@ def run_vigil_plus(num_agents=50, steps=80, seed=13579, out_dir="./vigil_pp_outp
             env.shock_prob=float(shock); env.drift=float(ov.get("drift", env.drift)); env.burst_len=int(ov.get("burst_len", env.burst_len))
         psi_vals=[]; pe_vals=[]; h_vals=[]
         for i,eng in enumerate(agents):
-            if desync>0.0 and np.random.rand()<desync:
-                if hasattr(eng,"ret"): eng.ret.buf.clear()
-                if hasattr(eng,"wm"): eng.wm.items=[]; eng.wm.scores=[]
+            if desync>0.0 and streams[i]["desync"].random()<desync:
+                if hasattr(eng,"ret"): eng.ret.clear()
+                if hasattr(eng,"wm"): eng.wm.clear()
             x=envs[i].step(); G=guardians[i]
             def g_out(stats, engine, _i=i): G.outbound(stats, engine, engine_idx=_i)
             rec=eng.step(x, guardian_in=G.inbound, guardian_out=g_out)
@@ -102,13 +105,14 @@ def run_vigil_plus(num_agents=50, steps=80, seed=13579, out_dir="./vigil_pp_outp
     swarm_df=pd.DataFrame(swarm_rows); swarm_csv=os.path.join(out_dir,"swarm_summary.csv"); swarm_df.to_csv(swarm_csv, index=False)
     # Merge ledgers + tasks
     L_ret=[]; L_epi=[]; L_proto=[]
-    for eng in agents: L_ret.extend(eng.ledgers.L_ret); L_epi.extend(eng.ledgers.L_epi); L_proto.extend(eng.ledgers.L_proto)
+    for eng in agents: eng.ledgers.flush(); L_ret.extend(eng.ledgers.ret.replay()); L_epi.extend(eng.ledgers.epi.replay()); L_proto.extend(eng.ledgers.proto.replay())
+    heads=[eng.ledgers.heads() for eng in agents]
     tasks_path=os.path.join(out_dir,"L_task.jsonl"); merged=TaskCollector()
     for C in collectors: [merged.add(t) for t in C.tasks]
     merged.write(tasks_path)
     red_ret=sum(1 for a in L_ret if a.get("meta",{}).get("red_flag")); red_epi=sum(1 for a in L_epi if a.get("meta",{}).get("red_flag"))
     with open(os.path.join(out_dir,"swarm_ledgers_merged.json"),"w",encoding="utf-8") as f:
-        json.dump({"L_ret":L_ret,"L_epi":L_epi,"L_proto":L_proto,
+        json.dump({"L_ret":L_ret,"L_epi":L_epi,"L_proto":L_proto,"heads":heads,
                    "red_flags":{"L_ret":red_ret,"L_epi":red_epi,"L_task":len(merged.tasks)}}, f, indent=2)
     # Compute RedFlags column from tasks (engine k is 0-based)
     counts={}
@@ -140,7 +144,7 @@ def run_vigil_plus(num_agents=50, steps=80, seed=13579, out_dir="./vigil_pp_outp
     mani={"swarm_summary_csv":swarm_csv,"charts":{"Psi_swarm":os.path.join(charts_dir,"Psi_swarm.png"),
          "PE_swarm":os.path.join(charts_dir,"PE_swarm.png"),"H_swarm":os.path.join(charts_dir,"H_swarm.png"),
          "RedFlags":os.path.join(charts_dir,"RedFlags.png")},
-         "ledgers_merged":os.path.join(out_dir,"swarm_ledgers_merged.json"),"tasks_ledger":tasks_path,
+         "ledgers_merged":os.path.join(out_dir,"swarm_ledgers_merged.json"),"tasks_ledger":tasks_path,"ledger_segments":ledger_dir,
          "agents":num_agents,"steps":steps,
          "Psi0":float(swarm_df["Psi_swarm"].iloc[0]),"PsiF":float(swarm_df["Psi_swarm"].iloc[-1]),
          "DeltaPsi":float(swarm_df["Psi_swarm"].iloc[-1]-swarm_df["Psi_swarm"].iloc[0]),